@@ -1,6 +1,11 @@
 import frappe
 from frappe import _
 
+BULK_JOB_CHUNK_SIZE = 500
+BULK_RUN_TTL = 24 * 3600
+BULK_PROGRESS_INTERVAL = 2  # seconds
+BULK_PROGRESS_STEP = 5  # percent
+
 
 @frappe.whitelist()
 def actualize_sales_invoice_fiscal_status(sales_invoice):
@@ -13,8 +18,11 @@ def actualize_sales_invoice_fiscal_status(sales_invoice):
     if si.docstatus != 1:
         frappe.throw(_("Fiscal status can be actualized only for submitted invoices."))
 
+    from erpnext_moldova_efactura.utils import efactura_summary
     from erpnext_moldova_efactura.utils.fiscal_status import determine_fiscal_status
 
+    efactura_summary.refresh([si.name])
+
     try:
         new_status = determine_fiscal_status(si)
     except frappe.ValidationError as e:
@@ -31,61 +39,178 @@ def actualize_sales_invoice_fiscal_status(sales_invoice):
 
 @frappe.whitelist()
 def start_bulk_si_job(names):
+    """
+    Actualize fiscal_status for many Sales Invoices. The names are split into chunks that
+    run as separate jobs on the long queue; progress and finished chunks are tracked in
+    Redis, so a run with failed chunks can be resumed with resume_bulk_si_job.
+    """
     if isinstance(names, str):
         names = frappe.parse_json(names)
 
-    frappe.enqueue(
-        method="erpnext_moldova_efactura.api.fiscal_status._bulk_si_job",
-        queue="long",
-        job_name="Bulk Sales Invoice Fiscal Status Actualization",
-        names=names,
-        user=frappe.session.user,
-    )
+    names = list(dict.fromkeys(names))
+    run_id = frappe.generate_hash(length=10)
+    chunks = (len(names) + BULK_JOB_CHUNK_SIZE - 1) // BULK_JOB_CHUNK_SIZE
 
-    return {"started": True}
+    if not chunks:
+        # No job will ever report completion, so report it right away
+        _publish_done(run_id, frappe.session.user, total=0, updated=0, failed_chunks=0)
+        return {"started": False, "run_id": run_id, "chunks": 0}
 
+    frappe.cache.set_value(_run_key(run_id, "names"), names, expires_in_sec=BULK_RUN_TTL)
+    state_key = _raw_key(run_id, "state")
+    pipe = frappe.cache.pipeline()
+    pipe.hset(state_key, mapping={"total": len(names), "chunks": chunks, "user": frappe.session.user})
+    pipe.expire(state_key, BULK_RUN_TTL)
+    pipe.execute()
 
-def _bulk_si_job(names, user):
-    from erpnext_moldova_efactura.utils.fiscal_status import determine_fiscal_status
+    for index in range(chunks):
+        _enqueue_chunk(run_id, index)
 
-    total = len(names)
-    updated = 0
+    return {"started": True, "run_id": run_id, "chunks": chunks}
 
-    for idx, name in enumerate(names, start=1):
-        try:
-            si = frappe.get_doc("Sales Invoice", name)
 
-            if si.docstatus != 1:
-                continue
+@frappe.whitelist()
+def resume_bulk_si_job(run_id):
+    """Re-enqueue the chunks of a run that did not finish (failed or lost with their worker)."""
+    state = _read_state(run_id)
+    if not state:
+        frappe.throw(_("Bulk fiscal status run {0} has expired, please start it again.").format(run_id))
 
-            new_status = determine_fiscal_status(si)
+    done = {int(i) for i in frappe.cache.smembers(_run_key(run_id, "done"))}
+    pending = [i for i in range(int(state["chunks"])) if i not in done]
 
-            if new_status and si.fiscal_status != new_status:
-                si.db_set("fiscal_status", new_status, update_modified=False)
-                updated += 1
+    pipe = frappe.cache.pipeline()
+    pipe.delete(_raw_key(run_id, "failed"))
+    pipe.hdel(_raw_key(run_id, "state"), "completed")
+    pipe.execute()
 
-        except Exception:
-            frappe.log_error(
-                frappe.get_traceback(),
-                _("Bulk fiscal status failed for {0}.").format(name),
-            )
+    for index in pending:
+        _enqueue_chunk(run_id, index)
+
+    return {"resumed": len(pending)}
 
-        # publish progress
-        frappe.publish_realtime(
-            event="bulk_si_fiscal_status_progress",
-            message={
-                "current": idx,
-                "total": total,
-            },
-            user=user,
+
+def _enqueue_chunk(run_id, index):
+    frappe.enqueue(
+        method="erpnext_moldova_efactura.api.fiscal_status._bulk_si_chunk_job",
+        queue="long",
+        job_name=f"Bulk Sales Invoice Fiscal Status Actualization ({run_id} #{index + 1})",
+        job_id=f"efactura_bulk_fiscal_status::{run_id}::{index}",
+        deduplicate=True,
+        run_id=run_id,
+        chunk_index=index,
+    )
+
+
+def _bulk_si_chunk_job(run_id, chunk_index):
+    from erpnext_moldova_efactura.utils import efactura_summary
+    from erpnext_moldova_efactura.utils.fiscal_status import update_fiscal_status_bulk
+
+    names = frappe.cache.get_value(_run_key(run_id, "names"), expires=True)
+    if names is None or not _read_state(run_id):
+        # The run expired in Redis (BULK_RUN_TTL); there is nobody left to report to
+        return
+
+    # Checkpoint: a chunk finished by an earlier attempt is not processed again
+    if frappe.cache.sismember(_run_key(run_id, "done"), chunk_index):
+        return
+
+    chunk = names[chunk_index * BULK_JOB_CHUNK_SIZE:(chunk_index + 1) * BULK_JOB_CHUNK_SIZE]
+    try:
+        # The summary rows may be stale; that is what the actualization is meant to fix
+        efactura_summary.refresh(chunk)
+        updated = update_fiscal_status_bulk(chunk)
+        frappe.db.commit()
+        outcome = "done"
+
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(
+            frappe.get_traceback(),
+            _("Bulk fiscal status failed for {0}.").format(", ".join(chunk[:5])),
         )
+        updated = 0
+        outcome = "failed"
+
+    frappe.cache.sadd(_run_key(run_id, outcome), chunk_index)
+
+    state_key = _raw_key(run_id, "state")
+    pipe = frappe.cache.pipeline()
+    pipe.hincrby(state_key, "processed", len(chunk) if outcome == "done" else 0)
+    pipe.hincrby(state_key, "updated", updated)
+    pipe.scard(_raw_key(run_id, "done"))
+    pipe.scard(_raw_key(run_id, "failed"))
+    for key in ("done", "failed"):
+        pipe.expire(_raw_key(run_id, key), BULK_RUN_TTL)
+    processed, _updated, done, failed = pipe.execute()[:4]
+
+    state = _read_state(run_id)
+    if "chunks" not in state:
+        # Expired while this chunk was running
+        return
+
+    if done + failed >= int(state["chunks"]):
+        # Exactly one job reports completion
+        if frappe.cache.execute_command("HSETNX", state_key, "completed", 1):
+            _publish_done(
+                run_id,
+                state.get("user"),
+                total=int(state.get("total") or 0),
+                updated=int(state.get("updated") or 0),
+                failed_chunks=failed,
+            )
+        return
+
+    _publish_progress(run_id, state, processed)
+
 
-    # job done
+def _publish_done(run_id, user, total, updated, failed_chunks):
     frappe.publish_realtime(
         event="bulk_si_fiscal_status_done",
         message={
+            "run_id": run_id,
             "total": total,
             "updated": updated,
+            "failed_chunks": failed_chunks,
         },
         user=user,
-    )
\ No newline at end of file
+    )
+
+
+def _publish_progress(run_id, state, processed):
+    """Publish at most every BULK_PROGRESS_INTERVAL seconds, or when a new BULK_PROGRESS_STEP % is reached."""
+    total = int(state["total"]) or 1
+    step = int(processed * 100 / total) // BULK_PROGRESS_STEP
+
+    pipe = frappe.cache.pipeline()
+    pipe.set(_raw_key(run_id, "progress_throttle"), 1, nx=True, ex=BULK_PROGRESS_INTERVAL)
+    pipe.hsetnx(_raw_key(run_id, "state"), f"step|{step}", 1)
+    interval_due, step_reached = pipe.execute()
+
+    if not (interval_due or step_reached):
+        return
+
+    frappe.publish_realtime(
+        event="bulk_si_fiscal_status_progress",
+        message={
+            "run_id": run_id,
+            "current": processed,
+            "total": total,
+        },
+        user=state["user"],
+    )
+
+
+def _read_state(run_id) -> dict:
+    raw = frappe.cache.execute_command("HGETALL", _raw_key(run_id, "state"))
+    return {frappe.safe_decode(k): frappe.safe_decode(v) for k, v in (raw or {}).items()}
+
+
+def _run_key(run_id, name):
+    # Key for frappe.cache wrapper methods, which add the site prefix themselves
+    return f"efactura:bulk_fiscal_status:{run_id}:{name}"
+
+
+def _raw_key(run_id, name):
+    # Key for raw redis commands and pipelines
+    return frappe.cache.make_key(_run_key(run_id, name))
@@ -1,116 +1,489 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
 import uuid
-from typing import Any, Dict, Optional
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
 
 import frappe
-from frappe import _
 import requests
+from frappe import _
+from frappe.utils import cint
 from zeep import Client, Settings
+from zeep.cache import SqliteCache
 from zeep.exceptions import Fault, TransportError
 from zeep.helpers import serialize_object
 from zeep.transports import Transport
 from zeep.wsse.username import UsernameToken
-from zeep.plugins import HistoryPlugin
-from lxml import etree
+
+from erpnext_moldova_efactura.utils import api_metrics, soap_capture
+from erpnext_moldova_efactura.utils.circuit_breaker import CircuitBreaker
+from erpnext_moldova_efactura.utils.settings import get_settings
 
 
 class EFacturaAPIError(Exception):
     pass
 
 
+class EFacturaCircuitOpenError(EFacturaAPIError):
+    """Raised without contacting e-Factura while the circuit breaker is open."""
+
+
+# Read-only operations which are safe to send again after a transport failure.
+# Post* methods change state on the e-Factura side and are never retried.
+IDEMPOTENT_METHODS = frozenset({
+    "Test",
+    "CheckInvoicesStatus",
+    "SearchInvoices",
+    "GetTaxpayersInfo",
+    "GetBankAccountInfo",
+    "GetInvoicesBySeriaNumber",
+    "GetInvoicesQRcodes",
+    "GetInvoicesContentForPrint",
+    "GetInvoicesForSigning",
+    "GetAcceptedInvoices",
+    "GetRejectedInvoices",
+    "GetLogs",
+})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 1
+    base_delay: float = 0.5  # seconds
+    max_delay: float = 8.0  # seconds
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff after the given (1-based) failed attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+NO_RETRY = RetryPolicy()
+
+
+def _is_transient(e: Exception) -> bool:
+    """Network problems and 5xx/429 responses; SOAP Faults are answers, not outages."""
+    if isinstance(e, Fault):
+        return False
+    if isinstance(e, TransportError):
+        return not e.status_code or e.status_code >= 500 or e.status_code == 429
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(e, httpx.TransportError)
+
+
+# Per-worker registry of ready-to-use clients, keyed by (site, settings fingerprint).
+# Building a client downloads and parses the WSDL, so it is done once per process
+# and reused until eFactura Settings change.
+_client_pool: dict[tuple[str, str], EFacturaAPIClient] = {}
+_client_pool_lock = threading.Lock()
+
+
+WSDL_CACHE_FILENAME = "efactura_wsdl_cache.sqlite"
+
+
+def get_wsdl_cache_path() -> str:
+    """Location of the WSDL/XSD cache: <site>/private/efactura/efactura_wsdl_cache.sqlite"""
+    folder = frappe.get_site_path("private", "efactura")
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, WSDL_CACHE_FILENAME)
+
+
+def clear_wsdl_cache() -> int:
+    """Delete all cached schema documents. Returns the number of removed entries."""
+    path = get_wsdl_cache_path()
+    if not os.path.exists(path):
+        return 0
+
+    conn = sqlite3.connect(path)
+    try:
+        try:
+            removed = conn.execute("DELETE FROM request").rowcount
+        except sqlite3.OperationalError:
+            # Cache file exists but zeep has not created its table yet
+            removed = 0
+        conn.commit()
+    finally:
+        conn.close()
+
+    return removed
+
+
+class _WSDLCache(SqliteCache):
+    """zeep SqliteCache which can also return entries past their TTL."""
+
+    def get_stale(self, url):
+        with self.db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT data FROM request WHERE url = ?", (url,))
+            rows = cursor.fetchall()
+
+        if rows:
+            return self._decode_data(rows[0][0])
+        return None
+
+
+class _StaleFallbackMixin:
+    """
+    Serves WSDL/XSD documents from the on-disk cache.
+    When the TTL has expired and e-Factura cannot be reached, the stale copy is
+    used instead of failing the whole client construction.
+    """
+
+    _offline_errors: tuple = (requests.RequestException, TransportError)
+
+    def load(self, url):
+        try:
+            return super().load(url)
+        except self._offline_errors:
+            content = self.cache.get_stale(url) if isinstance(self.cache, _WSDLCache) else None
+            if content is None:
+                raise
+            return content
+
+
+# Raw request/response bytes of the SOAP exchange currently in progress.
+# A ContextVar works for both the thread pool (copied contexts) and asyncio tasks.
+_current_exchange: contextvars.ContextVar[dict | None] = contextvars.ContextVar(
+    "efactura_soap_exchange", default=None
+)
+
+
+def _capture_exchange(message, response):
+    exchange = _current_exchange.get()
+    if exchange is None:
+        return
+    exchange["request"] = message
+    exchange["response"] = getattr(response, "content", None)
+
+
+class _InstrumentedTransport(Transport):
+    def post(self, address, message, headers):
+        response = super().post(address, message, headers)
+        _capture_exchange(message, response)
+        return response
+
+
+class _CachedTransport(_StaleFallbackMixin, _InstrumentedTransport):
+    pass
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _merge_results(a, b):
+    """
+    Merge the Results/Result part of two chunk responses:
+    lists under the same key are concatenated (single items count as lists);
+    non-dict results are collected into a list.
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+
+    if isinstance(a, dict) and isinstance(b, dict):
+        merged = dict(a)
+        for key, value in b.items():
+            if value is None:
+                continue
+            if merged.get(key) is None:
+                merged[key] = value
+            else:
+                merged[key] = _as_list(merged[key]) + _as_list(value)
+        return merged
+
+    return _as_list(a) + _as_list(b)
+
+
+def _merge_batch_responses(responses: list[dict]) -> dict[str, Any]:
+    """Combine responses of a chunked batch call into the shape of a single response."""
+    if len(responses) == 1:
+        return responses[0]
+
+    merged: dict[str, Any] = {}
+    for resp in responses:
+        for key, value in (resp or {}).items():
+            if key in ("Results", "Result"):
+                merged[key] = _merge_results(merged.get(key), value)
+            elif not merged.get(key):
+                # RequestId, ErrorMessage, ...: keep the first meaningful value
+                merged[key] = value
+
+    return merged
+
+
+def _settings_fingerprint(config: dict) -> str:
+    raw = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _bind_service(client, service_name=None, port_name=None):
+    # --- Pick service/port ---
+    services = client.wsdl.services
+    if not services:
+        raise RuntimeError("No SOAP services found in WSDL.")
+
+    if not service_name:
+        service_name = next(iter(services.keys()))
+    service = services.get(service_name)
+    if not service:
+        raise RuntimeError(f"Service '{service_name}' not found in WSDL. Available: {list(services.keys())}")
+
+    if not port_name:
+        port_name = next(iter(service.ports.keys()))
+    if port_name not in service.ports:
+        raise RuntimeError(f"Port '{port_name}' not found in service '{service_name}'. Available: {list(service.ports.keys())}")
+
+    bound = client.bind(service_name, port_name)
+
+    # Fallback (should not be needed, but safe)
+    if bound is None:
+        bound = client.service
+
+    return bound
+
+
+def _to_api_error(method_name: str, e: Exception) -> EFacturaAPIError:
+    if isinstance(e, Fault):
+        return EFacturaAPIError(f"SOAP Fault in {method_name}: {e.message or str(e)}")
+    if isinstance(e, TransportError):
+        return EFacturaAPIError(f"Transport error in {method_name}: {e!s}")
+    return EFacturaAPIError(f"Unexpected error in {method_name}: {e!s}")
+
+
+def clear_client_pool(site: str | None = None):
+    """Drop pooled clients of the given site (current site by default)."""
+    site = site or getattr(frappe.local, "site", None)
+    with _client_pool_lock:
+        for key in [k for k in _client_pool if k[0] == site]:
+            _client_pool.pop(key, None)
+
+
 class EFacturaAPIClient:
     """
     e-Factura SOAP client
     Authentication via HTTP Basic Auth (requests.Session.auth)
     """
 
-    def __init__(self, wsdl_url, username, password, timeout=20, verify_tls=True, service_name=None, port_name=None):
+    def __init__(
+        self,
+        wsdl_url,
+        username,
+        password,
+        timeout=20,
+        verify_tls=True,
+        service_name=None,
+        port_name=None,
+        wsdl_cache_path=None,
+        wsdl_cache_ttl=None,
+        batch_chunk_size=100,
+        max_workers=4,
+        retry_policies=None,
+        breaker_threshold=5,
+        breaker_cooldown=60,
+        capture=None,
+    ):
         self.wsdl_url = wsdl_url.rstrip("?wsdl") + "?wsdl"
         self.username = username
         self.password = password
+        self.batch_chunk_size = batch_chunk_size
+        self.max_workers = max(1, max_workers or 1)
+        self._init_resilience(retry_policies, breaker_threshold, breaker_cooldown)
+        # {"latency_ms", "sample_rate", "max_bytes", "ring_size"} or None when capture is off
+        self.capture = capture
 
         session = requests.Session()
         # session.auth = HTTPBasicAuth(username, password)
         session.verify = verify_tls
         session.headers.update({"User-Agent": "erpnext-moldova-efactura/1.0"})
 
-        transport = Transport(session=session, timeout=timeout)
+        if wsdl_cache_path:
+            cache = _WSDLCache(path=wsdl_cache_path, timeout=wsdl_cache_ttl or 3600)
+            transport = _CachedTransport(session=session, timeout=timeout, cache=cache)
+        else:
+            transport = _InstrumentedTransport(session=session, timeout=timeout)
         wsse = UsernameToken(username, password, use_digest=False)
         settings = Settings(strict=False, xml_huge_tree=True)
 
-        history = HistoryPlugin()
-
-        client = Client(
-            wsdl=wsdl_url,
-            transport=transport,
-            settings=settings,
-            wsse=wsse,
-            plugins=[history],
-        )
-
-        self._history = history
-
-        # client = Client(wsdl=wsdl_url, transport=transport, settings=settings, wsse=wsse)
+        client = Client(wsdl=wsdl_url, transport=transport, settings=settings, wsse=wsse)
 
-        # --- Pick service/port ---
-        services = client.wsdl.services
-        if not services:
-            raise RuntimeError("No SOAP services found in WSDL.")
-
-        if not service_name:
-            service_name = next(iter(services.keys()))
-        service = services.get(service_name)
-        if not service:
-            raise RuntimeError(f"Service '{service_name}' not found in WSDL. Available: {list(services.keys())}")
+        self._client = client
+        self.service = _bind_service(client, service_name, port_name)
 
-        if not port_name:
-            port_name = next(iter(service.ports.keys()))
-        if port_name not in service.ports:
-            raise RuntimeError(f"Port '{port_name}' not found in service '{service_name}'. Available: {list(service.ports.keys())}")
 
-        self._client = client
-        self.service = client.bind(service_name, port_name)
+    def _init_resilience(self, retry_policies, breaker_threshold, breaker_cooldown):
+        # {method: (max_attempts, base_delay_ms, max_delay_ms)}; only idempotent methods are kept
+        self.retry_policies = {
+            method: RetryPolicy(
+                max_attempts=max(1, cint(attempts)),
+                base_delay=(base_ms or 0) / 1000,
+                max_delay=(max_ms or base_ms or 0) / 1000,
+            )
+            for method, (attempts, base_ms, max_ms) in (retry_policies or {}).items()
+            if method in IDEMPOTENT_METHODS
+        }
+        self.breaker = CircuitBreaker(threshold=breaker_threshold, cooldown=breaker_cooldown)
 
-        # Fallback (should not be needed, but safe)
-        if self.service is None:
-            self.service = client.service
+    def _retry_policy(self, method_name: str) -> RetryPolicy:
+        return self.retry_policies.get(method_name, NO_RETRY)
 
+    def _check_breaker(self, method_name: str):
+        if not self.breaker.allow_request():
+            raise EFacturaCircuitOpenError(
+                f"e-Factura is unavailable (circuit breaker open), {method_name} was not sent"
+            )
 
-    def _dump_soap_envelope(self, label: str, envelope):
-        if envelope is None:
+    def _after_exchange(self, method_name: str, started: float, exchange: dict, error: Exception | None):
+        """Record latency and payload size of one SOAP round-trip."""
+        latency_ms = (time.perf_counter() - started) * 1000
+        try:
+            api_metrics.record_call(
+                method_name,
+                latency_ms,
+                bytes_sent=len(exchange.get("request") or b""),
+                bytes_received=len(exchange.get("response") or b""),
+                error_class=type(error).__name__ if error else None,
+            )
+        except Exception:
+            # Metrics must never break the API call itself
+            pass
+
+        if self.capture:
+            self._maybe_capture(method_name, latency_ms, exchange, error)
+
+    def _maybe_capture(self, method_name: str, latency_ms: float, exchange: dict, error: Exception | None):
+        """Tail sampling: keep envelopes only of failed, slow or 1-in-N sampled calls."""
+        cfg = self.capture
+
+        if error is not None:
+            reason = soap_capture.FAULT
+        elif cfg.get("latency_ms") and latency_ms >= cfg["latency_ms"]:
+            reason = soap_capture.SLOW
+        elif cfg.get("sample_rate") and random.randrange(cfg["sample_rate"]) == 0:
+            reason = soap_capture.SAMPLED
+        else:
             return
+
         try:
-            xml_str = etree.tostring(
-                envelope,
-                pretty_print=True,
-                encoding="unicode",
+            soap_capture.capture(
+                method_name,
+                reason,
+                latency_ms,
+                request=exchange.get("request"),
+                response=exchange.get("response"),
+                error=f"{type(error).__name__}: {error}" if error else None,
+                max_bytes=cfg.get("max_bytes") or 0,
+                ring_size=cfg.get("ring_size") or 500,
             )
-            frappe.log_error(f"{label}", xml_str)
-        except Exception as e:
-            frappe.log_error(f"{label}: failed to dump xml", str(e))
+        except Exception:
+            pass
 
+    def _record_outcome(self, e: Exception | None) -> bool:
+        """Update the circuit breaker; returns True when the error is worth retrying."""
+        if e is None or not _is_transient(e):
+            self.breaker.record_success()
+            return False
 
-    @classmethod
-    def from_settings(cls):
-        s = frappe.get_single("eFactura Settings")
+        self.breaker.record_failure(e)
+        return True
 
-        wsdl_url = getattr(s, "api_wsdl_url", None) or getattr(s, "api_url", None)
+    @classmethod
+    def from_settings(cls, pooled: bool = True):
+        """
+        Return a client configured from eFactura Settings.
+        By default the client is taken from the per-worker pool, so the WSDL is
+        parsed and the HTTP session opened only once per settings fingerprint.
+        """
+        config = cls._config_from_settings()
+        if not pooled:
+            return cls(**config)
+
+        site = getattr(frappe.local, "site", None)
+        key = (site, _settings_fingerprint(config))
+
+        client = _client_pool.get(key)
+        if client is not None:
+            return client
+
+        with _client_pool_lock:
+            client = _client_pool.get(key)
+            if client is None:
+                client = cls(**config)
+                # Settings changed: forget clients built from the previous fingerprint
+                for stale in [k for k in _client_pool if k[0] == site]:
+                    _client_pool.pop(stale, None)
+                _client_pool[key] = client
+
+        return client
+
+    @staticmethod
+    def _config_from_settings() -> dict:
+        s = get_settings()
+
+        wsdl_url = s.api_wsdl_url or s.api_url
         if not wsdl_url:
             frappe.throw(_("eFactura Settings: api_wsdl_url is not set."))
 
-        username = getattr(s, "api_username", None)
-        password = getattr(s, "api_password", None)
+        username = s.api_username
+        password = s.api_password
         if not username or not password:
             frappe.throw(_("eFactura Settings: API username/password are not set."))
 
-        timeout = int(getattr(s, "api_timeout_seconds", 20) or 20)
-        verify_tls = bool(getattr(s, "api_verify_tls", 1))
+        timeout = s.api_timeout_seconds or 20
+        verify_tls = s.api_verify_tls
+
+        service_name = s.api_service_name  # optional
+        port_name = s.api_port_name        # optional
 
-        service_name = getattr(s, "api_service_name", None)  # optional
-        port_name = getattr(s, "api_port_name", None)        # optional
+        wsdl_cache_path = None
+        wsdl_cache_ttl = None
+        if s.wsdl_cache_enabled:
+            wsdl_cache_path = get_wsdl_cache_path()
+            wsdl_cache_ttl = (s.wsdl_cache_ttl_hours or 24) * 3600
 
-        return cls(
+        batch_chunk_size = s.api_batch_chunk_size or 100
+        max_workers = s.api_max_parallel_requests or 4
+
+        # Default policy for every idempotent method, overridden per method by the table
+        default_attempts = s.api_retry_attempts or 1
+        default_base_ms = s.api_retry_base_delay_ms
+        retry_policies = {
+            method: (default_attempts, default_base_ms, 8000) for method in IDEMPOTENT_METHODS
+        }
+        for row in s.retry_policies:
+            retry_policies[row.method] = (row.max_attempts or 1, row.base_delay_ms, row.max_delay_ms)
+
+        capture = None
+        if s.soap_capture_enabled:
+            capture = {
+                "latency_ms": s.soap_capture_latency_ms,
+                "sample_rate": s.soap_capture_sample_rate,
+                "max_bytes": s.soap_capture_max_kb * 1024,
+                "ring_size": s.soap_capture_ring_size or 500,
+            }
+
+        return dict(
             wsdl_url=wsdl_url,
             username=username,
             password=password,
@@ -118,55 +491,102 @@ class EFacturaAPIClient:
             verify_tls=verify_tls,
             service_name=service_name,
             port_name=port_name,
+            wsdl_cache_path=wsdl_cache_path,
+            wsdl_cache_ttl=wsdl_cache_ttl,
+            batch_chunk_size=batch_chunk_size,
+            max_workers=max_workers,
+            retry_policies=retry_policies,
+            breaker_threshold=s.circuit_breaker_threshold,
+            breaker_cooldown=s.circuit_breaker_cooldown_seconds or 60,
+            capture=capture,
         )
 
     def _new_request_id(self) -> str:
         return str(uuid.uuid4())
 
-    def _call(self, method_name: str, request: Optional[dict] = None, **kwargs) -> Dict[str, Any]:
+    def _call(self, method_name: str, request: dict | None = None, **kwargs) -> dict[str, Any]:
         # try:
         method = getattr(self.service, method_name)
         # except AttributeError as e:
             # raise EFacturaAPIError(f"Unknown SOAP method: {method_name}") from e
 
-        try:
-            if request is not None:
-                resp = method(request, **kwargs)
-            else:
-                resp = method(**kwargs)
-
-            return serialize_object(resp, dict)
-
-        except Fault as e:
-            raise EFacturaAPIError(
-                f"SOAP Fault in {method_name}: {e.message or str(e)}"
-            ) from e
-        except TransportError as e:
-            raise EFacturaAPIError(
-                f"Transport error in {method_name}: {str(e)}"
-            ) from e
-        except Exception as e:
-            raise EFacturaAPIError(
-                f"Unexpected error in {method_name}: {str(e)}"
-            ) from e
-        # finally:
-        #     # dump last SOAP request/response (even if fault)
-        #     sent = getattr(self._history, "last_sent", None)
-        #     received = getattr(self._history, "last_received", None)
-
-        #     if sent and "envelope" in sent:
-        #         self._dump_soap_envelope("eFactura SOAP REQUEST", sent["envelope"])
-        #     if received and "envelope" in received:
-        #         self._dump_soap_envelope("eFactura SOAP RESPONSE", received["envelope"])
+        policy = self._retry_policy(method_name)
+        attempt = 0
+
+        while True:
+            attempt += 1
+            self._check_breaker(method_name)
+
+            exchange = {}
+            token = _current_exchange.set(exchange)
+            started = time.perf_counter()
+            try:
+                if request is not None:
+                    resp = method(request, **kwargs)
+                else:
+                    resp = method(**kwargs)
+
+                result = serialize_object(resp, dict)
+
+            except Exception as e:
+                self._after_exchange(method_name, started, exchange, e)
+                if self._record_outcome(e) and attempt < policy.max_attempts:
+                    time.sleep(policy.backoff(attempt))
+                    continue
+                raise _to_api_error(method_name, e) from e
+            finally:
+                _current_exchange.reset(token)
+
+            self._after_exchange(method_name, started, exchange, None)
+            self._record_outcome(None)
+            return result
+
+    def _call_batch(
+        self,
+        method_name: str,
+        seria_and_numbers,
+        build_request: Callable[[list, str], dict],
+        request_id: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Call a batch method taking a SeriaAndNumbers list.
+        Lists longer than batch_chunk_size are split into chunks which are sent on a
+        bounded thread pool; the responses are merged back into one response.
+        """
+        items = _as_list(seria_and_numbers)
+        size = self.batch_chunk_size
+
+        if not size or len(items) <= size:
+            return self._call(method_name, request=build_request(items, request_id or self._new_request_id()))
+
+        chunks = [items[i : i + size] for i in range(0, len(items), size)]
+        chunk_requests = [
+            build_request(chunk, (request_id if idx == 0 and request_id else self._new_request_id()))
+            for idx, chunk in enumerate(chunks)
+        ]
+
+        workers = min(self.max_workers, len(chunks))
+        if workers <= 1:
+            responses = [self._call(method_name, request=req) for req in chunk_requests]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="efactura-api") as pool:
+                # copy_context() keeps frappe.local (site, cache prefix) visible inside the workers
+                futures = [
+                    pool.submit(contextvars.copy_context().run, self._call, method_name, req)
+                    for req in chunk_requests
+                ]
+                responses = [f.result() for f in futures]
+
+        return _merge_batch_responses(responses)
 
     # -------------------------
     # API methods
     # -------------------------
 
-    def test(self, message: str) -> Dict[str, Any]:
+    def test(self, message: str) -> dict[str, Any]:
         return self._call("Test", request=None, message=message)
 
-    def get_taxpayers_info(self, fiscal_codes: list[str], request_id: Optional[str] = None) -> Dict[str, Any]:
+    def get_taxpayers_info(self, fiscal_codes: list[str], request_id: str | None = None) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "FiscalCodes": {"string": fiscal_codes},
@@ -175,10 +595,10 @@ class EFacturaAPIClient:
 
     def get_bank_account_info(
         self,
-        idno: Optional[str] = None,
-        account_number: Optional[str] = None,
-        request_id: Optional[str] = None,
-    ) -> Dict[str, Any]:
+        idno: str | None = None,
+        account_number: str | None = None,
+        request_id: str | None = None,
+    ) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "IDNO": idno,
@@ -189,11 +609,11 @@ class EFacturaAPIClient:
     def get_series_and_numbers(
         self,
         count: int,
-        start_number: Optional[int] = None,
-        invoice_type: Optional[int] = None,
-        series: Optional[str] = None,
-        request_id: Optional[str] = None,
-    ) -> Dict[str, Any]:
+        start_number: int | None = None,
+        invoice_type: int | None = None,
+        series: str | None = None,
+        request_id: str | None = None,
+    ) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "Count": count,
@@ -203,43 +623,56 @@ class EFacturaAPIClient:
         }
         return self._call("GetSeriaAndNumbers", request=req)
 
-    def get_invoices_qrcodes(self, seria_and_numbers: list[dict], request_id: Optional[str] = None) -> Dict[str, Any]:
-        req = {
-            "RequestId": request_id or self._new_request_id(),
-            "SeriaAndNumbers": {"InvoiceIndentificator": seria_and_numbers},
-        }
-        return self._call("GetInvoicesQRcodes", request=req)
+    def get_invoices_qrcodes(self, seria_and_numbers: list[dict], request_id: str | None = None) -> dict[str, Any]:
+        def build(chunk, chunk_request_id):
+            return {
+                "RequestId": chunk_request_id,
+                "SeriaAndNumbers": {"InvoiceIndentificator": chunk},
+            }
+
+        return self._call_batch("GetInvoicesQRcodes", seria_and_numbers, build, request_id)
 
     def get_invoices_content_for_print(
         self,
         seria_and_numbers: list[dict],
-        actor_role: Optional[int] = 0,
-        orientation: Optional[int] = 0,
-        request_id: Optional[str] = None,
-    ) -> Dict[str, Any]:
-        req = {
-            "RequestId": request_id or self._new_request_id(),
-            "SeriaAndNumbers": {"InvoiceIndentificator": seria_and_numbers},
-            "ActorRole": actor_role,
-            "Orientation": orientation,
-        }
-        return self._call("GetInvoicesContentForPrint", request=req)
-
-    def get_invoices_by_seria_number(self, seria_and_numbers: list[dict], request_id: Optional[str] = None) -> Dict[str, Any]:
-        req = {
-            "RequestId": request_id or self._new_request_id(),
-            "SeriaAndNumbers": {"InvoiceIndentificator": seria_and_numbers},
-        }
-        return self._call("GetInvoicesBySeriaNumber", request=req)
-
-    def check_invoices_status(self, seria_and_numbers: list[dict], request_id: Optional[str] = None) -> Dict[str, Any]:
-        req = {
-            "RequestId": request_id or self._new_request_id(),
-            "SeriaAndNumbers": {"InvoiceIndentificator": seria_and_numbers},
-        }
-        return self._call("CheckInvoicesStatus", request=req)
-
-    def get_invoices_for_signing(self, actor_role: int, order: int, request_id: Optional[str] = None) -> Dict[str, Any]:
+        actor_role: int | None = 0,
+        orientation: int | None = 0,
+        request_id: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        When the list is split into several requests, Result.Content of the merged
+        response is a list with one document per chunk.
+        """
+
+        def build(chunk, chunk_request_id):
+            return {
+                "RequestId": chunk_request_id,
+                "SeriaAndNumbers": {"InvoiceIndentificator": chunk},
+                "ActorRole": actor_role,
+                "Orientation": orientation,
+            }
+
+        return self._call_batch("GetInvoicesContentForPrint", seria_and_numbers, build, request_id)
+
+    def get_invoices_by_seria_number(self, seria_and_numbers: list[dict], request_id: str | None = None) -> dict[str, Any]:
+        def build(chunk, chunk_request_id):
+            return {
+                "RequestId": chunk_request_id,
+                "SeriaAndNumbers": {"InvoiceIndentificator": chunk},
+            }
+
+        return self._call_batch("GetInvoicesBySeriaNumber", seria_and_numbers, build, request_id)
+
+    def check_invoices_status(self, seria_and_numbers: list[dict], request_id: str | None = None) -> dict[str, Any]:
+        def build(chunk, chunk_request_id):
+            return {
+                "RequestId": chunk_request_id,
+                "SeriaAndNumbers": {"InvoiceIndentificator": chunk},
+            }
+
+        return self._call_batch("CheckInvoicesStatus", seria_and_numbers, build, request_id)
+
+    def get_invoices_for_signing(self, actor_role: int, order: int, request_id: str | None = None) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "ActorRole": actor_role,
@@ -247,35 +680,35 @@ class EFacturaAPIClient:
         }
         return self._call("GetInvoicesForSigning", request=req)
 
-    def get_accepted_invoices(self, actor_role: int, request_id: Optional[str] = None) -> Dict[str, Any]:
+    def get_accepted_invoices(self, actor_role: int, request_id: str | None = None) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "ActorRole": actor_role,
         }
         return self._call("GetAcceptedInvoices", request=req)
 
-    def get_rejected_invoices(self, actor_role: int, request_id: Optional[str] = None) -> Dict[str, Any]:
+    def get_rejected_invoices(self, actor_role: int, request_id: str | None = None) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "ActorRole": actor_role,
         }
         return self._call("GetRejectedInvoices", request=req)
 
-    def post_accepted_invoices(self, seria_and_numbers: list[dict], request_id: Optional[str] = None) -> Dict[str, Any]:
+    def post_accepted_invoices(self, seria_and_numbers: list[dict], request_id: str | None = None) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "SeriaAndNumbers": {"InvoiceIndentificator": seria_and_numbers},
         }
         return self._call("PostAcceptedInvoices", request=req)
 
-    def post_rejected_invoices(self, invoices_comments: list[dict], request_id: Optional[str] = None) -> Dict[str, Any]:
+    def post_rejected_invoices(self, invoices_comments: list[dict], request_id: str | None = None) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "InvoicesComments": {"InvoiceComment": invoices_comments},
         }
         return self._call("PostRejectedInvoices", request=req)
 
-    def post_canceled_invoices(self, invoices_comments: list[dict], request_id: Optional[str] = None) -> Dict[str, Any]:
+    def post_canceled_invoices(self, invoices_comments: list[dict], request_id: str | None = None) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "InvoicesComments": {"InvoiceComment": invoices_comments},
@@ -287,9 +720,9 @@ class EFacturaAPIClient:
         actor_role: int,
         invoices_xml: str,
         invoices_xml_status: int,
-        attachment: Optional[dict] = None,
-        request_id: Optional[str] = None,
-    ) -> Dict[str, Any]:
+        attachment: dict | None = None,
+        request_id: str | None = None,
+    ) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "ActorRole": actor_role,
@@ -304,9 +737,9 @@ class EFacturaAPIClient:
         actor_role: int,
         invoices_xml: str,
         invoices_xml_status: int,
-        attachment: Optional[dict],
-        request_id: Optional[str] = None,
-    ) -> Dict[str, Any]:
+        attachment: dict | None,
+        request_id: str | None = None,
+    ) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "ActorRole": actor_role,
@@ -316,7 +749,7 @@ class EFacturaAPIClient:
         }
         return self._call("PostInvoicesWithAttachment", request=req)
 
-    def search_invoices(self, actor_role: int, parameters: dict, request_id: Optional[str] = None) -> Dict[str, Any]:
+    def search_invoices(self, actor_role: int, parameters: dict, request_id: str | None = None) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "ActorRole": actor_role,
@@ -324,10 +757,171 @@ class EFacturaAPIClient:
         }
         return self._call("SearchInvoices", request=req)
 
-    def get_logs(self, date_from, date_to, request_id: Optional[str] = None) -> Dict[str, Any]:
+    def get_logs(self, date_from, date_to, request_id: str | None = None) -> dict[str, Any]:
         req = {
             "RequestId": request_id or self._new_request_id(),
             "From": date_from,
             "To": date_to,
         }
         return self._call("GetLogs", request=req)
+
+
+class AsyncEFacturaAPIClient(EFacturaAPIClient):
+    """
+    asyncio variant of EFacturaAPIClient built on zeep's AsyncClient (httpx).
+
+    Exposes the same API methods; every call returns a coroutine. At most
+    max_concurrency SOAP requests are in flight at once.
+
+        async with AsyncEFacturaAPIClient.from_settings() as client:
+            results = await asyncio.gather(*(client.search_invoices(1, p) for p in params))
+    """
+
+    def __init__(
+        self,
+        wsdl_url,
+        username,
+        password,
+        timeout=20,
+        verify_tls=True,
+        service_name=None,
+        port_name=None,
+        wsdl_cache_path=None,
+        wsdl_cache_ttl=None,
+        batch_chunk_size=100,
+        max_workers=4,
+        retry_policies=None,
+        breaker_threshold=5,
+        breaker_cooldown=60,
+        capture=None,
+        max_concurrency=20,
+    ):
+        import httpx
+        from zeep import AsyncClient
+        from zeep.transports import AsyncTransport
+
+        class _InstrumentedAsyncTransport(AsyncTransport):
+            async def post(self, address, message, headers):
+                response = await super().post(address, message, headers)
+                _capture_exchange(message, response)
+                return response
+
+        class _CachedAsyncTransport(_StaleFallbackMixin, _InstrumentedAsyncTransport):
+            _offline_errors = (httpx.HTTPError, TransportError)
+
+        self.wsdl_url = wsdl_url.rstrip("?wsdl") + "?wsdl"
+        self.username = username
+        self.password = password
+        self.batch_chunk_size = batch_chunk_size
+        self.max_workers = max(1, max_workers or 1)
+        self._init_resilience(retry_policies, breaker_threshold, breaker_cooldown)
+        # {"latency_ms", "sample_rate", "max_bytes", "ring_size"} or None when capture is off
+        self.capture = capture
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency or 1))
+
+        headers = {"User-Agent": "erpnext-moldova-efactura/1.0"}
+        http_client = httpx.AsyncClient(verify=verify_tls, timeout=timeout, headers=headers)
+        # WSDL/XSD are loaded synchronously while the client is constructed
+        wsdl_client = httpx.Client(verify=verify_tls, timeout=timeout, headers=headers)
+
+        if wsdl_cache_path:
+            cache = _WSDLCache(path=wsdl_cache_path, timeout=wsdl_cache_ttl or 3600)
+            transport = _CachedAsyncTransport(client=http_client, wsdl_client=wsdl_client, cache=cache)
+        else:
+            transport = _InstrumentedAsyncTransport(client=http_client, wsdl_client=wsdl_client)
+
+        client = AsyncClient(
+            wsdl=wsdl_url,
+            transport=transport,
+            settings=Settings(strict=False, xml_huge_tree=True),
+            wsse=UsernameToken(username, password, use_digest=False),
+        )
+
+        self._transport = transport
+        self._client = client
+        self.service = _bind_service(client, service_name, port_name)
+
+    @classmethod
+    def from_settings(cls, max_concurrency: int | None = None):
+        """Async clients are bound to an event loop, so they are never pooled."""
+        config = cls._config_from_settings()
+        config["max_concurrency"] = max_concurrency or get_settings().api_async_concurrency or 20
+        return cls(**config)
+
+    async def aclose(self):
+        await self._transport.aclose()
+        self._transport.wsdl_client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def _call(self, method_name: str, request: dict | None = None, **kwargs) -> dict[str, Any]:
+        method = getattr(self.service, method_name)
+        policy = self._retry_policy(method_name)
+        attempt = 0
+
+        while True:
+            attempt += 1
+            self._check_breaker(method_name)
+
+            exchange = {}
+            token = _current_exchange.set(exchange)
+            try:
+                async with self._semaphore:
+                    # Latency of the exchange itself, not of the wait for a free slot
+                    started = time.perf_counter()
+                    if request is not None:
+                        resp = await method(request, **kwargs)
+                    else:
+                        resp = await method(**kwargs)
+
+                result = serialize_object(resp, dict)
+
+            except Exception as e:
+                self._after_exchange(method_name, started, exchange, e)
+                if self._record_outcome(e) and attempt < policy.max_attempts:
+                    # Sleep outside the semaphore so other requests keep flowing
+                    await asyncio.sleep(policy.backoff(attempt))
+                    continue
+                raise _to_api_error(method_name, e) from e
+            finally:
+                _current_exchange.reset(token)
+
+            self._after_exchange(method_name, started, exchange, None)
+            self._record_outcome(None)
+            return result
+
+    async def _call_batch(
+        self,
+        method_name: str,
+        seria_and_numbers,
+        build_request: Callable[[list, str], dict],
+        request_id: str | None = None,
+    ) -> dict[str, Any]:
+        """Chunked batch call; chunks run concurrently under the client's semaphore."""
+        items = _as_list(seria_and_numbers)
+        size = self.batch_chunk_size
+
+        if not size or len(items) <= size:
+            return await self._call(method_name, request=build_request(items, request_id or self._new_request_id()))
+
+        chunks = [items[i : i + size] for i in range(0, len(items), size)]
+        responses = await asyncio.gather(
+            *(
+                self._call(
+                    method_name,
+                    request=build_request(chunk, (request_id if idx == 0 and request_id else self._new_request_id())),
+                )
+                for idx, chunk in enumerate(chunks)
+            )
+        )
+
+        return _merge_batch_responses(list(responses))
+
+
+def run_async(coro):
+    """Run a coroutine from synchronous code (scheduler jobs, whitelisted methods)."""
+    return asyncio.run(coro)
@@ -0,0 +1,149 @@
+"""
+Query plan benchmark for the eFactura sync and lookup queries.
+
+Builds a scratch copy of tabeFactura (same columns and indexes) filled with synthetic
+rows, runs EXPLAIN and times each hot-path query with the app indexes and with them
+ignored, then drops the copy. Nothing is written to tabeFactura itself: app indexes
+missing there are reported (bench migrate creates them) and added to the copy only.
+
+    bench --site <site> execute erpnext_moldova_efactura.benchmarks.sync_query_plan.run --kwargs "{'rows': 1000000}"
+"""
+
+import time
+
+import frappe
+
+from erpnext_moldova_efactura.install import EFACTURA_INDEXES, SERIES_NUMBER_CONSTRAINT
+
+BENCH_TABLE = "tabeFactura Index Benchmark"
+DEFAULT_ROWS = 1_000_000
+
+QUERIES = {
+	"status sync queue": """
+        SELECT name, ef_series, ef_number, ef_status, next_status_check
+        FROM `{table}` {hint}
+        WHERE docstatus = 1
+            AND ef_status IN (0, 1, 3, 7, 9)
+            AND ef_series IS NOT NULL AND ef_series != ''
+            AND ef_number IS NOT NULL AND ef_number != ''
+            AND (next_status_check IS NULL OR next_status_check <= NOW())
+        ORDER BY CASE WHEN next_status_check IS NULL THEN 0 ELSE 1 END, next_status_check, name
+        LIMIT 1000
+    """,
+	"draft sync": """
+        SELECT name, ef_status, posting_date, last_status_check
+        FROM `{table}` {hint}
+        WHERE docstatus = 1 AND ef_status = 0
+            AND (ef_series IS NULL OR ef_series = '')
+        ORDER BY CASE WHEN last_status_check IS NULL THEN 0 ELSE 1 END, last_status_check
+        LIMIT 50
+    """,
+	"series/number lookup": """
+        SELECT name, ef_status
+        FROM `{table}` {hint}
+        WHERE ef_series = 'BNC' AND ef_number = '500000'
+    """,
+	"eFacturas of a Sales Invoice": """
+        SELECT name, status, total
+        FROM `{table}` {hint}
+        WHERE reference_doctype = 'Sales Invoice' AND reference_name = 'BENCH-SINV-250000'
+            AND docstatus != 2
+    """,
+}
+
+
+def run(rows: int = DEFAULT_ROWS) -> dict:
+	"""Returns {"missing_indexes": [...], "queries": [{query, mode, type, key, rows, extra, ms}]}."""
+	app_indexes = {name: columns for doctype, name, columns in EFACTURA_INDEXES if doctype == "eFactura"}
+	app_indexes[SERIES_NUMBER_CONSTRAINT] = ("ef_series", "ef_number")
+	missing = sorted(set(app_indexes) - _index_names("tabeFactura"))
+
+	_create_bench_table(int(rows), {name: app_indexes[name] for name in missing})
+	try:
+		index_names = sorted(_index_names(BENCH_TABLE) & set(app_indexes))
+
+		report = []
+		for label, query in QUERIES.items():
+			for mode, hint in (
+				("indexed", ""),
+				("without app indexes", f"IGNORE INDEX ({', '.join(index_names)})" if index_names else ""),
+			):
+				sql = query.format(table=BENCH_TABLE, hint=hint)
+				plan = frappe.db.sql(f"EXPLAIN {sql}", as_dict=True)[0]
+
+				started = time.perf_counter()
+				frappe.db.sql(sql)
+				elapsed_ms = (time.perf_counter() - started) * 1000
+
+				report.append(
+					{
+						"query": label,
+						"mode": mode,
+						"type": plan.get("type"),
+						"key": plan.get("key"),
+						"rows": plan.get("rows"),
+						"extra": plan.get("Extra"),
+						"ms": round(elapsed_ms, 1),
+					}
+				)
+	finally:
+		frappe.db.sql_ddl(f"DROP TABLE IF EXISTS `{BENCH_TABLE}`")
+
+	logger = frappe.logger("erpnext_moldova_efactura")
+	if missing:
+		logger.warning(f"eFactura query plan benchmark: indexes missing on tabeFactura: {', '.join(missing)}")
+	for row in report:
+		logger.info(
+			f"{row['query']:<30} {row['mode']:<20} type={row['type']!s:<6} key={row['key'] or '-':<30} "
+			f"rows={row['rows']!s:<9} {row['ms']:>8} ms  {row['extra'] or ''}"
+		)
+
+	return {"missing_indexes": missing, "queries": report}
+
+
+def _index_names(table: str) -> set:
+	return {row.Key_name for row in frappe.db.sql(f"SHOW INDEX FROM `{table}`", as_dict=True)}
+
+
+def _create_bench_table(rows: int, extra_indexes: dict):
+	frappe.db.sql_ddl(f"DROP TABLE IF EXISTS `{BENCH_TABLE}`")
+	frappe.db.sql_ddl(f"CREATE TABLE `{BENCH_TABLE}` LIKE `tabeFactura`")
+	for name, columns in extra_indexes.items():
+		frappe.db.sql_ddl(
+			f"ALTER TABLE `{BENCH_TABLE}` ADD INDEX `{name}` ({', '.join(f'`{c}`' for c in columns)})"
+		)
+
+	# 10^k row generator from a cross join of digit tables
+	digits = (
+		"(SELECT 0 d UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4 "
+		"UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9)"
+	)
+	powers = max(1, len(str(max(rows - 1, 1))))
+	joins = " CROSS JOIN ".join(f"{digits} d{i}" for i in range(powers))
+	seq = " + ".join(f"d{i}.d * {10**i}" for i in range(powers))
+
+	frappe.db.sql(
+		f"""
+        INSERT INTO `{BENCH_TABLE}`
+            (name, creation, modified, docstatus, status, ef_status, ef_series, ef_number,
+             posting_date, reference_doctype, reference_name, next_status_check, last_status_check)
+        SELECT
+            CONCAT('BENCH-', n),
+            NOW(), NOW(),
+            IF(MOD(n, 10) = 0, 2, 1),
+            'Submitted',
+            ELT(1 + MOD(n, 8), -1, 0, 1, 3, 7, 8, 8, 8),
+            IF(MOD(n, 8) = 1, NULL, 'BNC'),
+            IF(MOD(n, 8) = 1, NULL, CAST(n AS CHAR)),
+            CURDATE() - INTERVAL MOD(n, 730) DAY,
+            'Sales Invoice',
+            CONCAT('BENCH-SINV-', n DIV 2),
+            NOW() + INTERVAL (MOD(n, 20000) - 2000) MINUTE,
+            NOW() - INTERVAL MOD(n, 5000) MINUTE
+        FROM (SELECT {seq} AS n FROM {joins}) seq
+        WHERE n < %(rows)s
+        """,
+		{"rows": rows},
+	)
+	frappe.db.sql(f"ANALYZE TABLE `{BENCH_TABLE}`")
+	frappe.db.commit()
@@ -0,0 +1,69 @@
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("efactura-rebuild-summary")
+@pass_context
+def rebuild_summary(context):
+	"Rebuild the eFactura Invoice Summary table from eFactura documents"
+	import frappe
+
+	from erpnext_moldova_efactura.utils import efactura_summary
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		written = efactura_summary.rebuild(progress=lambda n: click.echo(f"{n} row(s) written", err=True))
+		click.echo(f"Rebuilt {written} Sales Invoice summary row(s)")
+	finally:
+		frappe.destroy()
+
+
+@click.command("efactura-check-summary")
+@click.option("--fix", is_flag=True, default=False, help="Rewrite the rows that do not match")
+@pass_context
+def check_summary(context, fix=False):
+	"Compare the eFactura Invoice Summary table with the eFactura documents"
+	import frappe
+
+	from erpnext_moldova_efactura.utils import efactura_summary
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		mismatches = efactura_summary.check(fix=fix)
+		for name, stored, expected in mismatches[:50]:
+			click.echo(f"{name}: stored={stored} expected={expected}")
+
+		if not mismatches:
+			click.echo("eFactura Invoice Summary is consistent")
+		elif fix:
+			click.echo(f"Fixed {len(mismatches)} row(s)")
+		else:
+			click.echo(f"{len(mismatches)} row(s) out of date, run with --fix to repair them")
+			raise SystemExit(1)
+	finally:
+		frappe.destroy()
+
+
+@click.command("efactura-migrate-fiscal-status")
+@click.option("--page-size", type=int, default=5000, help="Sales Invoices per committed page")
+@pass_context
+def migrate_fiscal_status(context, page_size=5000):
+	"Recompute fiscal_status of all submitted Sales Invoices, resuming an interrupted run"
+	import frappe
+
+	from erpnext_moldova_efactura.patches.v1_0.migrate_sales_invoice_fiscal_status import run
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		run(page_size=page_size)
+	finally:
+		frappe.destroy()
+
+
+commands = [rebuild_summary, check_summary, migrate_fiscal_status]
@@ -91,7 +91,8 @@ doctype_list_js = {
 # ------------
 
 # before_install = "erpnext_moldova_efactura.install.before_install"
-# after_install = "erpnext_moldova_efactura.install.after_install"
+after_install = "erpnext_moldova_efactura.install.after_install"
+after_migrate = "erpnext_moldova_efactura.install.after_migrate"
 
 # Uninstallation
 # ------------
@@ -156,7 +157,12 @@ doctype_list_js = {
 doc_events = {
     "Sales Invoice": {
         "on_submit": "erpnext_moldova_efactura.overrides.sales_invoice.on_submit",
-    }
+    },
+    "Territory": {
+        "on_update": "erpnext_moldova_efactura.utils.territory_scope.invalidate",
+        "on_trash": "erpnext_moldova_efactura.utils.territory_scope.invalidate",
+        "after_rename": "erpnext_moldova_efactura.utils.territory_scope.invalidate",
+    },
 }
 
 # Scheduled Tasks
@@ -181,12 +187,22 @@ doc_events = {
 # }
 
 scheduler_events = {
+    "cron": {
+        "*/5 * * * *": [
+            "erpnext_moldova_efactura.utils.soap_capture.flush_soap_captures",
+        ],
+        "*/15 * * * *": [
+            "erpnext_moldova_efactura.tasks.status_sync.sync_efactura_statuses",
+        ],
+    },
     "hourly": [
-        "erpnext_moldova_efactura.tasks.status_sync.sync_efactura_statuses",
         "erpnext_moldova_efactura.tasks.status_sync.sync_efactura_draft_invoices_by_api_invoice_id",
+        "erpnext_moldova_efactura.utils.api_metrics.flush_api_metrics",
+        "erpnext_moldova_efactura.tasks.taxpayer_prefetch.prefetch_taxpayers",
     ],
     "daily": [
         "erpnext_moldova_efactura.tasks.status_sync.sync_efactura_cancelled_from_search_invoices",
+        "erpnext_moldova_efactura.utils.number_pool.report_unused_reservations",
     ]
 }
 
@@ -271,6 +287,10 @@ override_doctype_dashboards = {
 # 	"Logging DocType Name": 30  # days to retain logs
 # }
 
+default_log_clearing_doctypes = {
+    "eFactura API Metric": 90,
+}
+
 fixtures = [
     {
         "doctype": "Custom Field", 
@@ -0,0 +1,88 @@
+import click
+import frappe
+
+# (doctype, index name, columns) for the status sync and lookup hot paths
+EFACTURA_INDEXES = (
+	# sync_efactura_statuses: docstatus = 1 AND ef_status IN (...) ORDER BY next_status_check
+	("eFactura", "efactura_sync_queue", ("docstatus", "ef_status", "next_status_check")),
+	# draft sync: docstatus = 1 AND ef_status = 0 ORDER BY last_status_check
+	("eFactura", "efactura_draft_sync", ("docstatus", "ef_status", "last_status_check")),
+	# eFactura Invoice Summary refresh / available quantity per Sales Invoice
+	("eFactura", "efactura_reference", ("reference_name", "reference_doctype", "docstatus")),
+	# used quantity per Sales Invoice item
+	("eFactura Item", "efactura_item_parent_item_code", ("parent", "item_code")),
+	# dashboards joining eFactura Item back to its source documents
+	("eFactura Item", "efactura_item_sales_invoice", ("sales_invoice", "parent")),
+	("eFactura Item", "efactura_item_delivery_note", ("delivery_note", "parent")),
+)
+
+SERIES_NUMBER_CONSTRAINT = "efactura_series_number"
+
+
+def after_install():
+	ensure_indexes()
+
+
+def after_migrate():
+	ensure_indexes()
+
+
+def ensure_indexes():
+	"""Create the composite indexes and the (ef_series, ef_number) unique key if missing."""
+	for doctype, index_name, columns in EFACTURA_INDEXES:
+		if not frappe.db.table_exists(doctype):
+			continue
+		frappe.db.add_index(doctype, list(columns), index_name)
+
+	ensure_series_number_unique()
+
+
+def ensure_series_number_unique():
+	if not frappe.db.table_exists("eFactura"):
+		return
+
+	if frappe.db.sql(
+		"""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'tabeFactura' AND index_name = %s
+        LIMIT 1
+        """,
+		SERIES_NUMBER_CONSTRAINT,
+	):
+		return
+
+	# Unsigned documents have no series/number yet; keep them NULL so they do not collide
+	frappe.db.sql("UPDATE `tabeFactura` SET ef_series = NULL WHERE ef_series = ''")
+	frappe.db.sql("UPDATE `tabeFactura` SET ef_number = NULL WHERE ef_number = ''")
+
+	duplicates = frappe.db.sql(
+		"""
+        SELECT ef_series, ef_number, GROUP_CONCAT(name) AS names
+        FROM `tabeFactura`
+        WHERE ef_series IS NOT NULL AND ef_number IS NOT NULL
+        GROUP BY ef_series, ef_number
+        HAVING COUNT(*) > 1
+        LIMIT 20
+        """,
+		as_dict=True,
+	)
+	if duplicates:
+		message = (
+			"eFactura series/number unique key not created: duplicate series/number found, "
+			"resolve them and run bench migrate again:\n"
+			+ "\n".join(f"{d.ef_series}{d.ef_number}: {d.names}" for d in duplicates)
+		)
+		click.secho(message, fg="yellow")
+		frappe.log_error(title="eFactura series/number unique key not created", message=message)
+		return
+
+	try:
+		frappe.db.add_unique("eFactura", ["ef_series", "ef_number"], SERIES_NUMBER_CONSTRAINT)
+	except Exception as e:
+		# A duplicate written between the check and the ALTER must not fail the whole migrate
+		if not frappe.db.is_duplicate_entry(e):
+			raise
+		click.secho(
+			"eFactura series/number unique key not created: duplicates appeared meanwhile", fg="yellow"
+		)
+		frappe.log_error(title="eFactura series/number unique key not created")
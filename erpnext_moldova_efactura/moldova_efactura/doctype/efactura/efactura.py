@@ -3,7 +3,7 @@
 
 import json, base64, re, frappe, hashlib, uuid
 import xml.etree.ElementTree as ET
-from erpnext_moldova_efactura.utils.fiscal_status import determine_fiscal_status
+from erpnext_moldova_efactura.utils.fiscal_status import mark_fiscal_status_dirty
 
 from datetime import datetime
 from frappe import _
@@ -12,7 +12,10 @@ from frappe.model.mapper import get_mapped_doc
 from frappe.utils import cint, flt
 from erpnext_moldova_efactura.api_client import EFacturaAPIClient
 from lxml import etree
-from erpnext_moldova_efactura.tasks.status_sync import _extract_single_invoice_from_search_response, _extract_status_map
+from erpnext_moldova_efactura.tasks.status_sync import _extract_status_map, find_invoice_by_api_invoice_id
+from erpnext_moldova_efactura.utils import number_pool, remaining_qty, taxpayer_cache
+from erpnext_moldova_efactura.utils.efactura_status import EF_STATUS_LABELS
+from erpnext_moldova_efactura.utils.settings import get_settings
 
 class eFactura(Document):
     def onload(self):
@@ -28,6 +31,7 @@ class eFactura(Document):
 
     def on_submit(self):
         self.set_status()
+        self.invalidate_remaining_qty()
 
     def on_cancel(self):
         if self.ef_status != -1 and self.ef_status != 5:
@@ -35,12 +39,20 @@ class eFactura(Document):
                 _("eFactura can be cancelled only in Pending Registration or Canceled by Supplier status.")
             )
         self.set_status()
+        self.invalidate_remaining_qty()
+
+    def on_trash(self):
+        # Deleted drafts no longer count towards the Sales Invoice summary
+        self.update_reference_fiscal_status()
 
     def on_update(self):
         # Auto-fill parties data after saving the document (draft included).
         # Use db_set(update_modified=False) to avoid recursive saves.
         self._autofill_parties_from_efactura_api_after_save()
 
+        # New and edited drafts count towards the Sales Invoice summary as well
+        self.update_reference_fiscal_status()
+
     def set_status(self):
         """
         Map to sync 'status' field:
@@ -65,20 +77,6 @@ class eFactura(Document):
         if self.is_new():
             return
 
-        ef_status_labels = {
-            -1: "Pending Registration",
-            0:  "Registered as Draft",
-            1:  "Signed by Supplier",
-            2:  "Rejected by Customer",
-            3:  "Accepted by Customer",
-            5:  "Canceled by Supplier",
-            7:  "Sent to Customer",
-            8:  "Signed by Customer",
-            9:  "Sent to Customer",
-            10: "Transportation",
-            11: "Cancellation Requested",
-        }
-
         if self.docstatus == 0:
             self.status = "Draft"
         elif self.docstatus == 2:
@@ -87,56 +85,46 @@ class eFactura(Document):
             if self.ef_status is None:
                 self.db_set("ef_status", -1, update_modified=False) 
 
-            self.status = ef_status_labels.get(self.ef_status)
+            self.status = EF_STATUS_LABELS.get(self.ef_status)
 
         self.db_set("status", self.status, update_modified=False)
 
-        # --- Update linked Sales Invoice fiscal status ---
+        self.update_reference_fiscal_status()
+
+    def update_reference_fiscal_status(self):
+        # --- Update linked Sales Invoice fiscal status (once per transaction, at commit) ---
+        if self.reference_doctype == "Sales Invoice" and self.reference_name:
+            mark_fiscal_status_dirty(self.reference_name)
+
+        # Re-linked eFactura: the previous Sales Invoice loses it from its summary
+        previous = self.get_doc_before_save()
+        if (
+            previous
+            and previous.reference_doctype == "Sales Invoice"
+            and (previous.reference_doctype, previous.reference_name)
+            != (self.reference_doctype, self.reference_name)
+        ):
+            mark_fiscal_status_dirty(previous.reference_name)
+
+    def invalidate_remaining_qty(self):
         if self.reference_doctype == "Sales Invoice" and self.reference_name:
-            try:
-                si = frappe.get_doc("Sales Invoice", self.reference_name)
-                new_status = determine_fiscal_status(si)
-                si.db_set("fiscal_status", new_status, update_modified=False)
-            except frappe.ValidationError:
-                # configuration error or blocked state – do not break eFactura flow
-                pass
+            remaining_qty.invalidate(self.reference_name)
 
     def update_items_available_qty(self):
         if self.reference_doctype != "Sales Invoice" or not self.reference_name:
             return
 
+        # A draft does not count towards the used quantity yet, so it needs no exclusion
+        remaining = remaining_qty.get_remaining_qty(
+            self.reference_name, exclude=self.name if self.docstatus != 0 else None
+        )
         for item in self.items:
             if not item.item_code:
                 continue
-            total_si_stock_qty = (
-                frappe.db.get_value(
-                    "Sales Invoice Item",
-                    {"parent": self.reference_name, "item_code": item.item_code},
-                    "sum(stock_qty)",
-                )
-                or 0
-            )
-            efactura_names = frappe.get_all(
-                "eFactura",
-                filters={
-                    "docstatus": 1,
-                    "reference_name": self.reference_name,
-                    "name": ["!=", self.name],
-                },
-                pluck="name",
-            )
-            used_stock_qty = (
-                frappe.db.get_value(
-                    "eFactura Item",
-                    {"item_code": item.item_code, "parent": ["in", efactura_names]},
-                    "sum(stock_qty)",
-                )
-                or 0
-            )
-            item.available_stock_qty = total_si_stock_qty - used_stock_qty
+            item.available_stock_qty = remaining.get(item.item_code, 0)
 
     def set_ef_currency_from_settings(self):
-        ef_cur = frappe.db.get_single_value("eFactura Settings", "currency")
+        ef_cur = get_settings().currency
         if not ef_cur:
             frappe.throw(_("Please set Currency in eFactura Settings."))
         self.ef_currency = ef_cur
@@ -161,9 +149,7 @@ class eFactura(Document):
                 self.ef_conversion_rate = rate
 
     def apply_vat(self):
-        vat_included = cint(
-            frappe.db.get_single_value("eFactura Settings", "vat_included_in_rate") or 0
-        )
+        vat_included = cint(get_settings().vat_included_in_rate)
         ef_conv = flt(self.ef_conversion_rate) or 1
 
 
@@ -241,24 +227,13 @@ class eFactura(Document):
         if self.docstatus == 2:
             return
 
-        idno_fields = {}
-
-        idno_fields['Company'] = frappe.db.get_single_value(
-            "eFactura Settings", "company_idno_field"
-        )
-        if not idno_fields['Company']:
-            return
-
-        idno_fields["Supplier"] = frappe.db.get_single_value(
-            "eFactura Settings", "supplier_idno_field"
-        )
-        if not idno_fields["Supplier"]:
-            return
-
-        idno_fields["Customer"] = frappe.db.get_single_value(
-            "eFactura Settings", "customer_idno_field"
-        )
-        if not idno_fields["Customer"]:
+        settings = get_settings()
+        idno_fields = {
+            "Company": settings.company_idno_field,
+            "Supplier": settings.supplier_idno_field,
+            "Customer": settings.customer_idno_field,
+        }
+        if not all(idno_fields.values()):
             return
 
         self.flags.ef_autofill_running = True
@@ -328,10 +303,8 @@ class eFactura(Document):
         idno_value = getattr(self, f"ef_{prefix}_idno", None)
 
         if not idno_value or party_idno != idno_value:
-            # 1) GetTaxpayersInfo
-            tax_resp = client.get_taxpayers_info([party_idno])
-            taxpayers = (tax_resp.get("Results") or {}).get("Taxpayer") or []
-            taxpayer = taxpayers[0] if taxpayers else {}
+            # 1) GetTaxpayersInfo (cached per IDNO)
+            taxpayer = taxpayer_cache.get_taxpayer(client, party_idno)
 
             idno = taxpayer.get("IDNO") or ""
             vat_id = taxpayer.get("CodTVA") or ""
@@ -357,16 +330,12 @@ class eFactura(Document):
                 ba = frappe.get_doc("Bank Account", ba_name)
 
                 if ba.iban and ba.iban != getattr(self, f"ef_{prefix}_bank_account", None):
-                    bank_resp = client.get_bank_account_info(
-                        idno=party_idno, account_number=ba.iban
-                    )
-                    bank_accounts = (bank_resp.get("Results") or {}).get("BankAccount") or []
-
-                    for bank in bank_accounts or []:
-                        if bank.get("AccountNumber") == ba.iban:
-                            bank_account = bank.get("AccountNumber") or ""
-                            bank_name = bank.get("BranchTitle") or ""
-                            bank_code = bank.get("BranchCode") or ""
+                    # GetBankAccountInfo (cached per IDNO/IBAN)
+                    bank = taxpayer_cache.get_bank_account(client, party_idno, ba.iban)
+
+                    bank_account = bank.get("AccountNumber") or ""
+                    bank_name = bank.get("BranchTitle") or ""
+                    bank_code = bank.get("BranchCode") or ""
                 else:
                     bank_account = getattr(self, f"ef_{prefix}_bank_account", "")
                     bank_name = getattr(self, f"ef_{prefix}_bank_name", "")
@@ -383,7 +352,7 @@ class eFactura(Document):
 @frappe.whitelist()
 def download_xml(efactura_name):
     efactura = frappe.get_doc("eFactura", efactura_name)
-    ef_lang = frappe.db.get_single_value("eFactura Settings", "language")
+    ef_lang = get_settings().language
 
     xml_content = _generate_invoice_xml(
         efactura=efactura,
@@ -402,19 +371,7 @@ def update_ef_status(efactura_name):
     efactura = frappe.get_doc("eFactura", efactura_name)
 
     if not efactura.ef_series or not efactura.ef_number:
-        # List of statuses to check in sequence (eFactura API requires status filter)
-        search_statuses = [0,1,7,8,3,2,5,10,4,6,9]
-        for status in search_statuses:
-            params = {
-                "APIeInvoiceId": efactura.name, 
-                "InvoiceStatus": status,
-            }
-
-            resp = client.search_invoices(actor_role=1, parameters=params)
-            inv = _extract_single_invoice_from_search_response(resp)
-            
-            if inv:
-                break
+        inv = find_invoice_by_api_invoice_id(efactura.name)
 
         if isinstance(inv, list):
             frappe.throw(_("e-Factura returned multiple invoices for APIeInvoiceId={0}: {1}").format(efactura.name, len(inv)))
@@ -480,15 +437,13 @@ def download_pdf(efactura_name):
 @frappe.whitelist()
 def get_for_sign(efactura_name):
     efactura = frappe.get_doc("eFactura", efactura_name)   
-    ef_lang = frappe.db.get_single_value("eFactura Settings", "language")
+    ef_lang = get_settings().language
 
     if not efactura.ef_series or not efactura.ef_number:
-        client = EFacturaAPIClient.from_settings()
-        resp = client.get_series_and_numbers(count=1)
-        data = resp.get("Results", {}).get("SeriaAndNumber", [{}])[0]
+        series, number = number_pool.take_series_and_number(efactura.name)
 
-        efactura.db_set("ef_series", data.get("Seria"))
-        efactura.db_set("ef_number", data.get("Number"))
+        efactura.db_set("ef_series", series)
+        efactura.db_set("ef_number", number)
 
         if not efactura.ef_series or not efactura.ef_number:
             frappe.throw(_("e-Factura API Error: Unable to obtain Series and Number"))
@@ -522,7 +477,7 @@ def get_for_sign(efactura_name):
 @frappe.whitelist()
 def send_unsigned(efactura_name):
     efactura = frappe.get_doc("eFactura", efactura_name)
-    ef_lang = frappe.db.get_single_value("eFactura Settings", "language")
+    ef_lang = get_settings().language
 
     client = EFacturaAPIClient.from_settings()
 
@@ -0,0 +1,128 @@
+# Copyright (c) 2026, Evgheni Nemerenco and Contributors
+# See license.txt
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_moldova_efactura.tests.utils import SQLiteDB
+from erpnext_moldova_efactura.utils import efactura_status
+from erpnext_moldova_efactura.utils.efactura_status import apply_sync_results
+
+SCHEMA = """
+    CREATE TABLE `tabeFactura` (
+        name TEXT PRIMARY KEY,
+        docstatus INTEGER,
+        status TEXT,
+        ef_series TEXT,
+        ef_number TEXT,
+        ef_status INTEGER,
+        next_status_check TEXT,
+        last_status_change TEXT,
+        recent_status_changes INTEGER,
+        last_status_check TEXT,
+        UNIQUE (ef_series, ef_number)
+    );
+"""
+
+NOW = datetime(2026, 6, 1, 12, 0, 0)
+
+
+class TestApplySyncResults(FrappeTestCase):
+	def setUp(self):
+		self.db = SQLiteDB(SCHEMA)
+		self.log_error = MagicMock()
+		for attribute, value in (("db", self.db), ("log_error", self.log_error)):
+			patcher = patch.object(efactura_status.frappe, attribute, value, create=True)
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+		for name, series, number, ef_status in (
+			("EF-1", None, None, 0),
+			("EF-2", None, None, 0),
+			("EF-3", "BNC", "3", 1),
+			("EF-4", "BNC", "100", 8),
+		):
+			self.db.sql(
+				"INSERT INTO `tabeFactura` (name, docstatus, status, ef_series, ef_number, ef_status)"
+				" VALUES (%s, 1, 'Registered as Draft', %s, %s, %s)",
+				[name, series, number, ef_status],
+			)
+
+	def rows(self):
+		return {row.name: row for row in self.db.sql("SELECT * FROM `tabeFactura`", as_dict=True)}
+
+	def test_bulk_case_write(self):
+		updates = {
+			"EF-1": {"ef_series": "BNC", "ef_number": "1", "ef_status": 1},
+			"EF-2": {"ef_series": "BNC", "ef_number": "2"},
+			"EF-3": {"next_status_check": "2026-06-01 13:00:00", "recent_status_changes": 2},
+		}
+
+		with patch.object(efactura_status, "_update_fields", wraps=efactura_status._update_fields) as write:
+			changed = apply_sync_results(updates, ["EF-1", "EF-2", "EF-3", "EF-4", "EF-1"], NOW)
+
+		# One UPDATE ... CASE for the whole chunk
+		write.assert_called_once()
+		self.assertEqual(changed, ["EF-1"])
+
+		rows = self.rows()
+		self.assertEqual(
+			(rows["EF-1"].ef_series, rows["EF-1"].ef_number, rows["EF-1"].ef_status), ("BNC", "1", 1)
+		)
+		self.assertEqual(rows["EF-1"].status, "Signed by Supplier")
+		self.assertEqual((rows["EF-2"].ef_number, rows["EF-2"].ef_status), ("2", 0))
+		self.assertEqual(rows["EF-2"].status, "Registered as Draft")
+		self.assertEqual((rows["EF-3"].recent_status_changes, rows["EF-3"].ef_number), (2, "3"))
+		# Touched whether changed or not
+		self.assertEqual({row.last_status_check for row in rows.values()}, {str(NOW)})
+
+	def test_chunks(self):
+		updates = {f"EF-{i}": {"ef_status": 3} for i in range(1, 5)}
+
+		with (
+			patch.object(efactura_status, "CHUNK_SIZE", 3),
+			patch.object(efactura_status, "_update_fields", wraps=efactura_status._update_fields) as write,
+		):
+			changed = apply_sync_results(updates, list(updates), NOW)
+
+		self.assertEqual(
+			[list(call.args[0]) for call in write.call_args_list], [["EF-1", "EF-2", "EF-3"], ["EF-4"]]
+		)
+		self.assertEqual(changed, list(updates))
+		self.assertEqual({row.status for row in self.rows().values()}, {"Accepted by Customer"})
+
+	def test_duplicate_series_falls_back_row_by_row(self):
+		updates = {
+			# BNC100 belongs to EF-4
+			"EF-1": {"ef_series": "BNC", "ef_number": "100", "ef_status": 1},
+			"EF-2": {"ef_series": "BNC", "ef_number": "2", "ef_status": 1},
+		}
+
+		with patch.object(efactura_status, "_update_fields", wraps=efactura_status._update_fields) as write:
+			changed = apply_sync_results(updates, ["EF-1", "EF-2"], NOW)
+
+		# The chunk, then each row on its own
+		self.assertEqual(
+			[list(call.args[0]) for call in write.call_args_list], [["EF-1", "EF-2"], ["EF-1"], ["EF-2"]]
+		)
+		self.assertEqual(changed, ["EF-2"])
+
+		rows = self.rows()
+		self.assertEqual(
+			(rows["EF-1"].ef_series, rows["EF-1"].ef_status, rows["EF-1"].status),
+			(None, 0, "Registered as Draft"),
+		)
+		self.assertEqual((rows["EF-2"].ef_number, rows["EF-2"].status), ("2", "Signed by Supplier"))
+		self.assertEqual(rows["EF-1"].last_status_check, str(NOW))
+
+		self.log_error.assert_called_once()
+		self.assertIn("EF-1: BNC100", self.log_error.call_args.kwargs["message"])
+
+	def test_other_errors_are_raised(self):
+		with (
+			patch.object(efactura_status, "_update_fields", side_effect=RuntimeError("lock wait timeout")),
+			self.assertRaises(RuntimeError),
+		):
+			apply_sync_results({"EF-1": {"ef_status": 1}}, ["EF-1"], NOW)
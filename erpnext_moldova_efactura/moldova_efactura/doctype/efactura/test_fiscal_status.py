@@ -0,0 +1,62 @@
+# Copyright (c) 2026, Evgheni Nemerenco and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_moldova_efactura.utils import fiscal_status
+from erpnext_moldova_efactura.utils.fiscal_status import _determine_chunk, _status_from_summary
+
+
+def summary(efactura_count=1, failed=0, pending=0, in_progress=0, signed_total=0):
+	return frappe._dict(
+		efactura_count=efactura_count,
+		failed_count=failed,
+		pending_count=pending,
+		in_progress_count=in_progress,
+		signed_total=signed_total,
+	)
+
+
+class TestFiscalStatus(FrappeTestCase):
+	def test_status_group_precedence(self):
+		# (summary, Sales Invoice grand_total, expected fiscal_status)
+		cases = (
+			(None, 100, "Pending"),
+			(summary(efactura_count=0), 100, "Pending"),
+			(summary(failed=1, pending=1, in_progress=1, signed_total=100), 100, "Failed"),
+			(summary(failed=1), 100, "Failed"),
+			(summary(pending=1, in_progress=1), 100, "Pending"),
+			(summary(in_progress=1, signed_total=100), 100, "In Progress"),
+			(summary(signed_total=40), 100, "Partial"),
+			(summary(signed_total=100), 100, "Completed"),
+			(summary(signed_total=120), 100, "Unknown"),
+			(summary(signed_total=None), 0, "Completed"),
+		)
+		for row, grand_total, expected in cases:
+			with self.subTest(summary=row, grand_total=grand_total):
+				self.assertEqual(_status_from_summary(row, grand_total), expected)
+
+	def test_customer_and_scope_precede_efactura_statuses(self):
+		rows = [
+			frappe._dict(name="SI-1", customer_type="Individual", in_scope=1, **summary(failed=1)),
+			frappe._dict(name="SI-2", customer_type="Company", in_scope=0, **summary(failed=1)),
+			frappe._dict(name="SI-3", customer_type="Company", in_scope=1, **summary(failed=1)),
+			frappe._dict(name="SI-4", customer_type="Company", in_scope=1, efactura_count=None),
+		]
+		for row in rows:
+			row.grand_total = 100
+
+		scope = frappe._dict(lft=1, rgt=10)
+		with patch.object(fiscal_status.frappe.db, "sql", return_value=rows):
+			configured = _determine_chunk([row.name for row in rows], "Moldova", scope)
+			unconfigured = _determine_chunk([row.name for row in rows], None, None)
+
+		self.assertEqual(
+			configured,
+			{"SI-1": "Not Required", "SI-2": "Not Applicable", "SI-3": "Failed", "SI-4": "Pending"},
+		)
+		# Without a Fiscal Territory only "Not Required" can be decided
+		self.assertEqual(unconfigured, {"SI-1": "Not Required"})
@@ -0,0 +1,145 @@
+# Copyright (c) 2026, Evgheni Nemerenco and Contributors
+# See license.txt
+
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_moldova_efactura.moldova_efactura.doctype.efactura.efactura import eFactura
+from erpnext_moldova_efactura.tests.utils import SQLiteDB
+from erpnext_moldova_efactura.utils import remaining_qty
+
+SCHEMA = """
+    CREATE TABLE `tabSales Invoice Item` (parent TEXT, item_code TEXT, stock_qty REAL);
+    CREATE TABLE `tabeFactura` (name TEXT PRIMARY KEY, reference_name TEXT, docstatus INTEGER);
+    CREATE TABLE `tabeFactura Item` (parent TEXT, item_code TEXT, stock_qty REAL);
+"""
+
+
+def per_row_remaining(db, sales_invoice, exclude, item_code):
+	"""The per item row computation remaining_qty.compute replaced, kept as the reference."""
+	total = db.sql(
+		"SELECT SUM(stock_qty) FROM `tabSales Invoice Item` WHERE parent = %s AND item_code = %s",
+		[sales_invoice, item_code],
+	)[0][0]
+	efacturas = db.sql_list(
+		"SELECT name FROM `tabeFactura` WHERE docstatus = 1 AND reference_name = %s AND name != %s",
+		[sales_invoice, exclude or ""],
+	)
+	used = None
+	if efacturas:
+		used = db.sql(
+			"SELECT SUM(stock_qty) FROM `tabeFactura Item` WHERE item_code = %(item_code)s AND parent IN %(names)s",
+			{"item_code": item_code, "names": efacturas},
+		)[0][0]
+	return (total or 0) - (used or 0)
+
+
+class RemainingQtyTestCase(FrappeTestCase):
+	def setUp(self):
+		self.db = SQLiteDB(SCHEMA)
+		self.db.after_commit = MagicMock()
+		self.cache = MagicMock()
+		self.cache.get_value.return_value = None
+		self.settings = frappe._dict(available_qty_cache_enabled=0, available_qty_cache_ttl_minutes=60)
+
+		for target, attribute, value in (
+			(remaining_qty.frappe, "db", self.db),
+			(remaining_qty.frappe, "cache", self.cache),
+			(remaining_qty, "get_settings", lambda: self.settings),
+		):
+			patcher = patch.object(target, attribute, value)
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+		for parent, item_code, qty in (
+			("SI-1", "APPLE", 10),
+			("SI-1", "APPLE", 5),
+			("SI-1", "PEAR", 4),
+			("SI-1", "PLUM", 2.5),
+			("SI-2", "APPLE", 100),
+		):
+			self.db.sql("INSERT INTO `tabSales Invoice Item` VALUES (%s, %s, %s)", [parent, item_code, qty])
+		for name, sales_invoice, docstatus, items in (
+			("EF-1", "SI-1", 1, (("APPLE", 6), ("PEAR", 4))),
+			("EF-2", "SI-1", 1, (("APPLE", 3), ("KIWI", 1))),
+			("EF-3", "SI-1", 2, (("APPLE", 15),)),
+			("EF-4", "SI-1", 0, (("PLUM", 2.5),)),
+			("EF-5", "SI-2", 1, (("APPLE", 40),)),
+		):
+			self.db.sql("INSERT INTO `tabeFactura` VALUES (%s, %s, %s)", [name, sales_invoice, docstatus])
+			for item_code, qty in items:
+				self.db.sql("INSERT INTO `tabeFactura Item` VALUES (%s, %s, %s)", [name, item_code, qty])
+
+
+class TestRemainingQty(RemainingQtyTestCase):
+	def test_matches_the_per_row_computation(self):
+		item_codes = ("APPLE", "PEAR", "PLUM", "KIWI")
+		for exclude in (None, "EF-1", "EF-2", "EF-4"):
+			with self.subTest(exclude=exclude):
+				remaining = remaining_qty.compute("SI-1", exclude)
+				for item_code in item_codes:
+					self.assertEqual(
+						remaining.get(item_code, 0),
+						per_row_remaining(self.db, "SI-1", exclude, item_code),
+						item_code,
+					)
+
+	def test_items_on_one_side_only(self):
+		remaining = remaining_qty.compute("SI-1")
+
+		self.assertEqual(remaining, {"APPLE": 6, "PEAR": 0, "PLUM": 2.5, "KIWI": -1})
+
+	def test_cached_map_for_drafts(self):
+		self.settings.available_qty_cache_enabled = 1
+
+		remaining = remaining_qty.get_remaining_qty("SI-1")
+
+		key = remaining_qty.REMAINING_QTY_KEY + "SI-1"
+		self.cache.get_value.assert_called_once_with(key, expires=True)
+		self.cache.set_value.assert_called_once_with(key, remaining, expires_in_sec=3600)
+
+		self.cache.get_value.return_value = {"APPLE": 1}
+		self.assertEqual(remaining_qty.get_remaining_qty("SI-1"), {"APPLE": 1})
+
+	def test_excluding_an_efactura_bypasses_the_cache(self):
+		self.settings.available_qty_cache_enabled = 1
+		self.cache.get_value.return_value = {"APPLE": 1}
+
+		self.assertEqual(remaining_qty.get_remaining_qty("SI-1", exclude="EF-1")["APPLE"], 12)
+		self.cache.get_value.assert_not_called()
+
+
+class TestRemainingQtyInvalidation(RemainingQtyTestCase):
+	def efactura(self, **values):
+		doc = frappe._dict(
+			{"reference_doctype": "Sales Invoice", "reference_name": "SI-1", "ef_status": -1, **values}
+		)
+		doc.set_status = MagicMock()
+		doc.invalidate_remaining_qty = lambda: eFactura.invalidate_remaining_qty(doc)
+		return doc
+
+	def test_invalidate_drops_the_map_now_and_after_commit(self):
+		remaining_qty.invalidate("SI-1")
+
+		key = remaining_qty.REMAINING_QTY_KEY + "SI-1"
+		self.cache.delete_value.assert_called_once_with(key)
+
+		after_commit = self.db.after_commit.add.call_args.args[0]
+		after_commit()
+		self.assertEqual(self.cache.delete_value.call_count, 2)
+		self.cache.delete_value.assert_called_with(key)
+
+	def test_submit_and_cancel_invalidate(self):
+		for hook in (eFactura.on_submit, eFactura.on_cancel):
+			with self.subTest(hook=hook.__name__), patch.object(remaining_qty, "invalidate") as invalidate:
+				hook(self.efactura())
+				invalidate.assert_called_once_with("SI-1")
+
+	def test_other_references_are_not_invalidated(self):
+		with patch.object(remaining_qty, "invalidate") as invalidate:
+			eFactura.on_submit(self.efactura(reference_doctype="Delivery Note"))
+			eFactura.on_submit(self.efactura(reference_name=None))
+
+		invalidate.assert_not_called()
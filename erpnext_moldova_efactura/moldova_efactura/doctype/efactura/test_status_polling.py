@@ -0,0 +1,88 @@
+# Copyright (c) 2025, Evgheni Nemerenco and Contributors
+# See license.txt
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_moldova_efactura.utils import status_polling
+from erpnext_moldova_efactura.utils.status_polling import next_check_at, plan_check
+
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+
+def interval_minutes(ef_status, age, recent_changes=0):
+	last_change = NOW - age if age is not None else None
+	return (next_check_at(ef_status, last_change, recent_changes, NOW) - NOW) / timedelta(minutes=1)
+
+
+class TestNextCheckAt(FrappeTestCase):
+	def test_base_interval_by_status(self):
+		self.assertEqual(interval_minutes(0, timedelta(hours=1)), 60)
+		self.assertEqual(interval_minutes(1, timedelta(hours=1)), 30)
+		self.assertEqual(interval_minutes(3, timedelta(hours=1)), 360)
+		self.assertEqual(
+			interval_minutes(42, timedelta(hours=1)), status_polling.DEFAULT_BASE_INTERVAL_MINUTES
+		)
+
+	def test_no_last_change_counts_as_new(self):
+		self.assertEqual(interval_minutes(0, None), 60)
+
+	def test_age_factor_boundaries(self):
+		cases = (
+			(timedelta(days=1) - timedelta(seconds=1), 60),
+			(timedelta(days=1), 120),
+			(timedelta(days=7) - timedelta(seconds=1), 120),
+			(timedelta(days=7), 360),
+			(timedelta(days=30) - timedelta(seconds=1), 360),
+			(timedelta(days=30), 960),
+			(timedelta(days=400), 960),
+		)
+		for age, expected in cases:
+			with self.subTest(age=age):
+				self.assertEqual(interval_minutes(0, age), expected)
+
+	def test_active_documents_are_polled_twice_as_often(self):
+		self.assertEqual(interval_minutes(0, timedelta(hours=1), recent_changes=1), 60)
+		self.assertEqual(interval_minutes(0, timedelta(hours=1), recent_changes=2), 30)
+
+	def test_floor(self):
+		# 30 / 2 lands exactly on the floor
+		self.assertEqual(interval_minutes(1, timedelta(hours=1), recent_changes=2), 15)
+		with patch.dict(status_polling.BASE_INTERVAL_MINUTES, {1: 10}):
+			self.assertEqual(interval_minutes(1, timedelta(hours=1)), status_polling.MIN_INTERVAL_MINUTES)
+
+	def test_cap(self):
+		with patch.dict(status_polling.BASE_INTERVAL_MINUTES, {3: 1000}):
+			self.assertEqual(interval_minutes(3, timedelta(days=30)), status_polling.MAX_INTERVAL_MINUTES)
+		self.assertEqual(status_polling.MAX_INTERVAL_MINUTES, 7 * 24 * 60)
+
+
+class TestPlanCheck(FrappeTestCase):
+	def test_status_change_is_recorded(self):
+		row = {"ef_status": 1, "creation": NOW - timedelta(days=3), "recent_status_changes": 0}
+		values = plan_check(row, 7, NOW)
+
+		self.assertEqual(values["last_status_change"], NOW)
+		self.assertEqual(values["recent_status_changes"], 1)
+		self.assertEqual(values["next_status_check"], NOW + timedelta(minutes=60))
+
+	def test_unchanged_status_ages_from_creation(self):
+		row = {"ef_status": 0, "creation": NOW - timedelta(days=8), "recent_status_changes": 0}
+		values = plan_check(row, 0, NOW)
+
+		self.assertNotIn("last_status_change", values)
+		self.assertEqual(values["next_status_check"], NOW + timedelta(minutes=360))
+
+	def test_recent_changes_expire_after_window(self):
+		row = {
+			"ef_status": 0,
+			"creation": NOW - timedelta(days=20),
+			"last_status_change": NOW - timedelta(days=status_polling.RECENT_CHANGE_WINDOW_DAYS, seconds=1),
+			"recent_status_changes": 5,
+		}
+		values = plan_check(row, None, NOW)
+
+		self.assertEqual(values["recent_status_changes"], 0)
+		self.assertEqual(values["next_status_check"], NOW + timedelta(minutes=360))
@@ -0,0 +1,170 @@
+# Copyright (c) 2026, Evgheni Nemerenco and Contributors
+# See license.txt
+
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_moldova_efactura.tasks import status_sync
+from erpnext_moldova_efactura.tasks.status_sync import _next_status_batch
+from erpnext_moldova_efactura.tests.utils import SQLiteDB
+
+SCHEMA = """
+    CREATE TABLE `tabeFactura` (
+        name TEXT PRIMARY KEY,
+        creation TEXT,
+        docstatus INTEGER,
+        ef_series TEXT,
+        ef_number TEXT,
+        ef_status INTEGER,
+        next_status_check TEXT,
+        last_status_change TEXT,
+        recent_status_changes INTEGER
+    );
+"""
+
+BOUNDARY = "2026-06-01 12:00:00"
+TIE = "2026-06-01 10:00:00"
+
+# (name, docstatus, ef_series, ef_status, next_status_check)
+ROWS = (
+	("EF-N2", 1, "BNC", 1, None),
+	("EF-N1", 1, "BNC", 1, None),
+	("EF-A", 1, "BNC", 1, "2026-05-30 08:00:00"),
+	# Five documents due at the same moment, split over several pages
+	("EF-T5", 1, "BNC", 7, TIE),
+	("EF-T1", 1, "BNC", 7, TIE),
+	("EF-T3", 1, "BNC", 7, TIE),
+	("EF-T2", 1, "BNC", 7, TIE),
+	("EF-T4", 1, "BNC", 7, TIE),
+	("EF-B", 1, "BNC", 0, BOUNDARY),
+	# Not due, not submitted, not checkable or not registered yet
+	("EF-LATER", 1, "BNC", 1, "2026-06-01 12:00:01"),
+	("EF-CANCELLED", 2, "BNC", 1, TIE),
+	("EF-SIGNED", 1, "BNC", 8, TIE),
+	("EF-DRAFT", 1, None, 0, TIE),
+)
+
+DUE = ["EF-N1", "EF-N2", "EF-A", "EF-T1", "EF-T2", "EF-T3", "EF-T4", "EF-T5", "EF-B"]
+
+
+def cursor_after(docs):
+	# Same cursor as sync_efactura_statuses saves in its checkpoint
+	last = docs[-1]
+	return (str(last.next_status_check) if last.next_status_check else None, last.name)
+
+
+class StatusSyncTestCase(FrappeTestCase):
+	def setUp(self):
+		self.db = SQLiteDB(SCHEMA)
+		patcher = patch.object(status_sync.frappe, "db", self.db)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+		for number, (name, docstatus, series, ef_status, next_check) in enumerate(ROWS):
+			self.db.sql(
+				"INSERT INTO `tabeFactura` VALUES (%s, '2026-01-01 00:00:00', %s, %s, %s, %s, %s, NULL, 0)",
+				[name, docstatus, series, series and str(number), ef_status, next_check],
+			)
+
+
+class TestNextStatusBatch(StatusSyncTestCase):
+	def pages(self, batch_size, cursor=None):
+		pages = []
+		while True:
+			docs = _next_status_batch(BOUNDARY, cursor, batch_size)
+			if not docs:
+				return pages
+			pages.append([row.name for row in docs])
+			cursor = cursor_after(docs)
+
+	def test_pages_visit_every_due_document_once(self):
+		for batch_size in (1, 2, 3, 4, 100):
+			with self.subTest(batch_size=batch_size):
+				pages = self.pages(batch_size)
+				self.assertEqual([name for page in pages for name in page], DUE)
+				self.assertTrue(all(len(page) <= batch_size for page in pages))
+
+	def test_ties_on_next_status_check_across_pages(self):
+		# Page boundaries fall inside the group of documents due at TIE
+		self.assertEqual(
+			self.pages(2),
+			[["EF-N1", "EF-N2"], ["EF-A", "EF-T1"], ["EF-T2", "EF-T3"], ["EF-T4", "EF-T5"], ["EF-B"]],
+		)
+
+	def test_cursor_boundaries(self):
+		cases = (
+			((None, "EF-N1"), ["EF-N2", "EF-A"]),
+			((None, "EF-N2"), ["EF-A", "EF-T1"]),
+			((TIE, "EF-T3"), ["EF-T4", "EF-T5"]),
+			((TIE, "EF-T5"), ["EF-B"]),
+			((BOUNDARY, "EF-B"), []),
+		)
+		for cursor, expected in cases:
+			with self.subTest(cursor=cursor):
+				self.assertEqual([row.name for row in _next_status_batch(BOUNDARY, cursor, 2)], expected)
+
+	def test_documents_rescheduled_past_the_boundary_are_not_revisited(self):
+		docs = _next_status_batch(BOUNDARY, None, 3)
+		self.db.sql(
+			"UPDATE `tabeFactura` SET next_status_check = '2026-06-01 13:00:00' WHERE name IN %(names)s",
+			{"names": [row.name for row in docs]},
+		)
+
+		self.assertEqual(
+			self.pages(3, cursor_after(docs)), [["EF-T1", "EF-T2", "EF-T3"], ["EF-T4", "EF-T5", "EF-B"]]
+		)
+
+
+class TestStatusSyncCheckpoint(StatusSyncTestCase):
+	def setUp(self):
+		super().setUp()
+		self.checkpoint = {}
+		self.batches = []
+		self.fail_batches = set()
+
+		for target, attribute, value in (
+			(status_sync, "_load_checkpoint", lambda: dict(self.checkpoint)),
+			(status_sync, "_save_checkpoint", self.save_checkpoint),
+			(status_sync, "_sync_status_batch", self.sync_batch),
+			(status_sync, "_time_budget_seconds", lambda: 240),
+			(status_sync, "get_settings", lambda: frappe._dict(status_sync_batch_size=2)),
+			(status_sync, "now_datetime", lambda: BOUNDARY),
+			(status_sync.EFacturaAPIClient, "from_settings", MagicMock()),
+			(status_sync.frappe, "logger", MagicMock()),
+			(status_sync.frappe, "log_error", MagicMock()),
+		):
+			patcher = patch.object(target, attribute, value, create=True)
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def save_checkpoint(self, checkpoint):
+		self.checkpoint = dict(checkpoint)
+
+	def sync_batch(self, client, docs):
+		self.batches.append([row.name for row in docs])
+		if len(self.batches) in self.fail_batches:
+			return None
+		return frappe._dict(updated=0, unchanged=len(docs), missing=0, errors=0, missing_docs=[])
+
+	def test_interrupted_run_resumes_from_checkpoint(self):
+		# The API fails on the third batch: the first two are checkpointed
+		self.fail_batches = {3}
+		status_sync.sync_efactura_statuses()
+
+		self.assertEqual(self.batches, [["EF-N1", "EF-N2"], ["EF-A", "EF-T1"], ["EF-T2", "EF-T3"]])
+		self.assertEqual(self.checkpoint, {"boundary": BOUNDARY, "last_check": TIE, "name": "EF-T1"})
+
+		# The next run retries the failed batch and goes on from there
+		status_sync.sync_efactura_statuses()
+
+		self.assertEqual(self.batches[3:], [["EF-T2", "EF-T3"], ["EF-T4", "EF-T5"], ["EF-B"]])
+		# Drained: the next run starts a fresh pass
+		self.assertEqual(self.checkpoint, {})
+
+	def test_resume_keeps_the_original_boundary(self):
+		self.checkpoint = {"boundary": "2026-05-30 09:00:00", "last_check": None, "name": "EF-N2"}
+		status_sync.sync_efactura_statuses()
+
+		self.assertEqual(self.batches, [["EF-A"]])
@@ -0,0 +1,38 @@
+# Copyright (c) 2026, Evgheni Nemerenco and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_moldova_efactura.utils.api_metrics import _aggregate, _percentile
+
+
+class TesteFacturaAPIMetric(FrappeTestCase):
+	def test_percentile_is_bucket_upper_bound(self):
+		buckets = {"25": 50, "100": 45, "1000": 5}
+
+		self.assertEqual(_percentile(buckets, 100, 0.50), 25)
+		self.assertEqual(_percentile(buckets, 100, 0.95), 100)
+		self.assertEqual(_percentile(buckets, 100, 0.99), 1000)
+		self.assertEqual(_percentile({}, 0, 0.99), 0)
+
+	def test_open_bucket_reports_observed_max(self):
+		buckets = {"25": 90, "inf": 10}
+
+		self.assertEqual(_percentile(buckets, 100, 0.99, max_ms=183000.5), 183000.5)
+		# Counters recorded before the maximum was tracked
+		self.assertEqual(_percentile(buckets, 100, 0.99), 60000)
+
+	def test_aggregate_reads_max(self):
+		raw = {
+			b"SearchInvoices|calls": b"2",
+			b"SearchInvoices|latency_total": b"90010",
+			b"SearchInvoices|lat|25": b"1",
+			b"SearchInvoices|lat|inf": b"1",
+			b"SearchInvoices|max_ms": b"90000",
+		}
+
+		metrics = _aggregate(raw)["SearchInvoices"]
+
+		self.assertEqual(metrics["max_ms"], 90000)
+		self.assertEqual(metrics["p50_ms"], 25)
+		self.assertEqual(metrics["p99_ms"], 90000)
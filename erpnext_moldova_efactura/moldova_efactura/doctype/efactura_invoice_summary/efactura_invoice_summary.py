@@ -0,0 +1,9 @@
+# Copyright (c) 2026, Evgheni Nemerenco and contributors
+# For license information, please see license.txt
+
+# import frappe
+from frappe.model.document import Document
+
+
+class eFacturaInvoiceSummary(Document):
+	pass
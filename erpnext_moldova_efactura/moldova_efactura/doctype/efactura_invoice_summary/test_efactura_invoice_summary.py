@@ -0,0 +1,137 @@
+# Copyright (c) 2026, Evgheni Nemerenco and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_moldova_efactura.tests.utils import SQLiteDB
+from erpnext_moldova_efactura.utils import efactura_summary
+
+SCHEMA = """
+    CREATE TABLE `tabeFactura` (
+        name TEXT PRIMARY KEY,
+        reference_doctype TEXT,
+        reference_name TEXT,
+        docstatus INTEGER,
+        status TEXT,
+        total REAL
+    );
+    CREATE TABLE `tabeFactura Invoice Summary` (
+        name TEXT PRIMARY KEY,
+        sales_invoice TEXT,
+        efactura_count INTEGER,
+        pending_count INTEGER,
+        failed_count INTEGER,
+        in_progress_count INTEGER,
+        signed_count INTEGER,
+        signed_total REAL,
+        last_updated TEXT,
+        creation TEXT,
+        modified TEXT,
+        owner TEXT,
+        modified_by TEXT
+    );
+"""
+
+
+class TesteFacturaInvoiceSummary(FrappeTestCase):
+	def setUp(self):
+		self.db = SQLiteDB(SCHEMA)
+		for target, attribute, value in (
+			(efactura_summary.frappe, "db", self.db),
+			(efactura_summary.frappe, "session", frappe._dict(user="Administrator")),
+		):
+			patcher = patch.object(target, attribute, value, create=True)
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def add_efactura(self, name, sales_invoice, status, total, docstatus=1):
+		self.db.sql(
+			"INSERT INTO `tabeFactura` VALUES (%s, 'Sales Invoice', %s, %s, %s, %s)",
+			[name, sales_invoice, docstatus, status, total],
+		)
+
+	def stored(self):
+		return {
+			row.name: row for row in self.db.sql("SELECT * FROM `tabeFactura Invoice Summary`", as_dict=True)
+		}
+
+	def test_compute_aggregates_non_cancelled_efacturas(self):
+		self.add_efactura("EF-1", "SI-1", "Signed by Customer", 60)
+		self.add_efactura("EF-2", "SI-1", "Signed by Customer", 40)
+		self.add_efactura("EF-3", "SI-1", "Signed by Customer", None)
+		self.add_efactura("EF-4", "SI-1", "Pending Registration", 100)
+		self.add_efactura("EF-5", "SI-1", "Rejected by Customer", 100)
+		self.add_efactura("EF-6", "SI-1", "Signed by Customer", 500, docstatus=2)
+		self.add_efactura("EF-7", "SI-2", "Signed by Customer", 100, docstatus=2)
+
+		result = efactura_summary.compute(["SI-1", "SI-2", "SI-1", None])
+
+		self.assertEqual(list(result), ["SI-1"])
+		row = result["SI-1"]
+		self.assertEqual(row.efactura_count, 5)
+		self.assertEqual(row.signed_count, 3)
+		# Only signed eFacturas count, a missing total as 0, cancelled ones not at all
+		self.assertEqual(row.signed_total, 100)
+		self.assertEqual(row.pending_count, 1)
+		self.assertEqual(row.failed_count, 1)
+		# Pending Registration is also an in-progress status
+		self.assertEqual(row.in_progress_count, 1)
+
+	def test_refresh_upserts_rows(self):
+		self.add_efactura("EF-1", "SI-1", "Pending Registration", 100)
+		efactura_summary.refresh(["SI-1"])
+		first = self.stored()["SI-1"]
+		self.assertEqual((first.efactura_count, first.pending_count, first.signed_total), (1, 1, 0))
+
+		self.db.sql("UPDATE `tabeFactura` SET status = 'Signed by Customer' WHERE name = 'EF-1'")
+		self.add_efactura("EF-2", "SI-1", "Signed by Customer", 25)
+		efactura_summary.refresh(["SI-1"])
+
+		rows = self.stored()
+		self.assertEqual(list(rows), ["SI-1"])
+		row = rows["SI-1"]
+		self.assertEqual((row.efactura_count, row.pending_count, row.signed_count), (2, 0, 2))
+		self.assertEqual(row.signed_total, 125)
+		self.assertEqual(row.creation, first.creation)
+
+	def test_refresh_deletes_invoices_without_efacturas(self):
+		self.add_efactura("EF-1", "SI-1", "Signed by Customer", 100)
+		self.add_efactura("EF-2", "SI-2", "Signed by Customer", 100)
+		efactura_summary.refresh(["SI-1", "SI-2"])
+
+		self.db.sql("UPDATE `tabeFactura` SET docstatus = 2 WHERE name = 'EF-1'")
+		efactura_summary.refresh(["SI-1", "SI-2", "SI-3"])
+
+		self.assertEqual(list(self.stored()), ["SI-2"])
+
+	def test_refresh_chunks(self):
+		names = [f"SI-{i}" for i in range(5)]
+		for name in names:
+			self.add_efactura(f"EF-{name}", name, "Signed by Customer", 10)
+
+		with (
+			patch.object(efactura_summary, "CHUNK_SIZE", 2),
+			patch.object(efactura_summary, "_replace", wraps=efactura_summary._replace) as replace,
+		):
+			efactura_summary.refresh(names)
+
+		self.assertEqual(
+			[call.args[0] for call in replace.call_args_list], [names[0:2], names[2:4], names[4:]]
+		)
+		self.assertEqual(sorted(self.stored()), names)
+
+	def test_rebuild_upserts_and_drops_stale_rows(self):
+		self.add_efactura("EF-1", "SI-1", "Signed by Customer", 100)
+		self.add_efactura("EF-2", "SI-2", "Signed by Customer", 100, docstatus=2)
+		efactura_summary._replace(
+			["SI-9"], {"SI-9": frappe._dict(dict.fromkeys(efactura_summary.SUMMARY_FIELDS, 1))}
+		)
+
+		written = efactura_summary.rebuild()
+
+		self.assertEqual(written, 1)
+		self.assertEqual(list(self.stored()), ["SI-1"])
+		self.assertEqual(self.stored()["SI-1"].signed_total, 100)
@@ -0,0 +1,143 @@
+# Copyright (c) 2026, Evgheni Nemerenco and Contributors
+# See license.txt
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_moldova_efactura.utils import number_pool
+
+NOW = datetime(2026, 6, 1, 12, 0, 0)
+
+
+def series_response(*numbers):
+	return {"Results": {"SeriaAndNumber": [{"Seria": "EA", "Number": number} for number in numbers]}}
+
+
+class TesteFacturaNumberReservation(FrappeTestCase):
+	def setUp(self):
+		self.db = MagicMock()
+		self.db.count.return_value = 100
+		self.enqueue = MagicMock()
+		self.logger = MagicMock()
+		self.client = MagicMock()
+		self.settings = frappe._dict(
+			number_pool_enabled=1, number_pool_size=200, number_pool_low_watermark=50
+		)
+
+		for target, attribute, value in (
+			(number_pool.frappe, "db", self.db),
+			(number_pool.frappe, "enqueue", self.enqueue),
+			(number_pool.frappe, "logger", lambda *args: self.logger),
+			(number_pool.frappe, "session", frappe._dict(user="Administrator")),
+			(number_pool, "get_settings", lambda: self.settings),
+			(number_pool, "now_datetime", lambda: NOW),
+			(number_pool.EFacturaAPIClient, "from_settings", lambda: self.client),
+		):
+			patcher = patch.object(target, attribute, value, create=True)
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def test_claims_a_reservation_with_skip_locked(self):
+		self.db.sql.return_value = [frappe._dict(name="EA-7", ef_series="EA", ef_number="7")]
+
+		self.assertEqual(number_pool.take_series_and_number("EF-1"), ("EA", "7"))
+
+		query, values = self.db.sql.call_args.args
+		self.assertIn("FOR UPDATE SKIP LOCKED", query)
+		self.assertIn("ORDER BY creation ASC", query)
+		self.assertEqual(values, {"status": number_pool.AVAILABLE})
+		self.db.set_value.assert_called_once_with(
+			number_pool.RESERVATION_DOCTYPE,
+			"EA-7",
+			{"status": number_pool.ASSIGNED, "efactura": "EF-1", "assigned_on": NOW},
+			update_modified=False,
+		)
+		self.client.get_series_and_numbers.assert_not_called()
+		self.enqueue.assert_not_called()
+
+	def test_refill_is_enqueued_below_the_low_watermark(self):
+		self.db.sql.return_value = [frappe._dict(name="EA-7", ef_series="EA", ef_number="7")]
+
+		for available, expected in ((50, False), (49, True)):
+			with self.subTest(available=available):
+				self.enqueue.reset_mock()
+				self.db.count.return_value = available
+				number_pool.take_series_and_number("EF-1")
+				self.assertEqual(self.enqueue.called, expected)
+
+		kwargs = self.enqueue.call_args.kwargs
+		self.assertEqual(kwargs["job_id"], number_pool.REFILL_JOB_ID)
+		self.assertTrue(kwargs["deduplicate"])
+		self.assertTrue(kwargs["enqueue_after_commit"])
+
+	def test_empty_pool_falls_back_to_a_direct_call(self):
+		self.db.sql.return_value = []
+		self.db.count.return_value = 0
+		self.client.get_series_and_numbers.return_value = series_response("8")
+
+		self.assertEqual(number_pool.take_series_and_number("EF-1"), ("EA", "8"))
+		self.client.get_series_and_numbers.assert_called_once_with(count=1)
+		self.db.set_value.assert_not_called()
+		self.enqueue.assert_called_once()
+
+	def test_disabled_pool_is_not_touched(self):
+		self.settings.number_pool_enabled = 0
+		self.client.get_series_and_numbers.return_value = series_response("9")
+
+		self.assertEqual(number_pool.take_series_and_number("EF-1"), ("EA", "9"))
+		self.db.sql.assert_not_called()
+		self.enqueue.assert_not_called()
+
+	def test_refill_tops_up_to_pool_size(self):
+		self.db.count.return_value = 197
+		self.client.get_series_and_numbers.return_value = series_response("10", "11", None)
+
+		number_pool.refill_pool()
+
+		self.client.get_series_and_numbers.assert_called_once_with(count=3)
+		kwargs = self.db.bulk_insert.call_args.kwargs
+		self.assertTrue(kwargs["ignore_duplicates"])
+		self.assertEqual(
+			[row[:4] for row in kwargs["values"]],
+			[("EA-10", "EA", "10", "Available"), ("EA-11", "EA", "11", "Available")],
+		)
+
+	def test_full_pool_is_not_refilled(self):
+		self.db.count.return_value = 200
+
+		number_pool.refill_pool()
+
+		self.client.get_series_and_numbers.assert_not_called()
+
+	def test_report_unused_reservations(self):
+		oldest = NOW - timedelta(days=12)
+		self.db.count.side_effect = lambda doctype, filters: 3 if "reserved_on" in filters else 40
+		self.db.get_value.return_value = oldest
+
+		number_pool.report_unused_reservations()
+
+		stale_filters = [
+			call.args[1] for call in self.db.count.call_args_list if "reserved_on" in call.args[1]
+		]
+		self.assertEqual(
+			stale_filters,
+			[
+				{
+					"status": number_pool.AVAILABLE,
+					"reserved_on": ["<", NOW - timedelta(days=number_pool.STALE_RESERVATION_DAYS)],
+				}
+			],
+		)
+		message = self.logger.warning.call_args.args[0]
+		self.assertIn("3 reservation(s)", message)
+		self.assertIn(str(oldest), message)
+
+	def test_nothing_reported_without_unused_reservations(self):
+		self.db.count.return_value = 0
+
+		number_pool.report_unused_reservations()
+
+		self.logger.warning.assert_not_called()
@@ -4,9 +4,110 @@
 frappe.ui.form.on('eFactura Settings', {
     refresh(frm) {
         set_options_for_idno_selects(frm);
+        add_schema_cache_button(frm);
+        show_circuit_breaker_state(frm);
+        add_taxpayer_cache_button(frm);
+        show_number_pool_state(frm);
     }
 });
 
+function show_number_pool_state(frm) {
+    if (!frm.doc.number_pool_enabled) return;
+
+    const method_base = 'erpnext_moldova_efactura.moldova_efactura.doctype.efactura_settings.efactura_settings';
+
+    frappe.call({
+        method: `${method_base}.get_number_pool_state`,
+        callback(r) {
+            const state = r.message;
+            if (!state) return;
+
+            frm.dashboard.add_indicator(
+                __('Reserved numbers: {0} available', [state.available]),
+                state.available < state.low_watermark ? 'orange' : 'green'
+            );
+            if (state.unused) {
+                frm.dashboard.add_indicator(
+                    __('{0} unused for more than a week', [state.unused]),
+                    'red'
+                );
+            }
+        }
+    });
+
+    frm.add_custom_button(__('Refill Number Pool'), () => {
+        frappe.call({
+            method: `${method_base}.refill_number_pool`,
+            callback(r) {
+                if (r.message) {
+                    frappe.show_alert({ message: r.message.message, indicator: 'green' });
+                }
+            }
+        });
+    }, __('Actions'));
+}
+
+function add_taxpayer_cache_button(frm) {
+    frm.add_custom_button(__('Purge Taxpayer Cache'), () => {
+        frappe.call({
+            method: 'erpnext_moldova_efactura.moldova_efactura.doctype.efactura_settings.efactura_settings.purge_taxpayer_cache',
+            callback(r) {
+                if (r.message) {
+                    frappe.show_alert({ message: r.message.message, indicator: 'green' });
+                }
+            }
+        });
+    }, __('Actions'));
+}
+
+function show_circuit_breaker_state(frm) {
+    const method_base = 'erpnext_moldova_efactura.moldova_efactura.doctype.efactura_settings.efactura_settings';
+
+    frappe.call({
+        method: `${method_base}.get_circuit_breaker_state`,
+        callback(r) {
+            const state = r.message;
+            if (!state) return;
+
+            const color = { "Closed": "green", "Half-Open": "orange", "Open": "red" }[state.state] || "gray";
+            frm.dashboard.clear_headline();
+            frm.dashboard.set_headline_alert(
+                __('e-Factura circuit breaker: {0} (consecutive failures: {1})', [__(state.state), state.failures])
+                + (state.last_error && state.state !== "Closed" ? `<br><small>${frappe.utils.escape_html(state.last_error)}</small>` : ''),
+                color
+            );
+
+            if (state.state !== "Closed") {
+                frm.add_custom_button(__('Reset Circuit Breaker'), () => {
+                    frappe.call({
+                        method: `${method_base}.reset_circuit_breaker`,
+                        callback() {
+                            frm.refresh();
+                        }
+                    });
+                }, __('Actions'));
+            }
+        }
+    });
+}
+
+function add_schema_cache_button(frm) {
+    if (!frm.doc.wsdl_cache_enabled) return;
+
+    frm.add_custom_button(__('Refresh Schema'), () => {
+        frappe.call({
+            method: 'erpnext_moldova_efactura.moldova_efactura.doctype.efactura_settings.efactura_settings.refresh_wsdl_cache',
+            freeze: true,
+            freeze_message: __('Downloading e-Factura schema...'),
+            callback(r) {
+                if (r.message) {
+                    frappe.show_alert({ message: r.message.message, indicator: 'green' });
+                }
+            }
+        });
+    }, __('Actions'));
+}
+
 function set_options_for_idno_selects(frm) {
     // Company
     frappe.model.with_doctype('Company', () => {
@@ -1,9 +1,76 @@
 # Copyright (c) 2025, Evgheni Nemerenco and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
+from frappe import _
 from frappe.model.document import Document
 
+from erpnext_moldova_efactura.api_client import EFacturaAPIClient, clear_client_pool, clear_wsdl_cache
+from erpnext_moldova_efactura.utils import (
+	circuit_breaker,
+	number_pool,
+	settings,
+	taxpayer_cache,
+	territory_scope,
+)
+
 
 class eFacturaSettings(Document):
-	pass
+	def on_update(self):
+		# Every process reloads its settings snapshot
+		settings.invalidate()
+		# Pooled SOAP clients were built from the previous settings
+		clear_client_pool()
+		# Fiscal Territory may have changed
+		territory_scope.invalidate()
+
+
+@frappe.whitelist()
+def refresh_wsdl_cache():
+	"""Drop the cached WSDL/XSD files and download them again from e-Factura."""
+	frappe.only_for("System Manager")
+
+	removed = clear_wsdl_cache()
+	clear_client_pool()
+
+	# Build a client right away so the next user action is served from the fresh cache
+	EFacturaAPIClient.from_settings()
+
+	return {
+		"removed": removed,
+		"message": _("e-Factura schema downloaded again ({0} cached file(s) replaced).").format(removed),
+	}
+
+
+@frappe.whitelist()
+def get_circuit_breaker_state():
+	frappe.only_for("System Manager")
+	return circuit_breaker.get_state()
+
+
+@frappe.whitelist()
+def reset_circuit_breaker():
+	"""Close the breaker manually, e.g. after e-Factura announced the end of an outage."""
+	frappe.only_for("System Manager")
+	circuit_breaker.reset()
+	return circuit_breaker.get_state()
+
+
+@frappe.whitelist()
+def purge_taxpayer_cache():
+	frappe.only_for("System Manager")
+	taxpayer_cache.purge()
+	return {"message": _("Taxpayer and bank account cache cleared.")}
+
+
+@frappe.whitelist()
+def get_number_pool_state():
+	frappe.only_for("System Manager")
+	return number_pool.get_pool_state()
+
+
+@frappe.whitelist()
+def refill_number_pool():
+	frappe.only_for("System Manager")
+	number_pool.enqueue_refill()
+	return {"message": _("Number pool refill queued.")}
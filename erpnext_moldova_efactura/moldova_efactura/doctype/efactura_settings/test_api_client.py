@@ -0,0 +1,195 @@
+# Copyright (c) 2026, Evgheni Nemerenco and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import requests
+from frappe.tests.utils import FrappeTestCase
+from zeep.exceptions import Fault
+
+from erpnext_moldova_efactura import api_client
+from erpnext_moldova_efactura.api_client import (
+	EFacturaAPIClient,
+	EFacturaAPIError,
+	EFacturaCircuitOpenError,
+	RetryPolicy,
+)
+from erpnext_moldova_efactura.utils import circuit_breaker
+
+
+class FakeCache:
+	"""The raw Redis calls of the circuit breaker, on a dict; values are stored as bytes like Redis does."""
+
+	def __init__(self):
+		self.data = {}
+
+	def make_key(self, key):
+		return key
+
+	def get(self, key):
+		return self.data.get(key)
+
+	def set(self, key, value, nx=False, ex=None):
+		if nx and key in self.data:
+			return None
+		self.data[key] = str(value).encode()
+		return True
+
+	def incr(self, key):
+		value = int(self.data.get(key) or 0) + 1
+		self.data[key] = str(value).encode()
+		return value
+
+	def delete(self, *keys):
+		for key in keys:
+			self.data.pop(key, None)
+
+	def mget(self, keys):
+		return [self.data.get(key) for key in keys]
+
+
+class FakeService:
+	"""Bound zeep service whose methods replay a script of results and exceptions."""
+
+	def __init__(self, **scripts):
+		self.scripts = {method: list(script) for method, script in scripts.items()}
+		self.calls = []
+
+	def __getattr__(self, method_name):
+		def method(*args, **kwargs):
+			self.calls.append(method_name)
+			outcome = self.scripts[method_name].pop(0)
+			if isinstance(outcome, Exception):
+				raise outcome
+			return outcome
+
+		return method
+
+
+OK = {"Results": {"Invoice": []}}
+
+
+def make_client(service, retry_policies=None, threshold=5, cooldown=60):
+	# Skip __init__: no WSDL is downloaded, the fake service takes the place of the bound one
+	client = EFacturaAPIClient.__new__(EFacturaAPIClient)
+	client._init_resilience(retry_policies, threshold, cooldown)
+	client.capture = None
+	client.service = service
+	return client
+
+
+class ResilienceTestCase(FrappeTestCase):
+	def setUp(self):
+		self.cache = FakeCache()
+		self.sleeps = []
+		self.now = 1_000_000.0
+		for target, attribute, value in (
+			(circuit_breaker.frappe, "cache", self.cache),
+			(circuit_breaker.time, "time", lambda: self.now),
+			(api_client.time, "sleep", self.sleeps.append),
+			(api_client.api_metrics, "record_call", lambda *args, **kwargs: None),
+		):
+			patcher = patch.object(target, attribute, value)
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+
+class TestRetry(ResilienceTestCase):
+	def test_transient_errors_are_retried(self):
+		service = FakeService(
+			SearchInvoices=[requests.ConnectionError("reset"), requests.Timeout("slow"), OK]
+		)
+		client = make_client(service, {"SearchInvoices": (3, 500, 8000)})
+
+		self.assertEqual(client._call("SearchInvoices", request={}), OK)
+		self.assertEqual(len(service.calls), 3)
+		self.assertEqual(len(self.sleeps), 2)
+
+	def test_gives_up_after_max_attempts(self):
+		service = FakeService(SearchInvoices=[requests.ConnectionError("reset")] * 3)
+		client = make_client(service, {"SearchInvoices": (3, 500, 8000)})
+
+		with self.assertRaises(EFacturaAPIError):
+			client._call("SearchInvoices", request={})
+		self.assertEqual(len(service.calls), 3)
+
+	def test_soap_faults_are_not_retried(self):
+		service = FakeService(SearchInvoices=[Fault("Invalid request")])
+		client = make_client(service, {"SearchInvoices": (3, 500, 8000)})
+
+		with self.assertRaises(EFacturaAPIError):
+			client._call("SearchInvoices", request={})
+		self.assertEqual(len(service.calls), 1)
+		# An answer from e-Factura is not an outage
+		self.assertEqual(circuit_breaker.get_state()["failures"], 0)
+
+	def test_only_idempotent_methods_are_retried(self):
+		service = FakeService(PostInvoices=[requests.ConnectionError("reset"), OK])
+		client = make_client(service, {"PostInvoices": (3, 500, 8000), "SearchInvoices": (3, 500, 8000)})
+
+		self.assertNotIn("PostInvoices", client.retry_policies)
+		with self.assertRaises(EFacturaAPIError):
+			client._call("PostInvoices", request={})
+		self.assertEqual(len(service.calls), 1)
+		self.assertEqual(self.sleeps, [])
+
+	def test_backoff_is_full_jitter_within_bounds(self):
+		policy = RetryPolicy(max_attempts=8, base_delay=0.5, max_delay=8.0)
+		caps = {1: 0.5, 2: 1.0, 3: 2.0, 4: 4.0, 5: 8.0, 6: 8.0}
+
+		with patch.object(api_client.random, "uniform", side_effect=lambda low, high: (low, high)):
+			for attempt, cap in caps.items():
+				self.assertEqual(policy.backoff(attempt), (0, cap))
+
+		for attempt, cap in caps.items():
+			for _ in range(50):
+				self.assertTrue(0 <= policy.backoff(attempt) <= cap)
+
+
+class TestCircuitBreaker(ResilienceTestCase):
+	def open_breaker(self, client):
+		for _ in range(client.breaker.threshold):
+			with self.assertRaises(EFacturaAPIError):
+				client._call("SearchInvoices", request={})
+		self.assertEqual(circuit_breaker.get_state()["state"], circuit_breaker.OPEN)
+
+	def test_opens_after_threshold_and_fails_fast(self):
+		service = FakeService(SearchInvoices=[requests.ConnectionError("down")] * 2)
+		client = make_client(service, threshold=2, cooldown=60)
+		self.open_breaker(client)
+
+		self.now += 59
+		with self.assertRaises(EFacturaCircuitOpenError):
+			client._call("SearchInvoices", request={})
+		self.assertEqual(len(service.calls), 2)
+
+	def test_half_open_probe_success_closes(self):
+		service = FakeService(SearchInvoices=[requests.ConnectionError("down")] * 2 + [OK, OK])
+		client = make_client(service, threshold=2, cooldown=60)
+		self.open_breaker(client)
+
+		self.now += 60
+		# Exactly one caller gets to probe after the cooldown
+		self.assertTrue(client.breaker.allow_request())
+		self.assertEqual(circuit_breaker.get_state()["state"], circuit_breaker.HALF_OPEN)
+		self.assertFalse(client.breaker.allow_request())
+
+		client.breaker.record_success()
+		state = circuit_breaker.get_state()
+		self.assertEqual((state["state"], state["failures"]), (circuit_breaker.CLOSED, 0))
+		self.assertEqual(client._call("SearchInvoices", request={}), OK)
+
+	def test_half_open_probe_failure_reopens(self):
+		service = FakeService(SearchInvoices=[requests.ConnectionError("down")] * 3)
+		client = make_client(service, threshold=2, cooldown=60)
+		self.open_breaker(client)
+
+		self.now += 60
+		with self.assertRaises(EFacturaAPIError):
+			client._call("SearchInvoices", request={})
+		state = circuit_breaker.get_state()
+		self.assertEqual((state["state"], state["opened_at"]), (circuit_breaker.OPEN, self.now))
+
+		with self.assertRaises(EFacturaCircuitOpenError):
+			client._call("SearchInvoices", request={})
+		self.assertEqual(len(service.calls), 3)
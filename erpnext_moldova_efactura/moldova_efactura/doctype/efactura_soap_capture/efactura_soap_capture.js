@@ -0,0 +1,27 @@
+// Copyright (c) 2026, Evgheni Nemerenco and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on('eFactura SOAP Capture', {
+    refresh(frm) {
+        frm.add_custom_button(__('Show Envelopes'), () => {
+            frappe.call({
+                method: 'erpnext_moldova_efactura.moldova_efactura.doctype.efactura_soap_capture.efactura_soap_capture.get_envelopes',
+                args: { name: frm.doc.name },
+                callback(r) {
+                    if (!r.message) return;
+
+                    const d = new frappe.ui.Dialog({
+                        title: __('SOAP Envelopes'),
+                        size: 'extra-large',
+                        fields: [
+                            { fieldtype: 'Code', fieldname: 'request', label: __('Request'), options: 'XML', read_only: 1 },
+                            { fieldtype: 'Code', fieldname: 'response', label: __('Response'), options: 'XML', read_only: 1 },
+                        ],
+                    });
+                    d.set_values(r.message);
+                    d.show();
+                }
+            });
+        });
+    }
+});
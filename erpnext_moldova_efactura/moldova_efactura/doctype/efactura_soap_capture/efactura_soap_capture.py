@@ -0,0 +1,23 @@
+# Copyright (c) 2026, Evgheni Nemerenco and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+from erpnext_moldova_efactura.utils.soap_capture import unpack
+
+
+class eFacturaSOAPCapture(Document):
+	pass
+
+
+@frappe.whitelist()
+def get_envelopes(name):
+	"""Decompressed request and response envelopes of a capture."""
+	doc = frappe.get_doc("eFactura SOAP Capture", name)
+	doc.check_permission("read")
+
+	return {
+		"request": unpack(doc.request_gz),
+		"response": unpack(doc.response_gz),
+	}
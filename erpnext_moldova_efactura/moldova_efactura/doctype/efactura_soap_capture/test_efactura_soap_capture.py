@@ -0,0 +1,58 @@
+# Copyright (c) 2026, Evgheni Nemerenco and Contributors
+# See license.txt
+
+import json
+from unittest.mock import MagicMock, patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext_moldova_efactura.utils import soap_capture
+
+PASSWORD = "s3cr3t-P@ss"
+NONCE = "bm9uY2UtdmFsdWUtMTIzNDU2"
+
+ENVELOPE = f"""<soap-env:Envelope xmlns:soap-env="http://schemas.xmlsoap.org/soap/envelope/">
+  <soap-env:Header>
+    <wsse:Security xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
+      <wsse:UsernameToken>
+        <wsse:Username>efactura-user</wsse:Username>
+        <wsse:Password Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText">{PASSWORD}</wsse:Password>
+        <wsse:Nonce EncodingType="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-soap-message-security-1.0#Base64Binary">{NONCE}</wsse:Nonce>
+      </wsse:UsernameToken>
+    </wsse:Security>
+  </soap-env:Header>
+  <soap-env:Body><SearchInvoices/></soap-env:Body>
+</soap-env:Envelope>"""
+
+
+class TesteFacturaSOAPCapture(FrappeTestCase):
+	def test_redact_hides_username_token_secrets(self):
+		packed, size = soap_capture._pack(soap_capture._redact(ENVELOPE), 65536)
+		stored = soap_capture.unpack(packed)
+
+		self.assertNotIn(PASSWORD, stored)
+		self.assertNotIn(NONCE, stored)
+		self.assertIn("<wsse:Password", stored)
+		self.assertIn(">***</wsse:Nonce>", stored)
+		self.assertIn("<wsse:Username>efactura-user</wsse:Username>", stored)
+		self.assertEqual(size, len(stored.encode("utf-8")))
+
+	def test_redact_before_truncation(self):
+		# Cut right after the first characters of the password
+		cut = ENVELOPE.index(PASSWORD) + 4
+		packed, _ = soap_capture._pack(soap_capture._redact(ENVELOPE), cut)
+
+		self.assertNotIn(PASSWORD[:4], soap_capture.unpack(packed))
+
+	def test_capture_queues_redacted_envelope(self):
+		pipe = MagicMock()
+		cache = MagicMock()
+		cache.pipeline.return_value = pipe
+
+		with patch.object(soap_capture.frappe, "cache", cache):
+			soap_capture.capture("SearchInvoices", soap_capture.SAMPLED, 12.3, request=ENVELOPE)
+
+		entry = json.loads(pipe.lpush.call_args.args[1])
+		request = soap_capture.unpack(entry["request_gz"])
+		self.assertNotIn(PASSWORD, request)
+		self.assertNotIn(NONCE, request)
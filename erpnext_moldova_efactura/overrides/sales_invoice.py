@@ -1,11 +1,45 @@
+import time
+
 import frappe
-from erpnext_moldova_efactura.utils.fiscal_status import determine_fiscal_status
+
+from erpnext_moldova_efactura.utils.fiscal_status import (
+    ensure_fiscal_territory_configured,
+    territory_in_fiscal_scope,
+)
+
+# Time the submit hook may take before it is reported in the log
+ON_SUBMIT_BUDGET_MS = 20
 
 
 def on_submit(doc, method=None):
     """
-    Set fiscal_status on Sales Invoice submit
+    Set fiscal_status on Sales Invoice submit.
+
+    "Not Required" / "Not Applicable" are decided from the cached Customer and the cached
+    territory scope map. Otherwise the invoice is "Pending": it cannot have an eFactura yet,
+    and the eFactura hooks re-evaluate it once one is linked.
     """
-    status = determine_fiscal_status(doc)
+    started = time.perf_counter()
+
+    customer_type, territory = frappe.get_cached_value(
+        "Customer", doc.customer, ["customer_type", "territory"]
+    ) or (None, None)
+
+    if customer_type != "Company":
+        status = "Not Required"
+    else:
+        ensure_fiscal_territory_configured(doc)
+
+        if not territory_in_fiscal_scope(territory):
+            status = "Not Applicable"
+        else:
+            status = "Pending"
 
     doc.db_set("fiscal_status", status, update_modified=False)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms > ON_SUBMIT_BUDGET_MS:
+        frappe.logger("erpnext_moldova_efactura").warning(
+            f"Sales Invoice {doc.name}: fiscal status hook took {elapsed_ms:.1f} ms "
+            f"(budget {ON_SUBMIT_BUDGET_MS} ms)"
+        )
@@ -0,0 +1,13 @@
+import frappe
+
+from erpnext_moldova_efactura.install import ensure_indexes
+
+
+def execute():
+	"""Add composite indexes for the status sync and lookup queries, and the
+	(ef_series, ef_number) unique key.
+
+	after_migrate keeps them in place afterwards, e.g. when a table is rebuilt.
+	"""
+	ensure_indexes()
+	frappe.db.commit()
@@ -0,0 +1,13 @@
+import frappe
+
+
+def execute():
+	"""Fill eFactura Invoice Summary from the existing eFacturas.
+
+	From here on the rows are refreshed whenever an eFactura linked to the Sales Invoice
+	changes; `bench efactura-rebuild-summary` rebuilds them on demand.
+	"""
+	from erpnext_moldova_efactura.utils import efactura_summary
+
+	written = efactura_summary.rebuild()
+	frappe.logger().info(f"[eFactura] Built {written} Sales Invoice summary row(s)")
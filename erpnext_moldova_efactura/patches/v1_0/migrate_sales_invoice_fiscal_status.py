@@ -1,54 +1,68 @@
+import time
+
 import frappe
 
+CURSOR_KEY = "efactura_fiscal_status_migration_cursor"
+PAGE_SIZE = 5000
+
 
 def execute():
-    from erpnext_moldova_efactura.utils.fiscal_status import determine_fiscal_status
+    run()
 
-    frappe.logger().info("[eFactura] Migration: start Sales Invoice fiscal_status")
 
-    # Берём ТОЛЬКО submitted SI
-    si_names = frappe.get_all(
-        "Sales Invoice",
-        filters={"docstatus": 1},
-        pluck="name",
-    )
+def run(page_size=PAGE_SIZE):
+    """Set fiscal_status on submitted Sales Invoices, streaming them page by page.
+
+    Keyset pagination over name; each page is evaluated with the set-based rules (only
+    the columns they need are read), written back in bulk and committed together with
+    the cursor, so an interrupted migration resumes after the last committed page.
+    """
+    from erpnext_moldova_efactura.utils.fiscal_status import determine_fiscal_status_bulk, write_fiscal_status
+
+    cursor = frappe.db.get_global(CURSOR_KEY) or ""
+    logger = frappe.logger()
+    logger.info(f"[eFactura] Migration: start Sales Invoice fiscal_status (cursor={cursor!r})")
+
+    started = time.monotonic()
+    total = updated = 0
+
+    while True:
+        rows = frappe.db.sql(
+            """
+            SELECT name, fiscal_status
+            FROM `tabSales Invoice`
+            WHERE docstatus = 1 AND name > %(cursor)s
+            ORDER BY name
+            LIMIT %(limit)s
+            """,
+            {"cursor": cursor, "limit": page_size},
+        )
+        if not rows:
+            break
 
-    total = len(si_names)
-    updated = 0
-    skipped = 0
-
-    for name in si_names:
-        try:
-            si = frappe.get_doc("Sales Invoice", name)
-
-            new_status = determine_fiscal_status(si)
-
-            # Ничего не делаем, если статус пустой
-            if not new_status:
-                skipped += 1
-                continue
-
-            # Не обновляем, если статус уже совпадает
-            if si.get("fiscal_status") == new_status:
-                skipped += 1
-                continue
-
-            si.db_set("fiscal_status", new_status, update_modified=False)
-            updated += 1
-
-        except frappe.ValidationError:
-            # Например: не настроена Fiscal Territory
-            skipped += 1
-            continue
-
-        except Exception:
-            frappe.log_error(
-                frappe.get_traceback(),
-                f"eFactura migration failed for Sales Invoice {name}",
-            )
-            skipped += 1
-            continue
-
-    frappe.logger().info(
-        f"[eFactura] Migration completed: total={total}, updated={updated}, skipped={skipped}"
-    )
\ No newline at end of file
+        current = dict(rows)
+        statuses = determine_fiscal_status_bulk(list(current))
+
+        # Empty statuses and unchanged values are not written
+        changed = {name: status for name, status in statuses.items() if status and current[name] != status}
+        write_fiscal_status(changed)
+
+        cursor = rows[-1][0]
+        frappe.db.set_global(CURSOR_KEY, cursor)
+        frappe.db.commit()
+
+        total += len(rows)
+        updated += len(changed)
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"[eFactura] Migration: {total} invoice(s), {updated} updated, "
+            f"{total / elapsed if elapsed else 0:.0f} invoices/s, cursor={cursor!r}"
+        )
+
+    frappe.db.set_global(CURSOR_KEY, "")
+    frappe.db.commit()
+
+    logger.info(
+        f"[eFactura] Migration completed: total={total}, updated={updated}, skipped={total - updated}, "
+        f"elapsed={time.monotonic() - started:.1f}s"
+    )
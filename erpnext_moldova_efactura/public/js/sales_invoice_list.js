@@ -61,8 +61,12 @@
             __('Starting...')
           );
 
-          // 2 subscribe for realtime-progress updates
+          // 2 subscribe for realtime-progress updates of this run only
+          let run_id = null;
+
           const progress_handler = data => {
+            if (run_id && data.run_id !== run_id) return;
+
             frappe.show_progress(
               __('Actualizing Fiscal Status'),
               data.current,
@@ -72,25 +76,41 @@
           };
 
           const done_handler = data => {
-            frappe.hide_progress();
-            frappe.show_alert({
-              message: __('Fiscal status updated for {0} invoices.', [data.updated]),
-              indicator: 'green'
-            });
+            if (run_id && data.run_id !== run_id) return;
 
+            frappe.hide_progress();
             frappe.realtime.off('bulk_si_fiscal_status_progress', progress_handler);
             frappe.realtime.off('bulk_si_fiscal_status_done', done_handler);
 
+            if (data.failed_chunks) {
+              frappe.confirm(
+                __('Fiscal status updated for {0} invoices, but {1} batch(es) failed. Resume the failed batches?',
+                  [data.updated, data.failed_chunks]),
+                () => frappe.call({
+                  method: 'erpnext_moldova_efactura.api.fiscal_status.resume_bulk_si_job',
+                  args: { run_id: data.run_id }
+                })
+              );
+            } else {
+              frappe.show_alert({
+                message: __('Fiscal status updated for {0} invoices.', [data.updated]),
+                indicator: 'green'
+              });
+            }
+
             listview.refresh();
           };
 
           frappe.realtime.on('bulk_si_fiscal_status_progress', progress_handler);
           frappe.realtime.on('bulk_si_fiscal_status_done', done_handler);
 
-          // 3 start background job
+          // 3 start background jobs
           frappe.call({
             method: 'erpnext_moldova_efactura.api.fiscal_status.start_bulk_si_job',
-            args: { names }
+            args: { names },
+            callback(r) {
+              run_id = r.message && r.message.run_id;
+            }
           });
         }
       );
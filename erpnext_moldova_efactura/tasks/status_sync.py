@@ -1,7 +1,14 @@
+import asyncio
+import json
+import time
+
 import frappe
-from frappe.utils import now_datetime, add_days
-from erpnext_moldova_efactura.api_client import EFacturaAPIClient
+from frappe.utils import add_days, add_to_date, cint, get_datetime, getdate, now_datetime
 
+from erpnext_moldova_efactura.api_client import AsyncEFacturaAPIClient, EFacturaAPIClient, run_async
+from erpnext_moldova_efactura.utils.efactura_status import apply_sync_results, refresh_reference_fiscal_status
+from erpnext_moldova_efactura.utils.settings import get_settings
+from erpnext_moldova_efactura.utils.status_polling import plan_check
 
 CHECKABLE_EF_STATUSES = (
     0,  # Draft
@@ -19,43 +26,200 @@ CANCELLED_BY_SUPPLIER = 5
 DEFAULT_LOOKBACK_DAYS = 365
 MAX_RESULTS_PER_RUN = 20000  # safety limit
 BATCH_SIZE = 50
+# List of statuses to check in sequence (eFactura API requires status filter)
+SEARCH_STATUSES = (0, 1, 7, 8, 3, 2, 5, 10, 4, 6, 9)
+DEFAULT_STATUS_BATCH_SIZE = 1000  # CheckInvoicesStatus is chunked by the API client
+DEFAULT_STATUS_SYNC_BUDGET_SECONDS = 240
+JOB_TIMEOUT_SAFETY_RATIO = 0.8  # leave room to commit and log before RQ kills the job
+STATUS_SYNC_CHECKPOINT_KEY = "efactura_status_sync_checkpoint"
+DEFAULT_CANCEL_SYNC_OVERLAP_HOURS = 24
+DEFAULT_CANCEL_SYNC_FULL_SWEEP_DAYS = 7
+CANCEL_SYNC_CHUNK_SIZE = 500
+DRAFT_SYNC_INDEX = "Index"
+DRAFT_SYNC_WINDOW_MARGIN_DAYS = 3  # e-Factura issue date may precede the posting date
+DRAFT_SYNC_MAX_WINDOW_DAYS = 90  # older drafts are probed one by one instead of widening the index
+DRAFT_SYNC_INDEX_PAGE_SIZE = 1000  # drafts resolved from the index per query
+# Submitted drafts without a series/number yet
+DRAFT_CONDITIONS = """
+    docstatus = 1
+    AND ef_status = %(draft)s
+    AND (ef_series IS NULL OR ef_series = '')
+    AND (ef_number IS NULL OR ef_number = '')
+"""
 
 def sync_efactura_statuses():
+    """
+    Check statuses of open eFacturas that are due (next_status_check), most overdue
+    first, batch after batch until the backlog is drained or the time budget is spent.
+    Every checked document is rescheduled from its status, age and recent activity.
+
+    The cursor is checkpointed after every committed batch, so a run that is stopped
+    resumes where it left off instead of re-checking documents the API did not answer for.
+    """
     started_at = now_datetime()
+    started = time.monotonic()
+    batch_size = get_settings().status_sync_batch_size or DEFAULT_STATUS_BATCH_SIZE
+    budget = _time_budget_seconds()
+
+    checkpoint = _load_checkpoint()
+    boundary = checkpoint.get("boundary") or str(started_at)
+    cursor = (checkpoint.get("last_check"), checkpoint.get("name")) if checkpoint.get("name") else None
+
+    client = EFacturaAPIClient.from_settings()
+    totals = frappe._dict(batches=0, checked=0, updated=0, unchanged=0, missing=0, errors=0, missing_docs=[])
+    drained = False
+    slowest_batch = 0.0
+
+    while True:
+        elapsed = time.monotonic() - started
+        if totals.batches and elapsed + slowest_batch > budget:
+            break
+
+        docs = _next_status_batch(boundary, cursor, batch_size)
+        if not docs:
+            drained = True
+            break
+
+        batch_started = time.monotonic()
+        stats = _sync_status_batch(client, docs)
+        if stats is None:
+            # API failure: keep the checkpoint so the next run retries this batch
+            break
+
+        last = docs[-1]
+        cursor = (str(last.next_status_check) if last.next_status_check else None, last.name)
+        _save_checkpoint({"boundary": boundary, "last_check": cursor[0], "name": cursor[1]})
+        frappe.db.commit()
+
+        totals.batches += 1
+        totals.checked += len(docs)
+        for key in ("updated", "unchanged", "missing", "errors"):
+            totals[key] += stats[key]
+        totals.missing_docs.extend(stats.missing_docs[: max(0, 5 - len(totals.missing_docs))])
+        slowest_batch = max(slowest_batch, time.monotonic() - batch_started)
+
+        if len(docs) < batch_size:
+            drained = True
+            break
+
+    if drained:
+        _save_checkpoint({})
+        frappe.db.commit()
+
+    elapsed = time.monotonic() - started
+    rate = totals.checked / elapsed if elapsed else 0.0
+    summary = [
+        f"Started at: {started_at}",
+        f"Elapsed: {elapsed:.1f}s of {budget}s budget",
+        f"Batches: {totals.batches} x {batch_size}",
+        f"Checked: {totals.checked} ({rate:.1f} docs/s)",
+        f"Updated: {totals.updated}",
+        f"Unchanged: {totals.unchanged}",
+        f"Missing in API response: {totals.missing}",
+        f"Errors: {totals.errors}",
+        f"Backlog drained: {'yes' if drained else 'no'}",
+    ]
+
+    frappe.logger("erpnext_moldova_efactura").info("eFactura status sync: " + "; ".join(summary))
+
+    if totals.missing or totals.errors:
+        if totals.missing_docs:
+            summary.append(f"Missing documents: {', '.join(totals.missing_docs)}")
+
+        frappe.log_error(
+            title="eFactura status sync summary (with issues)",
+            message="\n".join(summary),
+        )
+
+
+def _time_budget_seconds() -> int:
+    """Configured budget, capped so the run stops well before the RQ job timeout."""
+    budget = get_settings().status_sync_time_budget_seconds or DEFAULT_STATUS_SYNC_BUDGET_SECONDS
+
+    try:
+        from rq import get_current_job
+
+        job = get_current_job()
+    except Exception:
+        job = None
+
+    if job and job.timeout and job.timeout > 0:
+        budget = min(budget, int(job.timeout * JOB_TIMEOUT_SAFETY_RATIO))
+
+    return budget
+
+
+def _load_checkpoint() -> dict:
+    raw = frappe.db.get_global(STATUS_SYNC_CHECKPOINT_KEY)
+    try:
+        return json.loads(raw) if raw else {}
+    except ValueError:
+        return {}
+
+
+def _save_checkpoint(checkpoint: dict):
+    frappe.db.set_global(STATUS_SYNC_CHECKPOINT_KEY, json.dumps(checkpoint) if checkpoint else "")
 
-    docs = frappe.db.sql(
-        """
+
+def _next_status_batch(boundary: str, cursor: tuple | None, batch_size: int) -> list:
+    """
+    Keyset page over (next_status_check, name) of documents due at the time the run (or
+    the interrupted run it resumes) started. Checked documents are rescheduled past the
+    boundary, so every document is visited at most once per run.
+    """
+    conditions = ["(next_status_check IS NULL OR next_status_check <= %(boundary)s)"]
+    values = {"statuses": CHECKABLE_EF_STATUSES, "boundary": boundary, "limit": batch_size}
+
+    if cursor:
+        next_check, name = cursor
+        values["cursor_name"] = name
+        if next_check is None:
+            conditions.append("(next_status_check IS NOT NULL OR name > %(cursor_name)s)")
+        else:
+            values["cursor_check"] = next_check
+            conditions.append(
+                """(
+                    next_status_check > %(cursor_check)s
+                    OR (next_status_check = %(cursor_check)s AND name > %(cursor_name)s)
+                )"""
+            )
+
+    return frappe.db.sql(
+        f"""
         SELECT
             name,
+            creation,
             ef_series,
             ef_number,
             ef_status,
-            last_status_check
+            next_status_check,
+            last_status_change,
+            recent_status_changes
         FROM `tabeFactura`
         WHERE
             docstatus = 1
             AND ef_status IN %(statuses)s
             AND ef_series IS NOT NULL AND ef_series != ''
             AND ef_number IS NOT NULL AND ef_number != ''
+            AND {" AND ".join(conditions)}
         ORDER BY
             CASE
-                WHEN last_status_check IS NULL THEN 0
+                WHEN next_status_check IS NULL THEN 0
                 ELSE 1
             END,
-            last_status_check ASC
+            next_status_check ASC,
+            name ASC
         LIMIT %(limit)s
         """,
-        {"statuses": CHECKABLE_EF_STATUSES, "limit": BATCH_SIZE},
+        values,
         as_dict=True,
     )
 
-    if not docs:
-        return
 
+def _sync_status_batch(client, docs: list):
+    """Check one batch via CheckInvoicesStatus and apply the results. Returns stats, or None on API failure."""
     seria_and_numbers = [{"Seria": row.ef_series, "Number": row.ef_number} for row in docs]
 
-    client = EFacturaAPIClient.from_settings()
-
     try:
         response = client.check_invoices_status(seria_and_numbers=seria_and_numbers)
     except Exception:
@@ -63,61 +227,46 @@ def sync_efactura_statuses():
             title="eFactura batch status request failed",
             message=frappe.get_traceback(),
         )
-        return
+        return None
 
     statuses = _extract_status_map(response)
+    stats = frappe._dict(updated=0, unchanged=0, missing=0, errors=0, missing_docs=[])
     now_ts = now_datetime()
 
-    total = len(docs)
-    updated = 0
-    unchanged = 0
-    missing_count = 0
-    errors = 0
-
-    missing_docs = []
-
+    updates = {}
+    checked = []
     for row in docs:
-        try:
-            key = (str(row.ef_series), str(row.ef_number))
-            new_status = statuses.get(key)
-
-            if new_status is None:
-                missing_count += 1
-                if len(missing_docs) < 5:
-                    missing_docs.append(f"{row.ef_series}{row.ef_number}")
-                continue
-
-            doc = frappe.get_doc("eFactura", row.name)
-
-            if doc.ef_status != new_status:
-                doc.db_set("ef_status", new_status, update_modified=False)
-                doc.set_status()
-                updated += 1
-            else:
-                unchanged += 1
+        new_status = statuses.get((str(row.ef_series), str(row.ef_number)))
 
-            doc.db_set("last_status_check", now_ts, update_modified=False)
-
-        except Exception:
-            errors += 1
+        if new_status is None:
+            stats.missing += 1
+            if len(stats.missing_docs) < 5:
+                stats.missing_docs.append(f"{row.ef_series}{row.ef_number}")
+            continue
 
-    if missing_count or errors:
-        msg_lines = [
-            f"Started at: {started_at}",
-            f"Batch size: {total}",
-            f"Updated: {updated}",
-            f"Unchanged: {unchanged}",
-            f"Missing in API response: {missing_count}",
-            f"Errors: {errors}",
-        ]
-        if missing_docs:
-            msg_lines.append(f"Missing documents: {', '.join(missing_docs)}")
+        checked.append(row.name)
+        # Reschedule by status, age and recent activity
+        updates[row.name] = plan_check(row, new_status, now_ts)
+        if row.ef_status != new_status:
+            updates[row.name]["ef_status"] = new_status
+            stats.updated += 1
+        else:
+            stats.unchanged += 1
 
-        # Логируем один раз по итогу процедуры
+    try:
+        changed = apply_sync_results(updates, checked, now_ts)
+    except Exception:
+        frappe.db.rollback()
         frappe.log_error(
-            title="eFactura status sync summary (with issues)",
-            message="\n".join(msg_lines),
+            title="eFactura status write-back failed",
+            message=frappe.get_traceback(),
         )
+        stats.errors += len(checked)
+        stats.updated = stats.unchanged = 0
+        return stats
+
+    refresh_reference_fiscal_status(changed)
+    return stats
 
 
 def _extract_status_map(response: dict) -> dict:
@@ -153,23 +302,38 @@ def _extract_status_map(response: dict) -> dict:
 def sync_efactura_cancelled_from_search_invoices():
     """
     Daily job:
-    - Pull invoices from e-Factura via SearchInvoices
+    - Pull invoices cancelled by the supplier from e-Factura via SearchInvoices, issued
+      since the high-water mark of the last successful run minus a small overlap
     - Filter InvoiceStatus == 5 (Canceled by Supplier)
     - Update local docs to ef_status = 5
-    """
-    settings = frappe.get_single("eFactura Settings")
 
-    lookback_days = int(getattr(settings, "cancel_sync_lookback_days", None) or DEFAULT_LOOKBACK_DAYS)
-    date_from = add_days(now_datetime(), -lookback_days)
+    SearchInvoices filters by issue date only, so an invoice cancelled long after it was
+    issued falls outside the incremental window; a periodic full sweep over the whole
+    lookback window picks those up.
+    """
+    settings = get_settings()
 
     date_to = now_datetime()
+    lookback_days = settings.cancel_sync_lookback_days or DEFAULT_LOOKBACK_DAYS
+    overlap_hours = settings.cancel_sync_overlap_hours or DEFAULT_CANCEL_SYNC_OVERLAP_HOURS
+    full_sweep_days = settings.cancel_sync_full_sweep_days or DEFAULT_CANCEL_SYNC_FULL_SWEEP_DAYS
+
+    # Sync bookkeeping, not configuration: read it fresh rather than from the snapshot
+    watermark = frappe.db.get_single_value("eFactura Settings", "cancel_sync_watermark")
+    last_full_sweep = frappe.db.get_single_value("eFactura Settings", "cancel_sync_last_full_sweep")
+    full_sweep = (
+        not watermark
+        or not last_full_sweep
+        or get_datetime(last_full_sweep) <= add_days(date_to, -full_sweep_days)
+    )
+
+    if full_sweep:
+        date_from = add_days(date_to, -lookback_days)
+    else:
+        date_from = add_to_date(get_datetime(watermark), hours=-overlap_hours)
 
-    # Build API call
-    from erpnext_moldova_efactura.api_client import EFacturaAPIClient
     client = EFacturaAPIClient.from_settings()
 
-    # NOTE: parameter names depend on the SOAP contract you use.
-    # Replace keys below to match your API spec if needed.
     parameters = {
         "InvoiceStatus": CANCELLED_BY_SUPPLIER,
         "IssuedOn": {
@@ -184,17 +348,22 @@ def sync_efactura_cancelled_from_search_invoices():
         return
 
     cancelled = _extract_rows_from_invoices_response(resp)
-    
-    if not cancelled:
-        return
 
     # Optional: limit to avoid excessive DB load
+    truncated = len(cancelled) > MAX_RESULTS_PER_RUN
     cancelled = cancelled[:MAX_RESULTS_PER_RUN]
 
-    updated = _apply_cancelled_status_to_local_docs(cancelled)
+    updated = _apply_cancelled_status_to_local_docs(cancelled) if cancelled else 0
+
+    # Only advance the mark when everything in the window was applied
+    if not truncated:
+        frappe.db.set_single_value("eFactura Settings", "cancel_sync_watermark", date_to)
+        if full_sweep:
+            frappe.db.set_single_value("eFactura Settings", "cancel_sync_last_full_sweep", date_to)
 
     frappe.logger().info(
-        f"e-Factura cancelled sync finished. from={date_from} to={date_to} cancelled={len(cancelled)} updated={updated}"
+        f"e-Factura cancelled sync finished. from={date_from} to={date_to} full_sweep={full_sweep} "
+        f"cancelled={len(cancelled)} updated={updated} truncated={truncated}"
     )
 
 
@@ -241,34 +410,38 @@ def _extract_rows_from_invoices_response(resp: dict) -> list[tuple[str, str, int
 
 def _apply_cancelled_status_to_local_docs(keys: list[tuple[str, str, int]]) -> int:
     """
-    Update local records. Adjust Doctype/fields below to match your data model.
+    Mark the local submitted eFacturas matching the cancelled (Seria, Number) keys.
+    The remote keys are matched with one join per chunk against tabeFactura.
     """
-    updated = 0
-    now_ts = now_datetime()
-
-    for seria, number, status in keys:
-        if status != CANCELLED_BY_SUPPLIER:
-            continue
-
-        # Example Doctype: "eFactura" (adjust if you store ef fields in Sales Invoice)
-        name = frappe.db.get_value(
-            "eFactura",
-            {"ef_series": seria, "ef_number": number, "docstatus": 1},
-            "name",
+    keys = [(seria, number) for seria, number, status in keys if status == CANCELLED_BY_SUPPLIER]
+    if not keys:
+        return 0
+
+    updates = {}
+    checked = []
+    for i in range(0, len(keys), CANCEL_SYNC_CHUNK_SIZE):
+        chunk = keys[i:i + CANCEL_SYNC_CHUNK_SIZE]
+        remote = " UNION ALL ".join(["SELECT %s AS ef_series, %s AS ef_number"] * len(chunk))
+        rows = frappe.db.sql(
+            f"""
+            SELECT ef.name, ef.ef_status
+            FROM `tabeFactura` ef
+            INNER JOIN ({remote}) remote
+                ON remote.ef_series = ef.ef_series AND remote.ef_number = ef.ef_number
+            WHERE ef.docstatus = 1
+            """,
+            [value for key in chunk for value in key],
+            as_dict=True,
         )
-        if not name:
-            continue
+        for row in rows:
+            checked.append(row.name)
+            if cint(row.ef_status) != CANCELLED_BY_SUPPLIER:
+                updates[row.name] = {"ef_status": CANCELLED_BY_SUPPLIER}
 
-        doc = frappe.get_doc("eFactura", name)
+    changed = apply_sync_results(updates, checked, now_datetime())
+    refresh_reference_fiscal_status(changed)
 
-        if int(doc.ef_status or 0) != status:
-            doc.db_set("ef_status", status, update_modified=False)
-            doc.set_status()
-            updated += 1
-
-        doc.db_set("last_status_check", now_ts, update_modified=False)
-
-    return updated
+    return len(changed)
 
 
 def sync_efactura_draft_invoices_by_api_invoice_id():
@@ -280,28 +453,127 @@ def sync_efactura_draft_invoices_by_api_invoice_id():
 
     Strategy:
     - Select submitted local docs with ef_status == 0 (Draft)
-    - For each doc call SearchInvoices with Parameters.APIInvoiceId == doc.name
-    - Expect a single invoice in response; update ef_series, ef_number, ef_status locally
+    - "Index" mode (default): one SearchInvoices per status over the issue-date window
+      of the drafts, indexed by APIeInvoiceId; the cost depends on SEARCH_STATUSES, not
+      on the number of documents, so every draft inside the window is resolved, page by
+      page. The window is capped at DRAFT_SYNC_MAX_WINDOW_DAYS, drafts posted before it
+      are probed individually, BATCH_SIZE per run
+    - "Probe" mode: for each doc call SearchInvoices with Parameters.APIeInvoiceId == doc.name
+      (documents are probed concurrently through AsyncEFacturaAPIClient), BATCH_SIZE per run
+    - Expect a single invoice per document; update ef_series, ef_number, ef_status locally
     """
 
     started_at = now_datetime()
+    stats = frappe._dict(
+        checked=0, updated=0, unchanged=0, missing=0, multiple=0, errors=0, sample_missing=[], sample_multi=[]
+    )
 
-    # IMPORTANT: Table/Doctype name here matches your current code.
-    # If you store e-Factura fields on Sales Invoice instead, change "eFactura".
-    docs = frappe.db.sql(
-        """
-        SELECT
-            name,
-            ef_series,
-            ef_number,
-            ef_status,
-            last_status_check
+    mode = get_settings().draft_sync_mode or DRAFT_SYNC_INDEX
+
+    if mode == DRAFT_SYNC_INDEX:
+        window_start = getdate(add_days(started_at, -DRAFT_SYNC_MAX_WINDOW_DAYS))
+        _sync_drafts_from_index(window_start, stats)
+        probe = _draft_probe_batch(
+            "AND (posting_date IS NULL OR posting_date < %(window_start)s)", {"window_start": window_start}
+        )
+    else:
+        probe = _draft_probe_batch()
+
+    if probe:
+        # Probe the documents concurrently; each probe walks SEARCH_STATUSES until a match
+        try:
+            found = run_async(_search_invoices_by_api_invoice_id([row.name for row in probe]))
+        except Exception:
+            frappe.log_error(
+                title="eFactura draft sync by APIInvoiceId failed",
+                message=frappe.get_traceback(),
+            )
+        else:
+            _apply_draft_results(probe, found, stats)
+
+    if stats.missing or stats.multiple or stats.errors:
+        msg_lines = [
+            f"Started at: {started_at}",
+            f"Checked: {stats.checked}",
+            f"Updated: {stats.updated}",
+            f"Unchanged: {stats.unchanged}",
+            f"Missing in API response: {stats.missing}",
+            f"Multiple found in API response: {stats.multiple}",
+            f"Errors: {stats.errors}",
+        ]
+        if stats.sample_missing:
+            msg_lines.append(f"Missing (sample): {', '.join(stats.sample_missing)}")
+        if stats.sample_multi:
+            msg_lines.append(f"Multiple (sample): {', '.join(stats.sample_multi)}")
+
+        frappe.log_error(
+            title="eFactura draft sync by APIInvoiceId summary (with issues)",
+            message="\n".join(msg_lines),
+        )
+
+
+def _sync_drafts_from_index(window_start, stats):
+    """
+    Resolve every draft posted since window_start from one SearchInvoices index, paging
+    through them by name so a large backlog is neither loaded at once nor capped.
+    """
+    params = {"draft": DRAFT, "window_start": window_start}
+    earliest = frappe.db.sql(
+        f"""
+        SELECT MIN(posting_date)
         FROM `tabeFactura`
-        WHERE
-            docstatus = 1
-            AND ef_status = %(draft)s
-            AND (ef_series IS NULL OR ef_series = '')
-            AND (ef_number IS NULL OR ef_number = '')
+        WHERE {DRAFT_CONDITIONS}
+            AND posting_date >= %(window_start)s
+        """,
+        params,
+    )[0][0]
+
+    if not earliest:
+        return
+
+    try:
+        index = run_async(_search_invoices_index(add_days(earliest, -DRAFT_SYNC_WINDOW_MARGIN_DAYS)))
+    except Exception:
+        frappe.log_error(
+            title="eFactura draft sync SearchInvoices failed",
+            message=frappe.get_traceback(),
+        )
+        return
+
+    last_name = ""
+    while True:
+        # Keyset on name: resolved drafts leave the filter without shifting the next page
+        docs = frappe.db.sql(
+            f"""
+            SELECT name, ef_series, ef_number, ef_status, posting_date, last_status_check
+            FROM `tabeFactura`
+            WHERE {DRAFT_CONDITIONS}
+                AND posting_date >= %(window_start)s
+                AND name > %(last_name)s
+            ORDER BY name
+            LIMIT %(limit)s
+            """,
+            {**params, "last_name": last_name, "limit": DRAFT_SYNC_INDEX_PAGE_SIZE},
+            as_dict=True,
+        )
+        if not docs:
+            break
+
+        _apply_draft_results(docs, {row.name: index.get(row.name) for row in docs}, stats)
+
+        if len(docs) < DRAFT_SYNC_INDEX_PAGE_SIZE:
+            break
+        last_name = docs[-1].name
+
+
+def _draft_probe_batch(conditions: str = "", params: dict | None = None) -> list:
+    """The BATCH_SIZE least recently checked drafts matching conditions, to be probed one by one."""
+    return frappe.db.sql(
+        f"""
+        SELECT name, ef_series, ef_number, ef_status, posting_date, last_status_check
+        FROM `tabeFactura`
+        WHERE {DRAFT_CONDITIONS}
+            {conditions}
         ORDER BY
             CASE
                 WHEN last_status_check IS NULL THEN 0
@@ -310,56 +582,35 @@ def sync_efactura_draft_invoices_by_api_invoice_id():
             last_status_check ASC
         LIMIT %(limit)s
         """,
-        {"draft": DRAFT, "limit": BATCH_SIZE},
+        {**(params or {}), "draft": DRAFT, "limit": BATCH_SIZE},
         as_dict=True,
     )
 
-    if not docs:
-        return
-
-    client = EFacturaAPIClient.from_settings()
-
-    total = len(docs)
-    updated = 0
-    unchanged = 0
-    missing_in_api = 0
-    multiple_found = 0
-    errors = 0
-
-    now_ts = now_datetime()
-
-    # Keep a short sample in logs
-    sample_missing = []
-    sample_multi = []
-
-    # List of statuses to check in sequence (eFactura API requires status filter)
-    search_statuses = [0,1,7,8,3,2,5,10,4,6,9]
 
+def _apply_draft_results(docs: list, found: dict, stats):
+    """Write the e-Factura series/number/status found for docs and add to stats."""
+    updates = {}
+    checked = []
     for row in docs:
+        # Touch every looked-up draft, found or not, so missing ones rotate to the back
+        # of the queue instead of being picked first on every run
+        checked.append(row.name)
+        stats.checked += 1
         try:
-            
-            for status in search_statuses:
-                params = {
-                    "APIeInvoiceId": row.name, 
-                    "InvoiceStatus": status,
-                }
-
-                resp = client.search_invoices(actor_role=1, parameters=params)
-                inv = _extract_single_invoice_from_search_response(resp)
-                
-                if inv:
-                    break
+            inv = found.get(row.name)
+            if isinstance(inv, Exception):
+                raise inv
 
             if inv is None:
-                missing_in_api += 1
-                if len(sample_missing) < 5:
-                    sample_missing.append(row.name)
+                stats.missing += 1
+                if len(stats.sample_missing) < 5:
+                    stats.sample_missing.append(row.name)
                 continue
 
             if isinstance(inv, list):
-                multiple_found += 1
-                if len(sample_multi) < 5:
-                    sample_multi.append(row.name)
+                stats.multiple += 1
+                if len(stats.sample_multi) < 5:
+                    stats.sample_multi.append(row.name)
                 continue
 
             remote_series = (inv.get("Seria") or "").strip()
@@ -371,56 +622,127 @@ def sync_efactura_draft_invoices_by_api_invoice_id():
             except Exception:
                 remote_status_code = None
 
-            doc = frappe.get_doc("eFactura", row.name)
-
-            changed = False
+            values = {}
 
             # Set series/number if available
             if remote_series:
-                doc.db_set("ef_series", remote_series, update_modified=False)
-                changed = True
+                values["ef_series"] = remote_series
 
             if remote_number:
-                doc.db_set("ef_number", remote_number, update_modified=False)
-                changed = True
+                values["ef_number"] = remote_number
 
             # Update status if present and different
-            if remote_status_code is not None and int(doc.ef_status or 0) != remote_status_code:
-                doc.db_set("ef_status", remote_status_code, update_modified=False)
-                doc.set_status()
-                changed = True
+            if remote_status_code is not None and cint(row.ef_status) != remote_status_code:
+                values["ef_status"] = remote_status_code
 
-            # Always touch last_status_check so we don't re-check too aggressively
-            doc.db_set("last_status_check", now_ts, update_modified=False)
-
-            if changed:
-                updated += 1
+            if values:
+                updates[row.name] = values
+                stats.updated += 1
             else:
-                unchanged += 1
+                stats.unchanged += 1
 
         except Exception:
-            errors += 1
+            stats.errors += 1
 
-    if missing_in_api or multiple_found or errors:
-        msg_lines = [
-            f"Started at: {started_at}",
-            f"Batch size: {total}",
-            f"Updated: {updated}",
-            f"Unchanged: {unchanged}",
-            f"Missing in API response: {missing_in_api}",
-            f"Multiple found in API response: {multiple_found}",
-            f"Errors: {errors}",
-        ]
-        if sample_missing:
-            msg_lines.append(f"Missing (sample): {', '.join(sample_missing)}")
-        if sample_multi:
-            msg_lines.append(f"Multiple (sample): {', '.join(sample_multi)}")
+    changed = apply_sync_results(updates, checked, now_datetime())
+    refresh_reference_fiscal_status(changed)
 
-        frappe.log_error(
-            title="eFactura draft sync by APIInvoiceId summary (with issues)",
-            message="\n".join(msg_lines),
+
+def find_invoice_by_api_invoice_id(name: str):
+    """
+    Look up one locally Draft eFactura in e-Factura by APIeInvoiceId through the pooled
+    client, status by status until found. Returns the invoice dict, a list when several
+    match, or None.
+    """
+    client = EFacturaAPIClient.from_settings()
+    for status in SEARCH_STATUSES:
+        resp = client.search_invoices(
+            actor_role=1, parameters={"APIeInvoiceId": name, "InvoiceStatus": status}
+        )
+        inv = _extract_single_invoice_from_search_response(resp)
+        if inv:
+            return inv
+
+    return None
+
+
+async def _search_invoices_index(date_from) -> dict:
+    """
+    Returns {APIeInvoiceId: invoice | list} built from one SearchInvoices call per status,
+    all issued concurrently. A list means several invoices carry the same APIeInvoiceId.
+    Any failed call raises: a partial index would report found invoices as missing.
+    """
+    params = {"IssuedOn": {"StartDate": date_from}}
+
+    async with AsyncEFacturaAPIClient.from_settings() as client:
+        responses = await asyncio.gather(
+            *(
+                client.search_invoices(actor_role=1, parameters={**params, "InvoiceStatus": status})
+                for status in SEARCH_STATUSES
+            )
         )
 
+    index = {}
+    for resp in responses:
+        for inv in _extract_invoices(resp):
+            key = inv.get("APIeInvoiceId")
+            if not key:
+                continue
+
+            if key in index:
+                existing = index[key]
+                index[key] = (existing if isinstance(existing, list) else [existing]) + [inv]
+            else:
+                index[key] = inv
+
+    return index
+
+
+def _extract_invoices(resp: dict) -> list:
+    if not isinstance(resp, dict):
+        return []
+
+    results = resp.get("Results") or resp
+    invoices = results.get("Invoice") if isinstance(results, dict) else None
+
+    if not invoices:
+        return []
+
+    if isinstance(invoices, dict):
+        invoices = [invoices]
+
+    return [inv for inv in invoices if isinstance(inv, dict)]
+
+
+async def _search_invoices_by_api_invoice_id(names: list[str]) -> dict:
+    """
+    Returns {name: invoice | list | None | Exception} using SearchInvoices by APIeInvoiceId.
+    Documents are searched concurrently through AsyncEFacturaAPIClient.
+    """
+    async with AsyncEFacturaAPIClient.from_settings() as client:
+        results = await asyncio.gather(
+            *(_probe_api_invoice_id(client, name) for name in names),
+            return_exceptions=True,
+        )
+
+    return dict(zip(names, results, strict=True))
+
+
+async def _probe_api_invoice_id(client, name: str):
+    for status in SEARCH_STATUSES:
+        params = {
+            "APIeInvoiceId": name,
+            "InvoiceStatus": status,
+        }
+
+        resp = await client.search_invoices(actor_role=1, parameters=params)
+        inv = _extract_single_invoice_from_search_response(resp)
+
+        if inv:
+            return inv
+
+    return None
+
 
 def _extract_single_invoice_from_search_response(resp: dict):
     """Return a single invoice dict from SearchInvoices response.
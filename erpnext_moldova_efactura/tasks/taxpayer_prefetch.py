@@ -0,0 +1,116 @@
+import frappe
+from frappe.utils import add_days, getdate
+
+from erpnext_moldova_efactura.api_client import EFacturaAPIClient
+from erpnext_moldova_efactura.tasks.status_sync import CHECKABLE_EF_STATUSES
+from erpnext_moldova_efactura.utils import taxpayer_cache
+from erpnext_moldova_efactura.utils.settings import get_settings
+
+DEFAULT_PREFETCH_LOOKBACK_DAYS = 30
+DEFAULT_PREFETCH_BATCH_SIZE = 100
+PARTY_DOCTYPES = ("Company", "Customer", "Supplier")
+
+
+def prefetch_taxpayers():
+	"""
+	Warm the taxpayer cache for every party of recent Sales Invoices and pending eFacturas,
+	resolving the IDNOs in multi-code GetTaxpayersInfo batches.
+	"""
+	settings = get_settings()
+	idno_fields = {
+		"Company": settings.company_idno_field,
+		"Customer": settings.customer_idno_field,
+		"Supplier": settings.supplier_idno_field,
+	}
+	if not all(idno_fields.values()):
+		return
+
+	lookback_days = settings.taxpayer_prefetch_lookback_days or DEFAULT_PREFETCH_LOOKBACK_DAYS
+	batch_size = settings.taxpayer_prefetch_batch_size or DEFAULT_PREFETCH_BATCH_SIZE
+
+	parties = _collect_parties(add_days(getdate(), -lookback_days))
+	idnos = _resolve_idnos(parties, idno_fields)
+
+	pending = sorted(idno for idno in idnos if not taxpayer_cache.is_taxpayer_cached(idno))
+	if not pending:
+		return
+
+	client = EFacturaAPIClient.from_settings()
+
+	fetched = 0
+	for i in range(0, len(pending), batch_size):
+		chunk = pending[i : i + batch_size]
+		try:
+			taxpayers = taxpayer_cache.fetch_taxpayers(client, chunk)
+		except Exception:
+			frappe.log_error(
+				title="eFactura taxpayer prefetch failed",
+				message=f"Codes: {', '.join(chunk)}\n\n{frappe.get_traceback()}",
+			)
+			continue
+
+		missing = [idno for idno in chunk if idno not in taxpayers]
+		taxpayer_cache.store_taxpayers(taxpayers, missing)
+		fetched += len(taxpayers)
+
+	frappe.logger("erpnext_moldova_efactura").info(
+		f"eFactura taxpayer prefetch: {len(idnos)} parties, {len(pending)} requested, {fetched} found"
+	)
+
+
+def _collect_parties(from_date) -> dict[str, set[str]]:
+	"""Return {party doctype: {names}} referenced by recent Sales Invoices and pending eFacturas."""
+	parties = {doctype: set() for doctype in PARTY_DOCTYPES}
+
+	for row in frappe.db.sql(
+		"""
+        SELECT DISTINCT company, customer
+        FROM `tabSales Invoice`
+        WHERE docstatus < 2 AND posting_date >= %(from_date)s
+        """,
+		{"from_date": from_date},
+		as_dict=True,
+	):
+		parties["Company"].add(row.company)
+		parties["Customer"].add(row.customer)
+
+	for row in frappe.db.sql(
+		"""
+        SELECT DISTINCT
+            company,
+            supplier_party_type, supplier_party,
+            customer_party_type, customer_party,
+            transporter_party_type, transporter_party
+        FROM `tabeFactura`
+        WHERE docstatus = 0 OR (docstatus = 1 AND ef_status IN %(statuses)s)
+        """,
+		{"statuses": CHECKABLE_EF_STATUSES},
+		as_dict=True,
+	):
+		parties["Company"].add(row.company)
+		for prefix in ("supplier", "customer", "transporter"):
+			party_type = row.get(f"{prefix}_party_type")
+			if party_type in parties:
+				parties[party_type].add(row.get(f"{prefix}_party"))
+
+	return {doctype: {name for name in names if name} for doctype, names in parties.items()}
+
+
+def _resolve_idnos(parties: dict[str, set[str]], idno_fields: dict[str, str]) -> set[str]:
+	idnos = set()
+	for doctype, names in parties.items():
+		if not names or not frappe.get_meta(doctype).has_field(idno_fields[doctype]):
+			continue
+
+		names = list(names)
+		for i in range(0, len(names), 1000):
+			idnos.update(
+				frappe.get_all(
+					doctype,
+					filters={"name": ["in", names[i : i + 1000]]},
+					pluck=idno_fields[doctype],
+				)
+			)
+
+	# Same spelling as eFactura._autofill_party_block uses for its cache lookups
+	return {str(idno) for idno in idnos if idno}
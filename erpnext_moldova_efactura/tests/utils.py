@@ -0,0 +1,68 @@
+import re
+import sqlite3
+from datetime import date, datetime
+
+import frappe
+
+
+class SQLiteDB:
+	"""
+	Just enough of frappe.db on an in-memory sqlite3 database to run the app's raw SQL
+	in unit tests: MariaDB upserts and pymysql-style parameters are translated.
+	"""
+
+	def __init__(self, schema: str):
+		self.conn = sqlite3.connect(":memory:", isolation_level=None)
+		self.conn.executescript(schema)
+
+	def sql(self, query, values=None, as_dict=False):
+		query, params = self._translate(query, values)
+		cursor = self.conn.execute(query, params)
+		rows = cursor.fetchall()
+		if as_dict:
+			keys = [column[0] for column in cursor.description]
+			return [frappe._dict(zip(keys, row, strict=True)) for row in rows]
+		return rows
+
+	def sql_list(self, query, values=None):
+		return [row[0] for row in self.sql(query, values)]
+
+	def escape(self, value):
+		return "'" + str(value).replace("'", "''") + "'"
+
+	def savepoint(self, name):
+		self.conn.execute(f"SAVEPOINT {name}")
+
+	def rollback(self, save_point=None):
+		if save_point:
+			self.conn.execute(f"ROLLBACK TO SAVEPOINT {save_point}")
+
+	def commit(self):
+		pass
+
+	def is_duplicate_entry(self, e):
+		return isinstance(e, sqlite3.IntegrityError) and "UNIQUE" in str(e)
+
+	@staticmethod
+	def _translate(query, values):
+		query = query.replace("ON DUPLICATE KEY UPDATE", "ON CONFLICT(name) DO UPDATE SET")
+		query = re.sub(r"VALUES\((`\w+`)\)", r"excluded.\1", query)
+
+		if not isinstance(values, dict):
+			return query.replace("%s", "?"), [_param(value) for value in values or ()]
+
+		params = []
+
+		def placeholder(match):
+			value = values[match.group(1)]
+			if isinstance(value, list | tuple):
+				params.extend(_param(v) for v in value)
+				return "(" + ", ".join("?" * len(value)) + ")"
+			params.append(_param(value))
+			return "?"
+
+		return re.sub(r"%\((\w+)\)s", placeholder, query), params
+
+
+def _param(value):
+	return str(value) if isinstance(value, date | datetime) else value
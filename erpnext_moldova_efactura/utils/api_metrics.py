@@ -0,0 +1,179 @@
+import time
+from datetime import datetime, timezone
+
+import frappe
+from frappe.utils import convert_utc_to_system_timezone, flt, now_datetime
+
+METRICS_KEY = "efactura:api_metrics"
+SINCE_KEY = "efactura:api_metrics:since"
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 60000)
+
+# HSET field ARGV[1] to ARGV[2] when it is greater than the stored value, atomically
+HSET_MAX_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+if tonumber(ARGV[2]) > current then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+end
+"""
+
+
+def _bucket(latency_ms: float) -> str:
+	for bound in LATENCY_BUCKETS_MS:
+		if latency_ms <= bound:
+			return str(bound)
+	return "inf"
+
+
+def record_call(
+	method: str,
+	latency_ms: float,
+	bytes_sent: int = 0,
+	bytes_received: int = 0,
+	error_class: str | None = None,
+):
+	"""
+	Add one SOAP round-trip to the per-method counters in Redis.
+	Shared by all workers of the site; one pipeline (one round-trip) per call.
+	"""
+	key = frappe.cache.make_key(METRICS_KEY)
+
+	pipe = frappe.cache.pipeline()
+	pipe.set(frappe.cache.make_key(SINCE_KEY), time.time(), nx=True)
+	pipe.hincrby(key, f"{method}|calls", 1)
+	pipe.hincrbyfloat(key, f"{method}|latency_total", round(latency_ms, 3))
+	pipe.hincrby(key, f"{method}|lat|{_bucket(latency_ms)}", 1)
+	# Observed maximum, reported for quantiles falling into the open-ended bucket
+	pipe.eval(HSET_MAX_SCRIPT, 1, key, f"{method}|max_ms", round(latency_ms, 3))
+	pipe.hincrby(key, f"{method}|bytes_sent", int(bytes_sent or 0))
+	pipe.hincrby(key, f"{method}|bytes_received", int(bytes_received or 0))
+	if error_class:
+		pipe.hincrby(key, f"{method}|errors", 1)
+		pipe.hincrby(key, f"{method}|err|{error_class}", 1)
+	pipe.execute()
+
+
+def get_current_metrics() -> dict:
+	"""Aggregated counters since the last flush: {method: {...}}"""
+	return _aggregate(_read_hash(frappe.cache.make_key(METRICS_KEY)))
+
+
+def _read_hash(full_key: str) -> dict:
+	# Raw HGETALL: RedisWrapper.hgetall would add a key prefix and unpickle values
+	pipe = frappe.cache.pipeline()
+	pipe.hgetall(full_key)
+	return pipe.execute()[0] or {}
+
+
+def _aggregate(raw: dict) -> dict:
+	methods: dict[str, dict] = {}
+
+	for field, value in raw.items():
+		field = field.decode() if isinstance(field, bytes) else field
+		value = value.decode() if isinstance(value, bytes) else value
+
+		method, _, metric = field.partition("|")
+		m = methods.setdefault(
+			method,
+			{
+				"calls": 0,
+				"errors": 0,
+				"latency_total": 0.0,
+				"max_ms": 0.0,
+				"bytes_sent": 0,
+				"bytes_received": 0,
+				"buckets": {},
+				"error_classes": {},
+			},
+		)
+
+		if metric.startswith("lat|"):
+			m["buckets"][metric[4:]] = int(value)
+		elif metric.startswith("err|"):
+			m["error_classes"][metric[4:]] = int(value)
+		elif metric in ("latency_total", "max_ms"):
+			m[metric] = flt(value)
+		else:
+			m[metric] = int(value)
+
+	for m in methods.values():
+		calls = m["calls"] or 0
+		m["avg_ms"] = m["latency_total"] / calls if calls else 0
+		m["p50_ms"] = _percentile(m["buckets"], calls, 0.50, m["max_ms"])
+		m["p95_ms"] = _percentile(m["buckets"], calls, 0.95, m["max_ms"])
+		m["p99_ms"] = _percentile(m["buckets"], calls, 0.99, m["max_ms"])
+
+	return methods
+
+
+def _percentile(buckets: dict, total: int, q: float, max_ms: float = 0) -> float:
+	"""
+	Upper bound of the histogram bucket containing the q-quantile. The open-ended bucket
+	has no upper bound, the observed maximum max_ms is reported for it instead.
+	"""
+	if not total:
+		return 0
+
+	target = q * total
+	seen = 0
+	for bound in LATENCY_BUCKETS_MS:
+		seen += buckets.get(str(bound), 0)
+		if seen >= target:
+			return bound
+
+	# Falls into the open-ended bucket; counters recorded without a maximum report its lower bound
+	return max(max_ms, LATENCY_BUCKETS_MS[-1])
+
+
+def flush_api_metrics():
+	"""
+	Hourly job: move the Redis counters into eFactura API Metric (one row per method)
+	and start a new aggregation period.
+	"""
+	key = frappe.cache.make_key(METRICS_KEY)
+	since_key = frappe.cache.make_key(SINCE_KEY)
+	flushing_key = f"{key}:flushing"
+
+	pipe = frappe.cache.pipeline()
+	pipe.exists(key)
+	pipe.get(since_key)
+	exists, since = pipe.execute()
+	if not exists:
+		return
+
+	# RENAME is atomic: calls recorded from now on go into a fresh hash
+	pipe = frappe.cache.pipeline()
+	pipe.rename(key, flushing_key)
+	pipe.delete(since_key)
+	pipe.execute()
+
+	raw = _read_hash(flushing_key)
+	frappe.cache.delete(flushing_key)
+
+	period_end = now_datetime()
+	period_start = period_end
+	if since:
+		utc_start = datetime.fromtimestamp(float(since), timezone.utc).replace(tzinfo=None)
+		period_start = convert_utc_to_system_timezone(utc_start).replace(tzinfo=None)
+
+	for method, m in sorted(_aggregate(raw).items()):
+		frappe.get_doc(
+			{
+				"doctype": "eFactura API Metric",
+				"method": method,
+				"period_start": period_start,
+				"period_end": period_end,
+				"calls": m["calls"],
+				"errors": m["errors"],
+				"avg_ms": m["avg_ms"],
+				"p50_ms": m["p50_ms"],
+				"p95_ms": m["p95_ms"],
+				"p99_ms": m["p99_ms"],
+				"bytes_sent": m["bytes_sent"],
+				"bytes_received": m["bytes_received"],
+				"error_classes": "\n".join(
+					f"{cls}: {count}" for cls, count in sorted(m["error_classes"].items())
+				),
+			}
+		).insert(ignore_permissions=True)
@@ -0,0 +1,92 @@
+import time
+
+import frappe
+
+BREAKER_KEY = "efactura:circuit_breaker"
+_FIELDS = ("state", "failures", "opened_at", "last_failure_at", "last_error")
+
+CLOSED = "Closed"
+OPEN = "Open"
+HALF_OPEN = "Half-Open"
+
+
+def _key(field: str) -> str:
+	return frappe.cache.make_key(f"{BREAKER_KEY}:{field}")
+
+
+class CircuitBreaker:
+	"""
+	Circuit breaker shared by all workers of a site (state lives in Redis).
+
+	Closed    - calls go through; consecutive transient failures are counted
+	Open      - after `threshold` failures calls fail fast for `cooldown` seconds
+	Half-Open - after the cooldown a single probe call is let through;
+	            success closes the breaker, failure opens it again
+	"""
+
+	def __init__(self, threshold: int = 5, cooldown: int = 60):
+		self.threshold = threshold
+		self.cooldown = cooldown
+
+	@property
+	def enabled(self) -> bool:
+		return self.threshold > 0
+
+	def allow_request(self) -> bool:
+		if not self.enabled:
+			return True
+
+		state = get_state()
+		if state["state"] == CLOSED:
+			return True
+
+		if time.time() - state["opened_at"] < self.cooldown:
+			return False
+
+		# Cooldown is over: let exactly one caller probe e-Factura
+		acquired = frappe.cache.set(_key("probe"), 1, nx=True, ex=max(1, self.cooldown))
+		if acquired:
+			frappe.cache.set(_key("state"), HALF_OPEN)
+		return bool(acquired)
+
+	def record_success(self):
+		if not self.enabled:
+			return
+
+		if not int(frappe.cache.get(_key("failures")) or 0):
+			return
+
+		frappe.cache.set(_key("state"), CLOSED)
+		frappe.cache.set(_key("failures"), 0)
+		frappe.cache.delete(_key("probe"))
+
+	def record_failure(self, error: Exception):
+		if not self.enabled:
+			return
+
+		failures = frappe.cache.incr(_key("failures"))
+		frappe.cache.set(_key("last_error"), str(error)[:500])
+		frappe.cache.set(_key("last_failure_at"), time.time())
+
+		state = (frappe.cache.get(_key("state")) or b"").decode()
+		if failures >= self.threshold or state == HALF_OPEN:
+			frappe.cache.set(_key("opened_at"), time.time())
+			frappe.cache.set(_key("state"), OPEN)
+			frappe.cache.delete(_key("probe"))
+
+
+def get_state() -> dict:
+	values = frappe.cache.mget([_key(f) for f in _FIELDS])
+	data = {f: (v.decode() if v is not None else None) for f, v in zip(_FIELDS, values, strict=True)}
+
+	return {
+		"state": data["state"] or CLOSED,
+		"failures": int(data["failures"] or 0),
+		"opened_at": float(data["opened_at"] or 0),
+		"last_failure_at": float(data["last_failure_at"] or 0),
+		"last_error": data["last_error"] or "",
+	}
+
+
+def reset():
+	frappe.cache.delete(*[_key(f) for f in (*_FIELDS, "probe")])
@@ -0,0 +1,160 @@
+import frappe
+
+from erpnext_moldova_efactura.utils.fiscal_status import mark_fiscal_status_dirty
+
+# ef_status (e-Factura InvoiceStatus) -> eFactura.status, see eFactura.set_status
+EF_STATUS_LABELS = {
+	-1: "Pending Registration",
+	0: "Registered as Draft",
+	1: "Signed by Supplier",
+	2: "Rejected by Customer",
+	3: "Accepted by Customer",
+	5: "Canceled by Supplier",
+	7: "Sent to Customer",
+	8: "Signed by Customer",
+	9: "Sent to Customer",
+	10: "Transportation",
+	11: "Cancellation Requested",
+}
+
+WRITABLE_FIELDS = (
+	"ef_series",
+	"ef_number",
+	"ef_status",
+	"next_status_check",
+	"last_status_change",
+	"recent_status_changes",
+)
+# Keeps every statement well below the placeholder limit
+CHUNK_SIZE = 500
+
+
+def status_label_sql(column: str = "ef_status") -> str:
+	"""SQL CASE expression deriving eFactura.status of a submitted document from its ef_status."""
+	whens = " ".join(
+		f"WHEN {code} THEN {frappe.db.escape(label)}" for code, label in EF_STATUS_LABELS.items()
+	)
+	return f"CASE {column} {whens} ELSE NULL END"
+
+
+def apply_sync_results(updates: dict, checked: list, checked_at) -> list:
+	"""
+	Write back the results of a sync batch with a few set-based statements.
+
+	updates: {eFactura name: {field: value}} for fields in WRITABLE_FIELDS that changed
+	checked: names whose last_status_check is touched, changed or not
+
+	The fields are written with one UPDATE ... CASE per chunk, the
+	status labels of rows whose ef_status changed are derived in SQL, and
+	last_status_check is touched in bulk. Returns the names whose ef_status changed.
+	A chunk hitting the (ef_series, ef_number) unique key is retried row by row and
+	the rows that still collide are logged and skipped.
+	"""
+	updates = {name: values for name, values in updates.items() if values}
+	status_changed = [name for name, values in updates.items() if "ef_status" in values]
+
+	names = list(updates)
+	failed = set()
+	for i in range(0, len(names), CHUNK_SIZE):
+		failed.update(_update_chunk({name: updates[name] for name in names[i : i + CHUNK_SIZE]}))
+	if failed:
+		status_changed = [name for name in status_changed if name not in failed]
+
+	for i in range(0, len(status_changed), CHUNK_SIZE):
+		frappe.db.sql(
+			f"""
+            UPDATE `tabeFactura`
+            SET status = {status_label_sql()}
+            WHERE docstatus = 1 AND name IN %(names)s
+            """,
+			{"names": status_changed[i : i + CHUNK_SIZE]},
+		)
+
+	checked = list(dict.fromkeys(checked))
+	for i in range(0, len(checked), CHUNK_SIZE):
+		frappe.db.sql(
+			"""
+            UPDATE `tabeFactura`
+            SET last_status_check = %(checked_at)s
+            WHERE name IN %(names)s
+            """,
+			{"checked_at": checked_at, "names": checked[i : i + CHUNK_SIZE]},
+		)
+
+	return status_changed
+
+
+def _update_chunk(chunk: dict) -> list:
+	"""Write one chunk; returns the names skipped because their series/number is taken."""
+	savepoint = "efactura_sync_results"
+	frappe.db.savepoint(savepoint)
+	try:
+		_update_fields(chunk)
+		return []
+	except Exception as e:
+		if not frappe.db.is_duplicate_entry(e):
+			raise
+		frappe.db.rollback(save_point=savepoint)
+
+	failed = []
+	for name, values in chunk.items():
+		frappe.db.savepoint(savepoint)
+		try:
+			_update_fields({name: values})
+		except Exception as e:
+			if not frappe.db.is_duplicate_entry(e):
+				raise
+			frappe.db.rollback(save_point=savepoint)
+			failed.append(name)
+
+	if failed:
+		frappe.log_error(
+			title="eFactura sync: series/number already used",
+			message="Not updated, another eFactura has the same series/number:\n"
+			+ "\n".join(
+				f"{name}: {chunk[name].get('ef_series')}{chunk[name].get('ef_number')}" for name in failed
+			),
+		)
+	return failed
+
+
+def _update_fields(updates: dict):
+	assignments = []
+	values = {"names": list(updates)}
+
+	for field in WRITABLE_FIELDS:
+		rows = [(name, row[field]) for name, row in updates.items() if field in row]
+		if not rows:
+			continue
+
+		whens = []
+		for idx, (name, value) in enumerate(rows):
+			values[f"{field}_n{idx}"] = name
+			values[f"{field}_v{idx}"] = value
+			whens.append(f"WHEN %({field}_n{idx})s THEN %({field}_v{idx})s")
+
+		assignments.append(f"`{field}` = CASE name {' '.join(whens)} ELSE `{field}` END")
+
+	if not assignments:
+		return
+
+	frappe.db.sql(
+		f"""
+        UPDATE `tabeFactura`
+        SET {", ".join(assignments)}
+        WHERE name IN %(names)s
+        """,
+		values,
+	)
+
+
+def refresh_reference_fiscal_status(names: list):
+	"""Queue the fiscal status recompute of the Sales Invoices behind eFacturas whose status changed."""
+	for i in range(0, len(names), CHUNK_SIZE):
+		for si_name in frappe.get_all(
+			"eFactura",
+			filters={"name": ["in", names[i : i + CHUNK_SIZE]], "reference_doctype": "Sales Invoice"},
+			pluck="reference_name",
+			distinct=True,
+		):
+			mark_fiscal_status_dirty(si_name)
@@ -0,0 +1,233 @@
+import frappe
+from frappe.utils import flt, now_datetime
+
+SUMMARY_DOCTYPE = "eFactura Invoice Summary"
+SUMMARY_FIELDS = (
+	"efactura_count",
+	"pending_count",
+	"failed_count",
+	"in_progress_count",
+	"signed_count",
+	"signed_total",
+)
+CHUNK_SIZE = 1000
+
+
+def _aggregate_sql(where: str) -> str:
+	# Same status groups as determine_fiscal_status; non-cancelled eFacturas only
+	return f"""
+        SELECT
+            reference_name AS sales_invoice,
+            COUNT(*) AS efactura_count,
+            SUM(status IN %(pending)s) AS pending_count,
+            SUM(status IN %(failed)s) AS failed_count,
+            SUM(status IN %(in_progress)s) AS in_progress_count,
+            SUM(status = %(signed)s) AS signed_count,
+            SUM(CASE WHEN status = %(signed)s THEN IFNULL(total, 0) ELSE 0 END) AS signed_total
+        FROM `tabeFactura`
+        WHERE reference_doctype = 'Sales Invoice'
+            AND docstatus != 2
+            AND {where}
+        GROUP BY reference_name
+    """
+
+
+def _status_groups() -> dict:
+	from erpnext_moldova_efactura.utils.fiscal_status import (
+		FAILED_EF_STATUSES,
+		IN_PROGRESS_EF_STATUSES,
+		PENDING_EF_STATUSES,
+		SIGNED_EF_STATUS,
+	)
+
+	return {
+		"pending": PENDING_EF_STATUSES,
+		"failed": FAILED_EF_STATUSES,
+		"in_progress": IN_PROGRESS_EF_STATUSES,
+		"signed": SIGNED_EF_STATUS,
+	}
+
+
+def compute(si_names) -> dict:
+	"""Aggregate tabeFactura for the Sales Invoices: {name: row}. Invoices without eFacturas are absent."""
+	result = {}
+	names = list(dict.fromkeys(n for n in si_names if n))
+	for i in range(0, len(names), CHUNK_SIZE):
+		rows = frappe.db.sql(
+			_aggregate_sql("reference_name IN %(names)s"),
+			{"names": names[i : i + CHUNK_SIZE], **_status_groups()},
+			as_dict=True,
+		)
+		result.update({row.sales_invoice: row for row in rows})
+	return result
+
+
+def refresh(si_names):
+	"""Recompute the summary rows of the given Sales Invoices from tabeFactura."""
+	names = list(dict.fromkeys(n for n in si_names if n))
+	for i in range(0, len(names), CHUNK_SIZE):
+		chunk = names[i : i + CHUNK_SIZE]
+		_replace(chunk, compute(chunk))
+
+
+def _replace(si_names, aggregates: dict):
+	"""
+	Upsert the aggregates and delete only the rows of invoices that have none left.
+	Runs inside the user's transaction on every eFactura save, so it avoids a blanket
+	DELETE + INSERT whose gap locks make concurrent saves of one invoice deadlock.
+	"""
+	stale = [name for name in si_names if name not in aggregates]
+	if stale:
+		existing = frappe.db.sql_list(
+			f"SELECT name FROM `tab{SUMMARY_DOCTYPE}` WHERE name IN %(names)s",
+			{"names": stale},
+		)
+		if existing:
+			frappe.db.sql(
+				f"DELETE FROM `tab{SUMMARY_DOCTYPE}` WHERE name IN %(names)s",
+				{"names": existing},
+			)
+
+	if not aggregates:
+		return
+
+	now = now_datetime()
+	user = frappe.session.user
+	fields = [
+		"name",
+		"sales_invoice",
+		*SUMMARY_FIELDS,
+		"last_updated",
+		"creation",
+		"modified",
+		"owner",
+		"modified_by",
+	]
+	updated = [*SUMMARY_FIELDS, "last_updated", "modified", "modified_by"]
+
+	values = []
+	for name, row in aggregates.items():
+		values.extend((name, name, *(row[field] or 0 for field in SUMMARY_FIELDS), now, now, now, user, user))
+
+	placeholders = ", ".join(["(" + ", ".join(["%s"] * len(fields)) + ")"] * len(aggregates))
+	frappe.db.sql(
+		f"""
+        INSERT INTO `tab{SUMMARY_DOCTYPE}` ({", ".join(f"`{field}`" for field in fields)})
+        VALUES {placeholders}
+        ON DUPLICATE KEY UPDATE {", ".join(f"`{field}` = VALUES(`{field}`)" for field in updated)}
+        """,
+		values,
+	)
+
+
+def get(si_names) -> dict:
+	"""Summary rows for the Sales Invoices, as {name: row}."""
+	result = {}
+	names = list(dict.fromkeys(n for n in si_names if n))
+	for i in range(0, len(names), CHUNK_SIZE):
+		for row in frappe.get_all(
+			SUMMARY_DOCTYPE,
+			filters={"name": ["in", names[i : i + CHUNK_SIZE]]},
+			fields=["name", *SUMMARY_FIELDS],
+		):
+			result[row.name] = row
+	return result
+
+
+def rebuild(progress=None) -> int:
+	"""
+	Rebuild the whole summary table, one page of Sales Invoices at a time. Returns rows written.
+	Rows are upserted in place and stale ones deleted at the end, so readers never see
+	the table empty while it is rebuilt.
+	"""
+	written = 0
+	last = ""
+	while True:
+		names = frappe.db.sql_list(
+			"""
+            SELECT DISTINCT reference_name
+            FROM `tabeFactura`
+            WHERE reference_doctype = 'Sales Invoice' AND reference_name > %(last)s
+            ORDER BY reference_name
+            LIMIT %(limit)s
+            """,
+			{"last": last, "limit": CHUNK_SIZE},
+		)
+		if not names:
+			break
+
+		aggregates = compute(names)
+		_replace(names, aggregates)
+		frappe.db.commit()
+
+		written += len(aggregates)
+		last = names[-1]
+		if progress:
+			progress(written)
+
+	# Invoices whose eFacturas were all cancelled or deleted
+	frappe.db.sql(
+		f"""
+        DELETE FROM `tab{SUMMARY_DOCTYPE}`
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM `tabeFactura` ef
+            WHERE ef.reference_doctype = 'Sales Invoice'
+                AND ef.reference_name = `tab{SUMMARY_DOCTYPE}`.name
+                AND ef.docstatus != 2
+        )
+        """
+	)
+	frappe.db.commit()
+
+	return written
+
+
+def check(fix: bool = False) -> list:
+	"""
+	Compare the summary table with a fresh aggregate of tabeFactura.
+	Returns [(sales_invoice, stored, expected)] for mismatches; with fix, rewrites those rows.
+	"""
+	mismatches = []
+	last = ""
+	while True:
+		names = frappe.db.sql_list(
+			f"""
+            SELECT name FROM (
+                SELECT DISTINCT reference_name AS name
+                FROM `tabeFactura`
+                WHERE reference_doctype = 'Sales Invoice' AND reference_name > %(last)s
+                UNION
+                SELECT name FROM `tab{SUMMARY_DOCTYPE}` WHERE name > %(last)s
+            ) t
+            ORDER BY name
+            LIMIT %(limit)s
+            """,
+			{"last": last, "limit": CHUNK_SIZE},
+		)
+		if not names:
+			break
+
+		expected = compute(names)
+		stored = get(names)
+		bad = []
+		for name in names:
+			want = _normalise(expected.get(name))
+			have = _normalise(stored.get(name))
+			if want != have:
+				bad.append(name)
+				mismatches.append((name, have, want))
+
+		if fix and bad:
+			_replace(bad, {name: expected[name] for name in bad if name in expected})
+			frappe.db.commit()
+
+		last = names[-1]
+
+	return mismatches
+
+
+def _normalise(row) -> tuple | None:
+	if not row:
+		return None
+	return tuple(flt(row[field], 6) for field in SUMMARY_FIELDS)
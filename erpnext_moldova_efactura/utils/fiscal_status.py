@@ -1,6 +1,24 @@
 import frappe
 from frappe import _
 
+from erpnext_moldova_efactura.utils import efactura_summary, territory_scope
+from erpnext_moldova_efactura.utils.settings import get_settings
+
+# eFactura.status values, by the fiscal status they lead to (in priority order)
+FAILED_EF_STATUSES = ("Rejected by Customer", "Canceled by Supplier")
+PENDING_EF_STATUSES = ("Pending Registration",)
+IN_PROGRESS_EF_STATUSES = (
+    "Registered as Draft",
+    "Signed by Supplier",
+    "Accepted by Customer",
+    "Sent to Customer",
+    "Pending Registration",
+    "Transportation",
+)
+SIGNED_EF_STATUS = "Signed by Customer"
+
+BULK_CHUNK_SIZE = 1000
+
 
 def determine_fiscal_status(si):
     # Draft documents are ignored
@@ -20,44 +38,35 @@ def determine_fiscal_status(si):
     if not territory_in_fiscal_scope(customer.territory):
         return "Not Applicable"
 
-    # 4) Load e-Factura documents
-    ef_docs = get_efacturas_for_invoice(si.name)
+    # 4) Load e-Factura aggregates (maintained per Sales Invoice)
+    summary = efactura_summary.get([si.name]).get(si.name)
+
+    return _status_from_summary(summary, si.grand_total)
+
 
+def _status_from_summary(summary, grand_total):
     # 5) No e-Factura yet
-    if not ef_docs:
+    if not summary or not summary.efactura_count:
         return "Pending"
 
     # 6) Failed has highest priority
-    for ef in ef_docs:
-        if ef.status in (
-            "Rejected by Customer", 
-            "Canceled by Supplier", 
-            ):
-            return "Failed"
+    if summary.failed_count:
+        return "Failed"
 
     # 7) Pending
-    for ef in ef_docs:
-        if ef.status in (
-            "Pending Registration", 
-            ):
-            return "Pending"
-        
+    if summary.pending_count:
+        return "Pending"
+
     # 8) In Progress
-    for ef in ef_docs:
-        if ef.status in (
-            "Registered as Draft", 
-            "Signed by Supplier", 
-            "Accepted by Customer",
-            "Sent to Customer", 
-            "Pending Registration", 
-            "Transportation"
-            ):
-
-            return "In Progress"
+    if summary.in_progress_count:
+        return "In Progress"
 
     # 9) Compare totals
-    ef_total = float(sum((ef.total or 0) for ef in ef_docs if ef.status == "Signed by Customer"))
-    si_total = float(si.grand_total or 0)
+    return _compare_totals(float(summary.signed_total or 0), grand_total)
+
+
+def _compare_totals(ef_total, grand_total):
+    si_total = float(grand_total or 0)
 
     if ef_total < si_total:
         return "Partial"
@@ -73,48 +82,12 @@ def territory_in_fiscal_scope(customer_territory: str) -> bool:
     """
     Returns True if customer territory is within fiscal territory
     defined in eFactura Settings (including nested territories).
+    Resolved from the cached territory scope map.
     """
-    if not customer_territory:
-        return False
-
-    settings = frappe.get_single("eFactura Settings")
-    fiscal_root = settings.get("fiscal_territory")
-
-    if not fiscal_root:
-        return False
-
-    # get lft, rgt of fiscal root
-    fiscal = frappe.get_value(
-        "Territory",
-        fiscal_root,
-        ["lft", "rgt"],
-        as_dict=True,
-    )
-
-    if not fiscal:
-        return False
-
-    # get lft, rgt of customer territory
-    customer = frappe.get_value(
-        "Territory",
-        customer_territory,
-        ["lft", "rgt"],
-        as_dict=True,
-    )
-
-    if not customer:
-        return False
-
-    # nested set check
-    return (
-        customer.lft >= fiscal.lft
-        and customer.rgt <= fiscal.rgt
-    )
+    return territory_scope.in_fiscal_scope(customer_territory)
 
 def ensure_fiscal_territory_configured(doc=None):
-    settings = frappe.get_single("eFactura Settings")
-
-    if settings.get("fiscal_territory"):
+    if get_settings().fiscal_territory:
         return
 
     message = _(
@@ -130,16 +103,177 @@ def ensure_fiscal_territory_configured(doc=None):
         title=_("eFactura Configuration Required. Fiscal Territory must be set."),
     )
 
-def get_efacturas_for_invoice(si_name):
+def mark_fiscal_status_dirty(si_name):
     """
-    Returns all non-cancelled eFactura linked to Sales Invoice
+    Queue a fiscal_status recompute for the Sales Invoice. Queued invoices are evaluated
+    once, just before the current transaction commits, however many of their eFacturas
+    changed; a rollback discards the queue.
     """
-    return frappe.get_all(
-        "eFactura",
-        filters={
-            "reference_doctype": "Sales Invoice",
-            "reference_name": si_name,
-            "docstatus": ["!=", 2],
-        },
-        fields=["name", "status", "total"],
-    )
\ No newline at end of file
+    if not si_name:
+        return
+
+    dirty = getattr(frappe.local, "efactura_dirty_sales_invoices", None)
+    if dirty is None:
+        dirty = frappe.local.efactura_dirty_sales_invoices = set()
+
+    if not dirty:
+        frappe.db.before_commit.add(flush_dirty_fiscal_status)
+        frappe.db.after_rollback.add(_discard_dirty_fiscal_status)
+
+    dirty.add(si_name)
+
+
+def flush_dirty_fiscal_status():
+    dirty = getattr(frappe.local, "efactura_dirty_sales_invoices", None)
+    if not dirty:
+        return
+
+    names = sorted(dirty)
+    dirty.clear()
+
+    try:
+        efactura_summary.refresh(names)
+        update_fiscal_status_bulk(names)
+    except Exception as e:
+        # After a deadlock or lock wait timeout the database has already rolled back (part of)
+        # the transaction: committing anyway would silently lose the user's changes
+        if _is_lock_error(e):
+            raise
+
+        # Anything else must not abort the user's transaction
+        frappe.log_error(
+            title="eFactura fiscal status recompute failed",
+            message=f"{', '.join(names[:50])}\n\n{frappe.get_traceback()}",
+        )
+
+
+def _is_lock_error(e: Exception) -> bool:
+    return (
+        isinstance(e, (frappe.QueryDeadlockError, frappe.QueryTimeoutError))
+        or frappe.db.is_deadlocked(e)
+        or frappe.db.is_timedout(e)
+    )
+
+
+def _discard_dirty_fiscal_status():
+    dirty = getattr(frappe.local, "efactura_dirty_sales_invoices", None)
+    if dirty:
+        dirty.clear()
+
+
+def determine_fiscal_status_bulk(names, raise_if_unconfigured=False) -> dict:
+    """
+    Set-based determine_fiscal_status for many Sales Invoices at once.
+
+    Returns {name: status} for submitted invoices. Customer type, territory scope and
+    the eFactura Invoice Summary are read with one query per chunk and the same rules applied.
+    Without a Fiscal Territory only "Not Required" can be decided; the other invoices are
+    left out, or ValidationError is raised when raise_if_unconfigured is set.
+    """
+    fiscal_root = get_settings().fiscal_territory
+    scope = frappe.db.get_value("Territory", fiscal_root, ["lft", "rgt"], as_dict=True) if fiscal_root else None
+
+    if not fiscal_root and raise_if_unconfigured:
+        frappe.throw(
+            _("Please set Fiscal Territory in eFactura Settings."),
+            title=_("eFactura Configuration Required. Fiscal Territory must be set."),
+        )
+
+    names = list(dict.fromkeys(names))
+    result = {}
+    for i in range(0, len(names), BULK_CHUNK_SIZE):
+        result.update(_determine_chunk(names[i:i + BULK_CHUNK_SIZE], fiscal_root, scope))
+
+    return result
+
+
+def _determine_chunk(names, fiscal_root, scope) -> dict:
+    invoices = frappe.db.sql(
+        """
+        SELECT
+            si.name,
+            si.grand_total,
+            c.customer_type,
+            (t.lft >= %(lft)s AND t.rgt <= %(rgt)s) AS in_scope,
+            s.efactura_count,
+            s.failed_count,
+            s.pending_count,
+            s.in_progress_count,
+            s.signed_total
+        FROM `tabSales Invoice` si
+        LEFT JOIN `tabCustomer` c ON c.name = si.customer
+        LEFT JOIN `tabTerritory` t ON t.name = c.territory
+        LEFT JOIN `tabeFactura Invoice Summary` s ON s.name = si.name
+        WHERE si.name IN %(names)s AND si.docstatus = 1
+        """,
+        {"names": names, "lft": scope.lft if scope else 0, "rgt": scope.rgt if scope else -1},
+        as_dict=True,
+    )
+
+    result = {}
+    for si in invoices:
+        if si.customer_type != "Company":
+            result[si.name] = "Not Required"
+            continue
+
+        if not fiscal_root:
+            continue
+
+        if not si.in_scope:
+            result[si.name] = "Not Applicable"
+            continue
+
+        result[si.name] = _status_from_summary(si, si.grand_total)
+
+    return result
+
+
+def update_fiscal_status_bulk(names, raise_if_unconfigured=False) -> int:
+    """Recompute fiscal_status for the Sales Invoices and write back only changed rows. Returns the count written."""
+    statuses = determine_fiscal_status_bulk(names, raise_if_unconfigured=raise_if_unconfigured)
+    if not statuses:
+        return 0
+
+    current = {}
+    keys = list(statuses)
+    for i in range(0, len(keys), BULK_CHUNK_SIZE):
+        current.update(
+            frappe.db.get_all(
+                "Sales Invoice",
+                filters={"name": ["in", keys[i:i + BULK_CHUNK_SIZE]]},
+                fields=["name", "fiscal_status"],
+                as_list=True,
+            )
+        )
+
+    changed = {name: status for name, status in statuses.items() if current.get(name) != status}
+    write_fiscal_status(changed)
+    return len(changed)
+
+
+def write_fiscal_status(statuses: dict):
+    """Write {Sales Invoice: fiscal_status} with one UPDATE ... CASE per chunk."""
+    names = list(statuses)
+    for i in range(0, len(names), BULK_CHUNK_SIZE):
+        chunk = names[i:i + BULK_CHUNK_SIZE]
+        values = {"names": chunk}
+        whens = []
+        for idx, name in enumerate(chunk):
+            values[f"n{idx}"] = name
+            values[f"s{idx}"] = statuses[name]
+            whens.append(f"WHEN %(n{idx})s THEN %(s{idx})s")
+
+        frappe.db.sql(
+            f"""
+            UPDATE `tabSales Invoice`
+            SET fiscal_status = CASE name {" ".join(whens)} ELSE fiscal_status END
+            WHERE name IN %(names)s
+            """,
+            values,
+        )
+
+
+def refresh_fiscal_status(names):
+    """Background job: refresh the eFactura summary and fiscal_status of the Sales Invoices."""
+    efactura_summary.refresh(names)
+    update_fiscal_status_bulk(names)
@@ -0,0 +1,184 @@
+import frappe
+from frappe import _
+from frappe.utils import add_days, now_datetime
+
+from erpnext_moldova_efactura.api_client import EFacturaAPIClient
+from erpnext_moldova_efactura.utils.settings import get_settings
+
+RESERVATION_DOCTYPE = "eFactura Number Reservation"
+AVAILABLE = "Available"
+ASSIGNED = "Assigned"
+
+DEFAULT_POOL_SIZE = 200
+DEFAULT_LOW_WATERMARK = 50
+REFILL_JOB_ID = "efactura_number_pool_refill"
+# Reservations not handed out after this many days are reported as unused
+STALE_RESERVATION_DAYS = 7
+
+
+def _pool_settings() -> dict:
+	settings = get_settings()
+	return {
+		"enabled": settings.number_pool_enabled,
+		"size": settings.number_pool_size or DEFAULT_POOL_SIZE,
+		"low_watermark": settings.number_pool_low_watermark or DEFAULT_LOW_WATERMARK,
+	}
+
+
+def take_series_and_number(efactura_name: str) -> tuple[str, str]:
+	"""
+	Hand out a reserved series/number for the eFactura, falling back to a direct
+	GetSeriaAndNumbers call when the pool is disabled or empty.
+
+	The reservation row is locked with SKIP LOCKED, so concurrent signers each get a
+	different row; it is released again if the caller's transaction rolls back.
+	"""
+	pool = _pool_settings()
+	if not pool["enabled"]:
+		return _fetch_one()
+
+	row = frappe.db.sql(
+		f"""
+        SELECT name, ef_series, ef_number
+        FROM `tab{RESERVATION_DOCTYPE}`
+        WHERE status = %(status)s
+        ORDER BY creation ASC
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+        """,
+		{"status": AVAILABLE},
+		as_dict=True,
+	)
+
+	if row:
+		row = row[0]
+		frappe.db.set_value(
+			RESERVATION_DOCTYPE,
+			row.name,
+			{"status": ASSIGNED, "efactura": efactura_name, "assigned_on": now_datetime()},
+			update_modified=False,
+		)
+
+	if _available_count() < pool["low_watermark"]:
+		enqueue_refill()
+
+	if row:
+		return row.ef_series, row.ef_number
+
+	return _fetch_one()
+
+
+def _fetch_one() -> tuple[str, str]:
+	client = EFacturaAPIClient.from_settings()
+	resp = client.get_series_and_numbers(count=1)
+	data = (_extract_series_and_numbers(resp) or [{}])[0]
+	return data.get("Seria"), data.get("Number")
+
+
+def _extract_series_and_numbers(resp) -> list[dict]:
+	items = (resp.get("Results") or {}).get("SeriaAndNumber") or []
+	if isinstance(items, dict):
+		items = [items]
+	return items
+
+
+def _available_count() -> int:
+	return frappe.db.count(RESERVATION_DOCTYPE, {"status": AVAILABLE})
+
+
+def enqueue_refill():
+	frappe.enqueue(
+		"erpnext_moldova_efactura.utils.number_pool.refill_pool",
+		queue="short",
+		job_id=REFILL_JOB_ID,
+		deduplicate=True,
+		enqueue_after_commit=True,
+	)
+
+
+def refill_pool():
+	"""Top the pool up to its configured size with one GetSeriaAndNumbers call."""
+	pool = _pool_settings()
+	if not pool["enabled"]:
+		return
+
+	missing = pool["size"] - _available_count()
+	if missing <= 0:
+		return
+
+	client = EFacturaAPIClient.from_settings()
+	try:
+		resp = client.get_series_and_numbers(count=missing)
+	except Exception:
+		frappe.log_error(
+			title="eFactura number pool refill failed",
+			message=frappe.get_traceback(),
+		)
+		return
+
+	now = now_datetime()
+	values = [
+		(
+			f"{data.get('Seria')}-{data.get('Number')}",
+			data.get("Seria"),
+			str(data.get("Number")),
+			AVAILABLE,
+			now,
+			now,
+			now,
+			frappe.session.user,
+			frappe.session.user,
+		)
+		for data in _extract_series_and_numbers(resp)
+		if data.get("Seria") and data.get("Number")
+	]
+
+	if values:
+		frappe.db.bulk_insert(
+			RESERVATION_DOCTYPE,
+			fields=[
+				"name",
+				"ef_series",
+				"ef_number",
+				"status",
+				"reserved_on",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+			],
+			values=values,
+			ignore_duplicates=True,
+		)
+		frappe.db.commit()
+
+
+def get_pool_state() -> dict:
+	pool = _pool_settings()
+	stale_before = add_days(now_datetime(), -STALE_RESERVATION_DAYS)
+
+	return {
+		"enabled": pool["enabled"],
+		"size": pool["size"],
+		"low_watermark": pool["low_watermark"],
+		"available": _available_count(),
+		"unused": frappe.db.count(
+			RESERVATION_DOCTYPE, {"status": AVAILABLE, "reserved_on": ["<", stale_before]}
+		),
+		"oldest_reserved_on": frappe.db.get_value(
+			RESERVATION_DOCTYPE, {"status": AVAILABLE}, "min(reserved_on)"
+		),
+	}
+
+
+def report_unused_reservations():
+	"""Log reservations that have sat unused in the pool for a while; the numbers are already taken at SFS."""
+	state = get_pool_state()
+	if not state["unused"]:
+		return
+
+	frappe.logger("erpnext_moldova_efactura").warning(
+		_(
+			"eFactura number pool: {0} reservation(s) unused for more than {1} days (oldest reserved on {2})"
+		).format(state["unused"], STALE_RESERVATION_DAYS, state["oldest_reserved_on"])
+	)
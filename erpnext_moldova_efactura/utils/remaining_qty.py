@@ -0,0 +1,71 @@
+import frappe
+from frappe.utils import flt
+
+from erpnext_moldova_efactura.utils.settings import get_settings
+
+REMAINING_QTY_KEY = "efactura:remaining_qty:"
+
+
+def _remaining_sql() -> str:
+	# Sales Invoice quantities minus the quantities of its submitted eFacturas, per item_code.
+	# A UNION ALL instead of a join keeps items that appear on only one side.
+	return """
+        SELECT item_code, SUM(qty) AS remaining
+        FROM (
+            SELECT item_code, stock_qty AS qty
+            FROM `tabSales Invoice Item`
+            WHERE parent = %(sales_invoice)s
+            UNION ALL
+            SELECT efi.item_code, -efi.stock_qty
+            FROM `tabeFactura Item` efi
+            INNER JOIN `tabeFactura` ef ON ef.name = efi.parent
+            WHERE ef.reference_name = %(sales_invoice)s
+                AND ef.docstatus = 1
+                AND ef.name != %(exclude)s
+        ) q
+        WHERE item_code IS NOT NULL AND item_code != ''
+        GROUP BY item_code
+    """
+
+
+def compute(sales_invoice: str, exclude: str | None = None) -> dict:
+	"""{item_code: stock qty not yet covered by submitted eFacturas}, ignoring the eFactura `exclude`."""
+	rows = frappe.db.sql(
+		_remaining_sql(),
+		{"sales_invoice": sales_invoice, "exclude": exclude or ""},
+		as_dict=True,
+	)
+	return {row.item_code: flt(row.remaining) for row in rows}
+
+
+def get_remaining_qty(sales_invoice: str, exclude: str | None = None) -> dict:
+	"""
+	Remaining quantity map of the Sales Invoice. Served from the cache when it is enabled
+	and no eFactura is excluded; a submitted eFactura excludes itself and is always computed.
+	"""
+	settings = get_settings()
+	if not settings.available_qty_cache_enabled or exclude:
+		return compute(sales_invoice, exclude)
+
+	key = REMAINING_QTY_KEY + sales_invoice
+	# expires=True bypasses the request-local cache, so an invalidation by another worker is seen
+	remaining = frappe.cache.get_value(key, expires=True)
+	if remaining is None:
+		remaining = compute(sales_invoice)
+		frappe.cache.set_value(
+			key, remaining, expires_in_sec=max(1, settings.available_qty_cache_ttl_minutes) * 60
+		)
+	return remaining
+
+
+def invalidate(sales_invoice: str):
+	"""
+	Drop the cached map; called on eFactura submit and cancel. Dropped again after commit,
+	so a map rebuilt from the uncommitted state meanwhile is not kept.
+	"""
+	if not sales_invoice:
+		return
+
+	key = REMAINING_QTY_KEY + sales_invoice
+	frappe.cache.delete_value(key)
+	frappe.db.after_commit.add(lambda: frappe.cache.delete_value(key))
@@ -0,0 +1,146 @@
+import time
+from dataclasses import dataclass, fields
+
+import frappe
+from frappe.utils import cint
+
+# Bumped on every eFactura Settings save; snapshots carry the version they were built from
+SETTINGS_VERSION_KEY = "efactura:settings_version"
+# Long-running jobs re-check the version after this many seconds
+REVALIDATE_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class RetryPolicyRow:
+	method: str
+	max_attempts: int
+	base_delay_ms: int
+	max_delay_ms: int
+
+
+@dataclass(frozen=True)
+class EFacturaSettings:
+	"""
+	Read-only snapshot of eFactura Settings, loaded once per request or job.
+	Sync bookkeeping (cancel_sync_watermark, ...) is not part of it, read those directly.
+	"""
+
+	version: int
+
+	language: str | None = None
+	currency: str | None = None
+	vat_included_in_rate: bool = False
+	fiscal_territory: str | None = None
+
+	company_idno_field: str | None = None
+	customer_idno_field: str | None = None
+	supplier_idno_field: str | None = None
+
+	api_url: str | None = None
+	api_username: str | None = None
+	api_password: str | None = None
+	# Not in the stock doctype; picked up when a site adds them as custom fields
+	api_wsdl_url: str | None = None
+	api_timeout_seconds: int = 20
+	api_verify_tls: bool = True
+	api_service_name: str | None = None
+	api_port_name: str | None = None
+	cancel_sync_lookback_days: int | None = None
+
+	wsdl_cache_enabled: bool = True
+	wsdl_cache_ttl_hours: int = 24
+
+	api_batch_chunk_size: int = 100
+	api_max_parallel_requests: int = 4
+	api_async_concurrency: int = 20
+	status_sync_batch_size: int = 1000
+	status_sync_time_budget_seconds: int = 240
+	draft_sync_mode: str | None = None
+	cancel_sync_overlap_hours: int = 24
+	cancel_sync_full_sweep_days: int = 7
+
+	api_retry_attempts: int = 3
+	api_retry_base_delay_ms: int = 500
+	retry_policies: tuple = ()
+	circuit_breaker_threshold: int = 5
+	circuit_breaker_cooldown_seconds: int = 60
+
+	soap_capture_enabled: bool = False
+	soap_capture_latency_ms: int = 5000
+	soap_capture_sample_rate: int = 0
+	soap_capture_max_kb: int = 64
+	soap_capture_ring_size: int = 500
+
+	taxpayer_cache_ttl_hours: int = 24
+	taxpayer_cache_negative_ttl_minutes: int = 15
+	taxpayer_prefetch_lookback_days: int = 30
+	taxpayer_prefetch_batch_size: int = 100
+
+	number_pool_enabled: bool = False
+	number_pool_size: int = 200
+	number_pool_low_watermark: int = 50
+
+	available_qty_cache_enabled: bool = False
+	available_qty_cache_ttl_minutes: int = 60
+
+
+def get_settings() -> EFacturaSettings:
+	"""The eFactura Settings snapshot of the current request or job."""
+	memo = getattr(frappe.local, "efactura_settings", None)
+	if memo is not None:
+		snapshot, checked_at = memo
+		if time.monotonic() - checked_at < REVALIDATE_SECONDS:
+			return snapshot
+		if snapshot.version == _current_version():
+			frappe.local.efactura_settings = (snapshot, time.monotonic())
+			return snapshot
+
+	snapshot = _load(_current_version())
+	frappe.local.efactura_settings = (snapshot, time.monotonic())
+	return snapshot
+
+
+def _current_version() -> int:
+	return cint(frappe.cache.get(frappe.cache.make_key(SETTINGS_VERSION_KEY)))
+
+
+def _load(version: int) -> EFacturaSettings:
+	doc = frappe.get_cached_doc("eFactura Settings")
+
+	values = {"version": version}
+	for field in fields(EFacturaSettings):
+		if field.name in ("version", "retry_policies"):
+			continue
+
+		value = doc.get(field.name)
+		if value is None:
+			continue
+		if field.type is bool:
+			value = bool(cint(value))
+		elif field.type is int:
+			value = cint(value)
+		values[field.name] = value
+
+	values["retry_policies"] = tuple(
+		RetryPolicyRow(
+			method=row.method,
+			max_attempts=cint(row.max_attempts),
+			base_delay_ms=cint(row.base_delay_ms),
+			max_delay_ms=cint(row.max_delay_ms),
+		)
+		for row in doc.get("retry_policies") or []
+	)
+
+	return EFacturaSettings(**values)
+
+
+def invalidate():
+	"""Called on eFactura Settings save: drop this request's snapshot and make other processes reload."""
+	frappe.local.efactura_settings = None
+	_bump_version()
+	frappe.db.after_commit.add(_bump_version)
+
+
+def _bump_version():
+	frappe.cache.incr(frappe.cache.make_key(SETTINGS_VERSION_KEY))
+	frappe.local.efactura_settings = None
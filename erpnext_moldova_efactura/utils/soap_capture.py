@@ -0,0 +1,142 @@
+import base64
+import gzip
+import json
+import re
+import time
+from datetime import datetime, timezone
+
+import frappe
+from frappe.utils import cint, convert_utc_to_system_timezone
+
+from erpnext_moldova_efactura.utils.settings import get_settings
+
+QUEUE_KEY = "efactura:soap_capture_queue"
+
+FAULT = "Fault"
+SLOW = "Slow"
+SAMPLED = "Sampled"
+
+# WS-Security UsernameToken secrets; the element content is replaced before anything is stored
+SECRET_ELEMENT_RE = re.compile(
+	rb"(<(?:[\w.-]+:)?(Password|Nonce)\b[^>]*>)(.*?)(</(?:[\w.-]+:)?\2\s*>)",
+	re.DOTALL,
+)
+REDACTED = b"***"
+
+
+def _redact(payload) -> bytes:
+	"""Blank out UsernameToken passwords and nonces in a SOAP envelope."""
+	if not payload:
+		return b""
+	if isinstance(payload, str):
+		payload = payload.encode("utf-8")
+	return SECRET_ELEMENT_RE.sub(lambda m: m.group(1) + REDACTED + m.group(4), payload)
+
+
+def _pack(payload, max_bytes: int) -> tuple[str, int]:
+	"""Truncate to max_bytes, gzip and base64-encode. Returns (packed, original_size)."""
+	if not payload:
+		return "", 0
+	if isinstance(payload, str):
+		payload = payload.encode("utf-8")
+
+	size = len(payload)
+	if max_bytes and size > max_bytes:
+		payload = payload[:max_bytes]
+
+	return base64.b64encode(gzip.compress(payload)).decode("ascii"), size
+
+
+def unpack(packed: str) -> str:
+	if not packed:
+		return ""
+	return gzip.decompress(base64.b64decode(packed)).decode("utf-8", errors="replace")
+
+
+def capture(
+	method: str,
+	reason: str,
+	latency_ms: float,
+	request=None,
+	response=None,
+	error: str | None = None,
+	max_bytes: int = 65536,
+	ring_size: int = 500,
+):
+	"""
+	Queue one SOAP exchange in Redis (bounded list, newest first).
+	Called from API worker threads, so nothing here touches the database;
+	flush_soap_captures() persists the queue into the ring table.
+	"""
+	# Redacted before truncation, so a cut-off envelope cannot leak part of a secret
+	request_gz, request_size = _pack(_redact(request), max_bytes)
+	response_gz, response_size = _pack(_redact(response), max_bytes)
+
+	entry = json.dumps(
+		{
+			"method": method,
+			"reason": reason,
+			"captured_at": time.time(),
+			"latency_ms": round(latency_ms, 1),
+			"error": (error or "")[:1000],
+			"request_gz": request_gz,
+			"request_size": request_size,
+			"response_gz": response_gz,
+			"response_size": response_size,
+			"truncated": bool(max_bytes and (request_size > max_bytes or response_size > max_bytes)),
+		}
+	)
+
+	key = frappe.cache.make_key(QUEUE_KEY)
+	pipe = frappe.cache.pipeline()
+	pipe.lpush(key, entry)
+	pipe.ltrim(key, 0, max(1, ring_size) - 1)
+	pipe.execute()
+
+
+def flush_soap_captures():
+	"""
+	Scheduled job: move queued captures into eFactura SOAP Capture.
+	The table is a ring of `ring_size` slots; the oldest slot is overwritten.
+	"""
+	ring_size = get_settings().soap_capture_ring_size or 500
+	key = frappe.cache.make_key(QUEUE_KEY)
+
+	pipe = frappe.cache.pipeline()
+	pipe.lrange(key, 0, -1)
+	pipe.delete(key)
+	entries, _ = pipe.execute()
+
+	if not entries:
+		return
+
+	last = frappe.get_all(
+		"eFactura SOAP Capture",
+		fields=["slot"],
+		order_by="captured_on desc, modified desc",
+		limit=1,
+	)
+	slot = (cint(last[0].slot) + 1) % ring_size if last else 0
+
+	# Queue is newest first; store in chronological order
+	for raw in reversed(entries):
+		data = json.loads(raw)
+		utc = datetime.fromtimestamp(data.pop("captured_at"), timezone.utc).replace(tzinfo=None)
+		values = dict(
+			data,
+			slot=slot,
+			captured_on=convert_utc_to_system_timezone(utc).replace(tzinfo=None),
+		)
+
+		name = str(slot)
+		if frappe.db.exists("eFactura SOAP Capture", name):
+			doc = frappe.get_doc("eFactura SOAP Capture", name)
+			doc.update(values)
+			doc.save(ignore_permissions=True)
+		else:
+			frappe.get_doc(dict(values, doctype="eFactura SOAP Capture")).insert(ignore_permissions=True)
+
+		slot = (slot + 1) % ring_size
+
+	# Ring was shrunk in settings: drop slots that are out of range
+	frappe.db.delete("eFactura SOAP Capture", {"slot": [">=", ring_size]})
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from frappe.utils import cint, get_datetime
+
+# How often an eFactura is re-checked right after a status change, by ef_status
+BASE_INTERVAL_MINUTES = {
+	0: 60,  # Registered as Draft
+	1: 30,  # Signed by Supplier, waiting for the customer
+	3: 360,  # Accepted by Customer
+	7: 60,  # Sent to Customer
+	9: 60,  # Sent to Customer
+}
+DEFAULT_BASE_INTERVAL_MINUTES = 120
+
+# The interval grows with the time since the last status change: (older than days, factor)
+AGE_FACTORS = (
+	(30, 16),
+	(7, 6),
+	(1, 2),
+)
+
+# Changes within this window count as recent; active documents are polled more often
+RECENT_CHANGE_WINDOW_DAYS = 7
+ACTIVE_CHANGE_COUNT = 2
+
+MIN_INTERVAL_MINUTES = 15
+MAX_INTERVAL_MINUTES = 7 * 24 * 60
+
+
+def next_check_at(ef_status, last_change, recent_changes, now):
+	"""
+	Next time an eFactura should be checked, given its current ef_status, when its status
+	last changed (or when it was created) and how many changes it had recently.
+	"""
+	interval = BASE_INTERVAL_MINUTES.get(cint(ef_status), DEFAULT_BASE_INTERVAL_MINUTES)
+
+	age = now - get_datetime(last_change) if last_change else timedelta(0)
+	for days, factor in AGE_FACTORS:
+		if age >= timedelta(days=days):
+			interval *= factor
+			break
+
+	if cint(recent_changes) >= ACTIVE_CHANGE_COUNT:
+		interval /= 2
+
+	interval = min(max(interval, MIN_INTERVAL_MINUTES), MAX_INTERVAL_MINUTES)
+	return now + timedelta(minutes=interval)
+
+
+def plan_check(row, new_status, now) -> dict:
+	"""
+	Polling fields to write for a checked row (needs ef_status, creation,
+	last_status_change, recent_status_changes); new_status is the status just received.
+	"""
+	last_change = row.get("last_status_change")
+	recent = cint(row.get("recent_status_changes"))
+
+	if last_change and now - get_datetime(last_change) > timedelta(days=RECENT_CHANGE_WINDOW_DAYS):
+		recent = 0
+
+	values = {}
+	if new_status is not None and cint(row.get("ef_status")) != new_status:
+		last_change = now
+		recent += 1
+		values["last_status_change"] = now
+
+	values["recent_status_changes"] = recent
+	values["next_status_check"] = next_check_at(
+		new_status if new_status is not None else row.get("ef_status"),
+		last_change or row.get("creation"),
+		recent,
+		now,
+	)
+	return values
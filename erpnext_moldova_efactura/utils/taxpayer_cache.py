@@ -0,0 +1,138 @@
+import time
+
+import frappe
+
+from erpnext_moldova_efactura.utils.settings import get_settings
+
+TAXPAYER_KEY = "efactura:taxpayer:"
+BANK_ACCOUNT_KEY = "efactura:bank_account:"
+
+# Single-flight: how long the fetching worker holds the lock, and how long others wait for it
+LOCK_TTL_SECONDS = 30
+LOCK_WAIT_SECONDS = 10
+
+
+def _ttls() -> tuple[int, int]:
+	settings = get_settings()
+	return (
+		settings.taxpayer_cache_ttl_hours * 3600,
+		settings.taxpayer_cache_negative_ttl_minutes * 60,
+	)
+
+
+def _get(key: str):
+	# expires=True bypasses the request-local cache, so a value set by another worker is seen
+	return frappe.cache.get_value(key, expires=True)
+
+
+def _store(key: str, value: dict, ttls: tuple[int, int]):
+	ttl, negative_ttl = ttls
+	expires = ttl if value else negative_ttl
+	if expires > 0:
+		frappe.cache.set_value(key, value, expires_in_sec=expires)
+
+
+def _single_flight(key: str, fetch, ttls: tuple[int, int]) -> dict:
+	"""
+	Fetch and cache a value so that concurrent callers for the same key cause one
+	API call: the first caller takes a Redis lock, the others wait for its result.
+	"""
+	lock_key = frappe.cache.make_key(f"{key}:lock")
+
+	if frappe.cache.set(lock_key, 1, nx=True, ex=LOCK_TTL_SECONDS):
+		try:
+			value = fetch()
+			_store(key, value, ttls)
+			return value
+		finally:
+			frappe.cache.delete(lock_key)
+
+	deadline = time.monotonic() + LOCK_WAIT_SECONDS
+	while time.monotonic() < deadline:
+		time.sleep(0.1)
+		value = _get(key)
+		if value is not None:
+			return value
+		if not frappe.cache.exists(f"{key}:lock"):
+			# Owner failed without storing a result
+			break
+
+	return fetch()
+
+
+def get_taxpayer(client, idno: str) -> dict:
+	"""GetTaxpayersInfo for one IDNO through the cache. Returns {} when unknown."""
+	if not idno:
+		return {}
+
+	key = f"{TAXPAYER_KEY}{idno}"
+	cached = _get(key)
+	if cached is not None:
+		return cached
+
+	def fetch():
+		return fetch_taxpayers(client, [idno]).get(idno) or {}
+
+	return _single_flight(key, fetch, _ttls())
+
+
+def fetch_taxpayers(client, fiscal_codes: list[str]) -> dict:
+	"""Call GetTaxpayersInfo and return {IDNO: taxpayer}."""
+	resp = client.get_taxpayers_info(list(fiscal_codes))
+	taxpayers = (resp.get("Results") or {}).get("Taxpayer") or []
+	if isinstance(taxpayers, dict):
+		taxpayers = [taxpayers]
+
+	result = {}
+	for taxpayer in taxpayers:
+		idno = (taxpayer or {}).get("IDNO")
+		if idno:
+			result[str(idno)] = taxpayer
+
+	# A single requested code answered under a different spelling
+	if len(fiscal_codes) == 1 and len(taxpayers) == 1 and fiscal_codes[0] not in result:
+		result[fiscal_codes[0]] = taxpayers[0]
+
+	return result
+
+
+def store_taxpayers(taxpayers: dict, missing: list[str] | None = None):
+	"""Put already fetched taxpayers (and negative entries for missing codes) into the cache."""
+	ttls = _ttls()
+	for idno, taxpayer in taxpayers.items():
+		_store(f"{TAXPAYER_KEY}{idno}", taxpayer, ttls)
+	for idno in missing or []:
+		_store(f"{TAXPAYER_KEY}{idno}", {}, ttls)
+
+
+def is_taxpayer_cached(idno: str) -> bool:
+	return _get(f"{TAXPAYER_KEY}{idno}") is not None
+
+
+def get_bank_account(client, idno: str, iban: str) -> dict:
+	"""GetBankAccountInfo entry for the given IBAN through the cache. Returns {} when unknown."""
+	if not iban:
+		return {}
+
+	key = f"{BANK_ACCOUNT_KEY}{idno or ''}:{iban}"
+	cached = _get(key)
+	if cached is not None:
+		return cached
+
+	def fetch():
+		resp = client.get_bank_account_info(idno=idno, account_number=iban)
+		bank_accounts = (resp.get("Results") or {}).get("BankAccount") or []
+		if isinstance(bank_accounts, dict):
+			bank_accounts = [bank_accounts]
+
+		for bank in bank_accounts:
+			if bank.get("AccountNumber") == iban:
+				return bank
+		return {}
+
+	return _single_flight(key, fetch, _ttls())
+
+
+def purge():
+	frappe.cache.delete_keys(TAXPAYER_KEY)
+	frappe.cache.delete_keys(BANK_ACCOUNT_KEY)
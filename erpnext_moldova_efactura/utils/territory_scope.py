@@ -0,0 +1,90 @@
+import threading
+
+import frappe
+
+from erpnext_moldova_efactura.utils.settings import get_settings
+
+# Bumped on Territory / eFactura Settings changes; every process compares it with the
+# version its map was built from
+SCOPE_VERSION_KEY = "efactura:territory_scope_version"
+
+_scope_maps = {}  # site -> (version, {territory: in scope})
+_scope_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "builds": 0}
+
+
+def in_fiscal_scope(territory: str) -> bool:
+	"""Whether the territory lies within the Fiscal Territory of eFactura Settings (nested)."""
+	if not territory:
+		return False
+
+	scope = _get_scope_map()
+	if territory in scope:
+		_stats["hits"] += 1
+		return scope[territory]
+
+	# Unknown territory (e.g. created by another process right now): rebuild once,
+	# then remember it as out of scope if it still does not exist
+	_stats["misses"] += 1
+	return _get_scope_map(rebuild=True).setdefault(territory, False)
+
+
+def _current_version() -> int:
+	# Memoised per request, so a request pays at most one Redis round trip
+	version = getattr(frappe.local, "efactura_territory_scope_version", None)
+	if version is None:
+		version = int(frappe.cache.get(frappe.cache.make_key(SCOPE_VERSION_KEY)) or 0)
+		frappe.local.efactura_territory_scope_version = version
+	return version
+
+
+def _get_scope_map(rebuild: bool = False) -> dict:
+	site = frappe.local.site
+	version = _current_version()
+
+	cached = _scope_maps.get(site)
+	if cached and cached[0] == version and not rebuild:
+		return cached[1]
+
+	with _scope_lock:
+		cached = _scope_maps.get(site)
+		if cached and cached[0] == version and not rebuild:
+			return cached[1]
+
+		scope = _build_scope_map()
+		_scope_maps[site] = (version, scope)
+		_stats["builds"] += 1
+		return scope
+
+
+def _build_scope_map() -> dict:
+	fiscal_root = get_settings().fiscal_territory
+	root = (
+		frappe.db.get_value("Territory", fiscal_root, ["lft", "rgt"], as_dict=True) if fiscal_root else None
+	)
+
+	territories = frappe.get_all("Territory", fields=["name", "lft", "rgt"])
+	if not root:
+		return {t.name: False for t in territories}
+
+	return {t.name: t.lft >= root.lft and t.rgt <= root.rgt for t in territories}
+
+
+def invalidate(*args, **kwargs):
+	"""
+	Drop the scope maps of all processes; usable as a doc_events hook. Bumped again
+	after commit, so a process that rebuilt from the uncommitted state rebuilds once more.
+	"""
+	_bump_version()
+	frappe.db.after_commit.add(_bump_version)
+
+
+def _bump_version():
+	frappe.cache.incr(frappe.cache.make_key(SCOPE_VERSION_KEY))
+	frappe.local.efactura_territory_scope_version = None
+	_scope_maps.pop(frappe.local.site, None)
+
+
+def get_stats() -> dict:
+	"""Hit/miss counters of this process."""
+	return dict(_stats)